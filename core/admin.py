@@ -1,19 +1,31 @@
 from django.contrib import admin, messages
 from django.contrib.contenttypes.admin import GenericTabularInline
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import FileResponse
 from .models import DestructionRecord
 from django import forms
-import csv
 from django.urls import path, reverse
 from django.shortcuts import redirect
 from django.contrib.admin.sites import NotRegistered
 from .models import PersuratanPortal
-from django.utils.safestring import mark_safe
 from django.utils.html import format_html
 from django.contrib.auth.models import Group as AuthGroup, User as AuthUser
 from django.contrib.auth.admin import GroupAdmin, UserAdmin
 from django.utils import timezone
 from .utils_retention import compute_retention_until
+from .utils.labels import label_pdf_file
+from .utils.access import can_see_rhs, is_rhs, restrict_rhs
+from . import search
+from .utils.stats import invalidate_dashboard
+from .rollup import bulk_update_status
+from .utils.numbering import assign_outgoing_numbers, set_outgoing_status
+from .jobs import enqueue_render_many
+from .utils.pagination import KeysetAdminMixin
+from .utils.export import (
+    INCOMING_COLUMNS, OUTGOING_COLUMNS, AUDIT_COLUMNS, csv_response, xlsx_response,
+)
 
 try:
     admin.site.unregister(PersuratanPortal)
@@ -25,7 +37,7 @@ from .models import (
     IncomingLetter, Disposition, DispositionAssignment, FollowUp,
     OutgoingLetter, ReviewStep,
     ExpeditionRecord, PersuratanPortal,
-    Grupu, Uzuariu,
+    Grupu, Uzuariu, RenderJob, AuditEvent,
 )
 
 # ============================================================
@@ -45,6 +57,11 @@ class DestructionRecordAdmin(admin.ModelAdmin):
     search_fields = ("reason",)
     list_filter = ("destroyed_at",)
     autocomplete_fields = ("approved_by",)
+    list_select_related = ("approved_by",)
+
+    def get_queryset(self, request):
+        # content_object (GFK) di-prefetch per content type, bukan per baris
+        return super().get_queryset(request).prefetch_related("content_object")
 
 
 # Tampilkan proxy berlabel Tetun di sidebar
@@ -83,14 +100,22 @@ class _HiddenAuthGroupAdmin(GroupAdmin):
 # =========================
 # Helper: preview image
 # =========================
-def _img_preview(filefield, height=80):
-    if not filefield:
-        return "—"
-    try:
-        url = filefield.url
-        return mark_safe(f'<img src="{url}" height="{height}" />')
-    except Exception:
+def _fts_search_results(model_admin, kind, request, queryset, search_term):
+    """
+    Pencarian admin (changelist ?q= & autocomplete) lewat indeks full-text,
+    semua hasil, urut relevansi; kalau FTS tidak tersedia → icontains bawaan.
+    """
+    found = search.filter_queryset(queryset, search_term, kind) if search_term.strip() else None
+    if found is None:
+        return admin.ModelAdmin.get_search_results(model_admin, request, queryset, search_term)
+    return found, False
+
+
+def _code_preview(kind, code, height=80):
+    """Preview QR/barcode dari endpoint on-the-fly (tanpa file di storage)."""
+    if not code:
         return "—"
+    return format_html('<img src="{}" height="{}" />', reverse("code_image", args=[kind, code]), height)
 
 
 # =========================
@@ -123,44 +148,33 @@ class ExpeditionInline(GenericTabularInline):
 
 
 def export_agenda_csv(modeladmin, request, queryset):
-    resp = HttpResponse(content_type="text/csv")
-    resp["Content-Disposition"] = "attachment; filename=agenda_incoming.csv"
-    w = csv.writer(resp)
-    w.writerow(["Agenda", "Subject", "Origin", "Priority", "Status", "Created"])
-    for o in queryset:
-        w.writerow([
-            o.agenda_number,
-            o.subject,
-            o.origin,
-            o.get_priority_display(),
-            o.get_status_display(),
-            o.created_at,
-        ])
-    return resp
+    return csv_response(queryset, INCOMING_COLUMNS, "agenda_incoming.csv")
 
 
 export_agenda_csv.short_description = "Export CSV (Buku Agenda Karta Tama)"
 
 
+def export_agenda_xlsx(modeladmin, request, queryset):
+    return xlsx_response(queryset, INCOMING_COLUMNS, "agenda_incoming.xlsx")
+
+
+export_agenda_xlsx.short_description = "Export XLSX (Buku Agenda Karta Tama)"
+
+
 def export_outgoing_csv(modeladmin, request, queryset):
-    resp = HttpResponse(content_type="text/csv")
-    resp["Content-Disposition"] = "attachment; filename=agenda_outgoing.csv"
-    w = csv.writer(resp)
-    w.writerow(["Number", "Subject", "Template", "Status", "Created"])
-    for o in queryset:
-        w.writerow([
-            o.number,
-            o.subject,
-            o.get_template_type_display(),
-            o.get_status_display(),
-            o.created_at,
-        ])
-    return resp
+    return csv_response(queryset, OUTGOING_COLUMNS, "agenda_outgoing.csv")
 
 
 export_outgoing_csv.short_description = "Export CSV (Buku Agenda Karta Sai)"
 
 
+def export_outgoing_xlsx(modeladmin, request, queryset):
+    return xlsx_response(queryset, OUTGOING_COLUMNS, "agenda_outgoing.xlsx")
+
+
+export_outgoing_xlsx.short_description = "Export XLSX (Buku Agenda Karta Sai)"
+
+
 # =========================
 # Referensia Geral
 # =========================
@@ -177,6 +191,7 @@ class AttachmentAdmin(admin.ModelAdmin):
     list_filter = ("uploaded_at",)
     search_fields = ("title", "uploaded_by__username", "uploaded_by__email")
     date_hierarchy = "uploaded_at"
+    list_select_related = ("uploaded_by",)
 
 
 # =========================
@@ -200,18 +215,20 @@ class DispositionInline(admin.TabularInline):
 
 @admin.action(description="Tandai status: Selesai (DONE)")
 def mark_done(modeladmin, request, queryset):
-    updated = queryset.update(status="DONE")
+    updated = bulk_update_status(queryset, "DONE")
+    invalidate_dashboard()
     modeladmin.message_user(request, f"Ditandai DONE: {updated} item.")
 
 
 @admin.action(description="Arsipkan (ARCH)")
 def mark_archived(modeladmin, request, queryset):
-    updated = queryset.update(status="ARCH")
+    updated = bulk_update_status(queryset, "ARCH")
+    invalidate_dashboard()
     modeladmin.message_user(request, f"Diarsipkan: {updated} item.")
 
 
 @admin.register(IncomingLetter)
-class IncomingLetterAdmin(admin.ModelAdmin):
+class IncomingLetterAdmin(KeysetAdminMixin, admin.ModelAdmin):
     form = IncomingLetterForm
     list_display = (
         "agenda_number", "subject", "origin", "priority", "status_badge",
@@ -232,7 +249,8 @@ class IncomingLetterAdmin(admin.ModelAdmin):
     inlines = []   # sebelumnya: [DispositionInline, FollowUpInline, ExpeditionInline]
 
     save_on_top = True
-    actions = [mark_done, mark_archived, export_agenda_csv, "print_label"]
+    actions = [mark_done, mark_archived, export_agenda_csv, export_agenda_xlsx,
+               "print_label", "print_label_a4"]
 
     readonly_fields = (
         "agenda_number", "qr_preview", "barcode_preview",
@@ -274,18 +292,16 @@ class IncomingLetterAdmin(admin.ModelAdmin):
     class Media:
         css = {"all": ("of/correspondence-form.css",)}
 
-    # ===== HILANGKAN FILTER BAR + SEARCH DI LIST VIEW =====
+    # ===== HILANGKAN FILTER BAR DI LIST VIEW (search tetap, via indeks full-text) =====
     def get_list_filter(self, request):
         return ()
 
     def get_date_hierarchy(self, request):
         return None
 
-    def get_search_fields(self, request):
-        rm = getattr(request, "resolver_match", None)
-        if rm and rm.url_name == "core_incomingletter_autocomplete":
-            return self.search_fields  # tetap aktif untuk autocomplete
-        return ()
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text (FTS5 / tsvector) bila tersedia, fallback icontains
+        return _fts_search_results(self, "in", request, queryset, search_term)
 
     # ===== helper UI dst (tidak diubah) =====
     @admin.display(description="Status")
@@ -305,19 +321,19 @@ class IncomingLetterAdmin(admin.ModelAdmin):
 
     @admin.display(description="QR")
     def qr_thumb(self, obj):
-        return _img_preview(obj.qr_image, height=50)
+        return _code_preview("qr", obj.agenda_number, height=50)
 
     @admin.display(description="Barcode")
     def barcode_thumb(self, obj):
-        return _img_preview(obj.barcode_image, height=35)
+        return _code_preview("barcode", obj.agenda_number, height=35)
 
     @admin.display(description="QR Preview")
     def qr_preview(self, obj):
-        return _img_preview(obj.qr_image, height=120)
+        return _code_preview("qr", obj.agenda_number, height=120)
 
     @admin.display(description="Barcode Preview")
     def barcode_preview(self, obj):
-        return _img_preview(obj.barcode_image, height=80)
+        return _code_preview("barcode", obj.agenda_number, height=80)
 
     @admin.display(description="Aksi Cepat")
     def quick_actions(self, obj):
@@ -387,64 +403,30 @@ class IncomingLetterAdmin(admin.ModelAdmin):
     def goto_followup(self, request, object_id):
         return redirect("admin_followup_create", pk=object_id)
 
+    def _label_response(self, queryset, stock=None):
+        rows = (queryset.prefetch_related(None)
+                .values_list("agenda_number", "subject")
+                .iterator(chunk_size=500))
+        return FileResponse(label_pdf_file(rows, stock), filename="labels.pdf",
+                            content_type="application/pdf")
+
     @admin.action(description="Cetak Label (Barcode + QR)")
     def print_label(self, request, queryset):
-        items = []
-        for o in queryset:
-            num = o.agenda_number or "—"
-            subj = (o.subject or "")[:48]
-            bc = o.barcode_image.url if o.barcode_image else ""
-            qr = o.qr_image.url if o.qr_image else ""
-            items.append(f"""
-<div class="lbl">
-  <div class="num">{num}</div>
-  <div class="imgs">
-    {f'<img class="bc" src="{bc}" />' if bc else ''}
-    {f'<img class="qr" src="{qr}" />' if qr else ''}
-  </div>
-  <div class="subj">{subj}</div>
-</div>
-""")
-        html = f"""<!doctype html>
-<html><head><meta charset="utf-8"><title>Labels</title>
-<style>
-@media print {{
-  @page {{ size: 58mm auto; margin: 2mm; }}
-  body {{ margin:0 }}
-}}
-body {{ font:12px/1.2 -apple-system,Segoe UI,Roboto,Arial; }}
-.lbl {{ width:58mm; border:1px dashed #ccc; padding:4px; margin:6px auto; }}
-.num {{ font-weight:700; font-size:12px; text-align:center; }}
-.imgs {{ display:flex; align-items:center; justify-content:space-between; gap:4px; }}
-.bc {{ max-width:42mm; height:auto; }}
-.qr {{ width:14mm; height:14mm; }}
-.subj {{ font-size:10px; margin-top:2px; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }}
-</style></head>
-<body>
-{''.join(items) if items else '<p>Tidak ada data.</p>'}
-<script>window.print()</script>
-</body></html>"""
-        return HttpResponse(html)
+        return self._label_response(queryset)
+
+    @admin.action(description="Cetak Label A4 (3 x 8)")
+    def print_label_a4(self, request, queryset):
+        return self._label_response(queryset, "a4_3x8")
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        qs = qs.prefetch_related("classification_tags")
-        if request.user.is_superuser:
-            return qs
-        if not request.user.groups.filter(name="RHS_ACCESS").exists():
-            return qs.exclude(classification_tags__name__iexact="RHS")
-        return qs
+        # changelist tidak menampilkan tag → tanpa prefetch classification_tags
+        return restrict_rhs(super().get_queryset(request), request.user)
 
     def has_view_permission(self, request, obj=None):
         ok = super().has_view_permission(request, obj)
         if not ok or not obj:
             return ok
-        if obj.classification_tags.filter(name__iexact="RHS").exists():
-            return (
-                request.user.is_superuser
-                or request.user.groups.filter(name="RHS_ACCESS").exists()
-            )
-        return True
+        return can_see_rhs(request.user) or not is_rhs(obj)
 
 
 class DispositionAssignmentInline(admin.TabularInline):
@@ -463,6 +445,11 @@ class DispositionAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
     autocomplete_fields = ("letter", "sender", "parent")
     inlines = [DispositionAssignmentInline]
+    list_select_related = ("letter", "sender", "parent__letter")
+
+    def get_queryset(self, request):
+        # __str__ & kolom Agenda membaca letter (juga utk autocomplete & parent)
+        return super().get_queryset(request).select_related("letter", "sender", "parent__letter")
 
     @admin.display(description="Agenda")
     def letter_agenda(self, obj):
@@ -476,6 +463,7 @@ class DispositionAssignmentAdmin(admin.ModelAdmin):
                      "assignee__username", "assignee__email")
     list_filter = ("read_at", "completed_at")
     autocomplete_fields = ("disposition", "assignee")
+    list_select_related = ("disposition__letter", "assignee")
 
 
 @admin.register(FollowUp)
@@ -486,6 +474,7 @@ class FollowUpAdmin(admin.ModelAdmin):
     list_filter = ("doc_type", "created_at")
     date_hierarchy = "created_at"
     autocomplete_fields = ("letter", "author")
+    list_select_related = ("letter", "author")
 
 
 # =========================
@@ -500,37 +489,48 @@ class ReviewStepInline(admin.TabularInline):
 
 @admin.action(description="Set status → REVIEW")
 def set_review(modeladmin, request, queryset):
-    updated = queryset.update(status="REVIEW")
+    updated = bulk_update_status(queryset, "REVIEW")
+    invalidate_dashboard()
     modeladmin.message_user(request, f"Status REVIEW: {updated} item.")
 
 
 @admin.action(description="Set status → APPROVED")
 def set_approved(modeladmin, request, queryset):
-    updated = queryset.update(status="APPROVED")
+    updated = bulk_update_status(queryset, "APPROVED")
+    invalidate_dashboard()
     modeladmin.message_user(request, f"Status APPROVED: {updated} item.")
 
 
 @admin.action(description="Set status → FINAL (lock nomor)")
 def set_final(modeladmin, request, queryset):
-    updated = queryset.update(status="FINAL")
+    # update massal melewati signal pre_save → nomor diisi di sini, satu transaksi
+    with transaction.atomic():
+        numbered = assign_outgoing_numbers(queryset)
+        updated = bulk_update_status(queryset, "FINAL")
+    search.index_rows("out", OutgoingLetter.objects.filter(pk__in=numbered).values("pk", *search.FIELDS["out"]))
+    if getattr(settings, "CODE_STORE_IMAGES", False):
+        enqueue_render_many("out", numbered)
+    invalidate_dashboard()
     modeladmin.message_user(
-        request, f"Status FINAL (nomor akan terisi via signal): {updated} item."
+        request, f"Status FINAL: {updated} item, {len(numbered)} nomor baru."
     )
 
 
 @admin.action(description="Set status → MANDA")
 def set_sent(modeladmin, request, queryset):
-    updated = queryset.update(status="MANDA")
+    updated = bulk_update_status(queryset, "MANDA")
+    invalidate_dashboard()
     modeladmin.message_user(request, f"Status MANDA: {updated} item.")
 
 
 @admin.action(description="Arsipkan (ARCH)")
 def set_arch(modeladmin, request, queryset):
-    updated = queryset.update(status="ARCH")
+    updated = bulk_update_status(queryset, "ARCH")
+    invalidate_dashboard()
     modeladmin.message_user(request, f"Status ARCH: {updated} item.")
 
 @admin.register(OutgoingLetter)
-class OutgoingLetterAdmin(admin.ModelAdmin):
+class OutgoingLetterAdmin(KeysetAdminMixin, admin.ModelAdmin):
     list_display = ("number", "subject", "template_type",
                     "status_badge", "created_at", "qr_thumb")
 
@@ -544,7 +544,8 @@ class OutgoingLetterAdmin(admin.ModelAdmin):
     inlines = []   # SIMPLE: tidak ada Passu Revisaun & Rejistu Ekspedisaun
     autocomplete_fields = ("created_by",)
     save_on_top = True
-    actions = [set_review, set_approved, set_final, set_sent, set_arch, export_outgoing_csv]
+    actions = [set_review, set_approved, set_final, set_sent, set_arch,
+               export_outgoing_csv, export_outgoing_xlsx]
 
     readonly_fields = ("number", "qr_preview",
                        "created_at", "updated_at", "status_actions")
@@ -568,18 +569,15 @@ class OutgoingLetterAdmin(admin.ModelAdmin):
         }),
     )
 
-    # ====== sembunyikan filter bar + All dates + search di LIST ======
+    # ====== sembunyikan filter bar + All dates di LIST (search tetap, via indeks full-text) ======
     def get_list_filter(self, request):
         return ()
 
     def get_date_hierarchy(self, request):
         return None
 
-    def get_search_fields(self, request):
-        rm = getattr(request, "resolver_match", None)
-        if rm and rm.url_name == "core_outgoingletter_autocomplete":
-            return self.search_fields
-        return ()
+    def get_search_results(self, request, queryset, search_term):
+        return _fts_search_results(self, "out", request, queryset, search_term)
 
     # ===== helper tampilan status / QR / actions (sama seperti sebelumnya) =====
     @admin.display(description="Status")
@@ -599,11 +597,11 @@ class OutgoingLetterAdmin(admin.ModelAdmin):
 
     @admin.display(description="QR")
     def qr_thumb(self, obj):
-        return _img_preview(obj.qr_image, height=50)
+        return _code_preview("qr", obj.number, height=50)
 
     @admin.display(description="QR Preview")
     def qr_preview(self, obj):
-        return _img_preview(obj.qr_image, height=120)
+        return _code_preview("qr", obj.number, height=120)
 
     @admin.display(description="Transisi Status")
     def status_actions(self, obj):
@@ -671,8 +669,7 @@ class OutgoingLetterAdmin(admin.ModelAdmin):
                     reverse("admin:core_outgoingletter_change", args=[obj.pk])
                 )
 
-        obj.status = status
-        obj.save(update_fields=["status"])
+        set_outgoing_status(obj, status)
         messages.success(request, msg)
         return redirect(reverse("admin:core_outgoingletter_change", args=[obj.pk]))
 
@@ -698,6 +695,7 @@ class ReviewStepAdmin(admin.ModelAdmin):
     search_fields = ("letter__number", "letter__subject",
     "reviewer__username", "reviewer__email")
     autocomplete_fields = ("letter", "reviewer")
+    list_select_related = ("letter", "reviewer")
 
 
 @admin.register(ExpeditionRecord)
@@ -708,6 +706,63 @@ class ExpeditionRecordAdmin(admin.ModelAdmin):
     search_fields = ("destination", "received_by")
     date_hierarchy = "sent_at"
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("content_object")
+
+@admin.action(description="Ulangi job (render ulang)")
+def retry_render_jobs(modeladmin, request, queryset):
+    from .jobs import run_job
+    ok = sum(1 for pk in queryset.values_list("pk", flat=True) if run_job(pk))
+    modeladmin.message_user(request, f"Render ulang OK: {ok} item.")
+
+
+@admin.register(RenderJob)
+class RenderJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "object_id", "status", "attempts", "updated_at")
+    list_filter = ("kind", "status")
+    search_fields = ("object_id",)
+    readonly_fields = ("kind", "object_id", "attempts", "last_error", "created_at", "updated_at")
+    actions = [retry_render_jobs]
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(KeysetAdminMixin, admin.ModelAdmin):
+    """
+    Jejak audit (read-only, append-only). Filter memakai index komposit:
+    ?content_type__id__exact=&object_id=  /  ?user_id=  /  ?action=
+    Tombol "Export CSV" men-stream hasil filter yg sama.
+    """
+    list_display = ("created_at", "username", "action", "content_type", "object_id",
+                    "method", "path", "status", "ip")
+    list_filter = ("action", "content_type", "created_at")
+    # pencocokan persis → index, bukan LIKE '%...%'
+    search_fields = ("=username", "=object_id", "=ip")
+    list_select_related = ("content_type",)
+    list_per_page = 50
+    readonly_fields = [f.name for f in AuditEvent._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path("export/", self.admin_site.admin_view(self.export_view),
+                 name="core_auditevent_export"),
+        ] + super().get_urls()
+
+    def export_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        cl = self.get_changelist_instance(request)
+        qs = cl.get_queryset(request).order_by("-created_at", "-pk")
+        return csv_response(qs, AUDIT_COLUMNS, "audit_trail.csv")
+
+
 # Portal ke UI Persuratan (kalau nanti mau diaktifkan lagi)
 # @admin.register(PersuratanPortal)
 # class PersuratanPortalAdmin(admin.ModelAdmin):
@@ -11,12 +11,28 @@ from .admin_views import (
     AdminOutgoingDetail,
     AdminOutgoingSetStatus,
     AdminFollowUpCreate,
+    AdminExportAgenda,
+    AdminDailyStats,
+    AdminPerformance,
+    AdminInbox,
 )
 
 urlpatterns = [
     # DASHBOARD ADMIN PERSURATAN
     path("", AdminHome.as_view(), name="admin_home"),
 
+    # Export Buku Agenda (CSV/XLSX, filter tanggal via ?from=&to=)
+    path("export/<str:kind>/", AdminExportAgenda.as_view(), name="admin_export_agenda"),
+
+    # Rekap harian (JSON) dari DailyLetterStats
+    path("stats/<str:kind>/<str:dimension>/", AdminDailyStats.as_view(), name="admin_daily_stats"),
+
+    # Profiling request: p50/p95/p99 per endpoint dari perf.log
+    path("perf/", AdminPerformance.as_view(), name="admin_performance"),
+
+    # Inbox tarefa user (Despacho yg ditugaskan ke saya)
+    path("inbox/", AdminInbox.as_view(), name="admin_inbox"),
+
     # ========== INCOMING (Karta Tama) ==========
     path("incoming/", AdminIncomingList.as_view(), name="admin_incoming_list"),
     path("incoming/new/", AdminIncomingCreate.as_view(), name="admin_incoming_create"),
@@ -1,9 +1,21 @@
-from django.views.generic import TemplateView, RedirectView, View
+from django.views.generic import TemplateView, RedirectView, View, ListView
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.urls import reverse_lazy
-from django.contrib import messages
+from django.contrib import admin, messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.conf import settings
 
 from .models import IncomingLetter, OutgoingLetter
+from .utils.stats import dashboard_data
+from .rollup import DIMENSIONS, report
+from . import inbox, profiling
+from .utils.pagination import ApproxCountPaginator
+from .utils.export import (
+    INCOMING_COLUMNS, OUTGOING_COLUMNS, csv_response, filter_date_range, xlsx_response,
+)
 from .views import (
     IncomingList, IncomingCreate, IncomingUpdate, IncomingDetail,
     # DispositionCreate,   # ⬅️ JANGAN DIIMPORT LAGI
@@ -17,22 +29,8 @@ class AdminDashboard(TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        from django.utils import timezone
-        from .models import IncomingLetter, OutgoingLetter
-        today = timezone.localdate()
-        ctx["stats"] = {
-            "incoming_today": IncomingLetter.objects.filter(created_at__date=today).count(),
-            "incoming_in_progress": IncomingLetter.objects.filter(status__in=["DISP", "PROG"]).count(),
-            "incoming_done": IncomingLetter.objects.filter(status="DONE").count(),
-            "incoming_total": IncomingLetter.objects.count(),
-            "outgoing_draft": OutgoingLetter.objects.filter(status="DRAFT").count(),
-            "outgoing_review": OutgoingLetter.objects.filter(status="REVIEW").count(),
-            "outgoing_final": OutgoingLetter.objects.filter(status="FINAL").count(),
-            "outgoing_sent": OutgoingLetter.objects.filter(status="MANDA").count(),
-            "outgoing_total": OutgoingLetter.objects.count(),
-        }
-        ctx["recent_incoming"] = IncomingLetter.objects.order_by("-created_at")[:10]
-        ctx["recent_outgoing"] = OutgoingLetter.objects.order_by("-created_at")[:10]
+        # 1 query agregasi per model, di-cache (lihat core/utils/stats.py)
+        ctx.update(dashboard_data())
         return ctx
 
 AdminHome = AdminDashboard
@@ -48,6 +46,114 @@ class AdminOutgoingList(RedirectView):
     permanent = False
 
 
+# ========== EXPORT BUKU AGENDA ==========
+@method_decorator(staff_member_required, name="dispatch")
+class AdminExportAgenda(View):
+    """
+    Export streaming: /admin/karta/export/<incoming|outgoing>/?format=csv|xlsx&from=YYYY-MM-DD&to=YYYY-MM-DD
+    Queryset diambil dari ModelAdmin → aturan akses (mis. RHS) tetap berlaku.
+    """
+    EXPORTS = {
+        "incoming": (IncomingLetter, INCOMING_COLUMNS, "agenda_incoming"),
+        "outgoing": (OutgoingLetter, OUTGOING_COLUMNS, "agenda_outgoing"),
+    }
+
+    def get(self, request, kind):
+        if kind not in self.EXPORTS:
+            raise Http404
+        model, columns, name = self.EXPORTS[kind]
+        model_admin = admin.site.get_model_admin(model)
+        if not model_admin.has_view_permission(request):
+            raise Http404
+        qs = filter_date_range(
+            model_admin.get_queryset(request).order_by("created_at"),
+            parse_date(request.GET.get("from") or ""),
+            parse_date(request.GET.get("to") or ""),
+        )
+        if request.GET.get("format") == "xlsx":
+            return xlsx_response(qs, columns, f"{name}.xlsx")
+        return csv_response(qs, columns, f"{name}.csv")
+
+
+# ========== REKAP HARIAN (JSON utk grafik) ==========
+@method_decorator(staff_member_required, name="dispatch")
+class AdminDailyStats(View):
+    """
+    /admin/karta/stats/<in|out>/<dimensi>/?from=YYYY-MM-DD&to=YYYY-MM-DD&period=day|month|year
+    Dibaca dari DailyLetterStats (bukan scan tabel surat).
+    """
+    def get(self, request, kind, dimension):
+        dims = set(DIMENSIONS.get(kind, {})) | ({"tag"} if kind == "in" else set())
+        if dimension not in dims:
+            raise Http404
+        period = request.GET.get("period") or "day"
+        if period not in ("day", "month", "year"):
+            period = "day"
+        rows = report(
+            kind, dimension,
+            parse_date(request.GET.get("from") or ""),
+            parse_date(request.GET.get("to") or ""),
+            period,
+        )
+        return JsonResponse({
+            "kind": kind, "dimension": dimension, "period": period,
+            "results": [
+                {"period": r["period"].isoformat()[:10], "value": r["value"], "count": r["count"]}
+                for r in rows
+            ],
+        })
+
+
+# ========== PROFILING (p50/p95/p99 per endpoint) ==========
+@method_decorator(staff_member_required, name="dispatch")
+class AdminPerformance(TemplateView):
+    """Ringkasan perf.log (N baris terakhir), lihat core/profiling.py."""
+    template_name = "admin/karta/perf.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        samples = profiling.read_samples()
+        ctx.update({
+            "title": "Performa Request",
+            "rows": profiling.summarize(samples),
+            "sample_count": len(samples),
+            "sample_rate": profiling.setting("SAMPLE_RATE", 0.1),
+            "slow_ms": profiling.setting("SLOW_MS", 1000),
+            "query_budget": profiling.setting("QUERY_BUDGET", 50),
+        })
+        return ctx
+
+
+# ========== INBOX TAREFA (proyeksi InboxItem) ==========
+@method_decorator(staff_member_required, name="dispatch")
+class AdminInbox(ListView):
+    """Tugas Despacho user yg login; satu index scan di core_inboxitem, tanpa JOIN."""
+    template_name = "admin/karta/inbox.html"
+    context_object_name = "items"
+    paginator_class = ApproxCountPaginator
+
+    def get_paginate_by(self, queryset):
+        return getattr(settings, "INBOX_PAGE_SIZE", 50)
+
+    def get_show(self):
+        show = self.request.GET.get("show", "open")
+        return show if show in inbox.SHOW_CHOICES else "open"
+
+    def get_queryset(self):
+        return inbox.items(self.request.user, self.get_show())
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx.update({
+            "title": "Inbox Tarefa",
+            "show": self.get_show(),
+            "tabs": [("open", "Loke"), ("unread", "Seidauk lee"), ("overdue", "Liu prazu"),
+                     ("done", "Kompleta"), ("all", "Hotu")],
+            "today": timezone.localdate(),
+        })
+        return ctx
+
+
 # ========== FORM & DETAIL ==========
 class AdminIncomingCreate(IncomingCreate):
     template_name = "adminui/incoming/form.html"
@@ -0,0 +1,251 @@
+"""
+REST API v1: /api/v1/incoming/, /outgoing/, /dispositions/, /assignments/,
+/inbox/ (tugas user yg login, dari proyeksi InboxItem).
+
+- Paginasi cursor (-created_at, -id) → tanpa COUNT(*), stabil saat data masuk.
+- Queryset per viewset: select_related/prefetch hanya utk relasi yg diminta
+  (?fields=...), kolom besar (body) di-defer kalau tidak diminta.
+  Satu halaman = beberapa query tetap, berapa pun page_size-nya.
+- ETag: GET detail/list dijawab 304 bila If-None-Match cocok; PUT/PATCH/DELETE
+  dgn If-Match yg tidak cocok ditolak 412 (update konkuren).
+- Hak akses: permission model Django (view/add/change/delete_<model>);
+  surat RHS (+ disposisi/tugasnya) disaring seperti di admin (core/utils/access.py).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Prefetch
+from django.conf import settings
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from core import filters, inbox, ingest, serializers
+from core.models import (
+    IncomingLetter, OutgoingLetter, Disposition, DispositionAssignment, ClassificationTag,
+)
+from core.utils.access import restrict_rhs
+from core.utils.pagination import ApproxCountPaginator
+from core.serializers import requested_fields
+
+
+class ModelPermissions(permissions.DjangoModelPermissions):
+    """DjangoModelPermissions + GET butuh view_<model> (bawaan DRF: bebas)."""
+    perms_map = {
+        **permissions.DjangoModelPermissions.perms_map,
+        "GET": ["%(app_label)s.view_%(model_name)s"],
+        "HEAD": ["%(app_label)s.view_%(model_name)s"],
+    }
+
+
+class LetterCursorPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class AssignmentCursorPagination(LetterCursorPagination):
+    ordering = ("-id",)
+
+
+def _etag(data) -> str:
+    raw = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+
+def _matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+class ConditionalMixin:
+    """ETag & If-None-Match (304) / If-Match (412)."""
+
+    def object_etag(self, obj) -> str:
+        # hash representasi, bukan updated_at: aksi massal, save(update_fields=...)
+        # dan perubahan tag (M2M) tidak selalu menaikkan updated_at
+        return _etag(self.get_serializer(obj).data)
+
+    def _not_modified(self, etag: str):
+        if _matches(self.request.headers.get("If-None-Match", ""), etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return None
+
+    def _check_if_match(self, obj):
+        header = self.request.headers.get("If-Match")
+        if header and not _matches(header, self.object_etag(obj)):
+            return Response({"detail": "Dadus muda ona (If-Match la kona). Foti fali uluk."},
+                            status=status.HTTP_412_PRECONDITION_FAILED)
+        return None
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        etag = _etag(response.data)
+        return self._not_modified(etag) or self._with_etag(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = self.get_serializer(self.get_object()).data
+        etag = _etag(data)
+        return self._not_modified(etag) or self._with_etag(Response(data), etag)
+
+    def update(self, request, *args, **kwargs):
+        failed = self._check_if_match(self.get_object())
+        if failed:
+            return failed
+        response = super().update(request, *args, **kwargs)
+        # response.data = representasi versi baru → ETag sama dgn GET berikutnya
+        return self._with_etag(response, _etag(response.data))
+
+    def destroy(self, request, *args, **kwargs):
+        return self._check_if_match(self.get_object()) or super().destroy(request, *args, **kwargs)
+
+    @staticmethod
+    def _with_etag(response, etag):
+        response["ETag"] = etag
+        return response
+
+
+class SparseQuerysetMixin:
+    """
+    Optimasi queryset berdasarkan ?fields=:
+      prefetch = {field API: Prefetch/path}
+      heavy = field model yg di-defer bila tidak diminta
+    FK dirender sbg pk (<fk>_id) → tidak perlu select_related.
+    """
+    prefetch: dict = {}
+    heavy: tuple = ()
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        wanted = requested_fields(self.request)
+        use = (lambda name: wanted is None or name in wanted)
+        prefetches = [p for name, p in self.prefetch.items() if use(name)]
+        if prefetches:
+            qs = qs.prefetch_related(*prefetches)
+        deferred = [f for f in self.heavy if not use(f)]
+        if deferred and self.action in ("list", "retrieve"):
+            qs = qs.defer(*deferred)
+        return qs
+
+
+class BaseViewSet(ConditionalMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
+    permission_classes = [permissions.IsAuthenticated, ModelPermissions]
+    pagination_class = LetterCursorPagination
+    rhs_path: str | None = None  # relasi ke IncomingLetter utk filter RHS (None = tidak ada)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.rhs_path is not None:
+            qs = restrict_rhs(qs, self.request.user, self.rhs_path)
+        return qs
+
+
+class IncomingLetterViewSet(BaseViewSet):
+    queryset = IncomingLetter.objects.all()
+    serializer_class = serializers.IncomingLetterSerializer
+    filterset_class = filters.IncomingLetterFilter
+    rhs_path = ""
+    prefetch = {
+        "classification_tags": Prefetch("classification_tags", queryset=ClassificationTag.objects.only("id", "name")),
+    }
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    @action(detail=False, methods=["post"], url_path="bulk", parser_classes=[JSONParser, MultiPartParser])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Import massal (lihat core/ingest.py). Body:
+          - JSON: list objek (atau {"rows": [...]}), tanpa file scan; atau
+          - multipart: `rows` = file .csv/.jsonl + file PDF (nama = kolom scan_pdf),
+            boleh banyak file dgn field yg sama.
+        Baris gagal dilaporkan di `errors`, baris lain tetap tersimpan; file yg
+        tidak dirujuk baris mana pun di `unused_files`.
+        """
+        files = {}
+        upload = request.FILES.get("rows")
+        if upload:
+            rows = list(ingest.read_rows(upload, upload.name))
+            for key, uploads in request.FILES.lists():
+                if key != "rows":
+                    for f in uploads:
+                        files.setdefault(f.name, []).append(f)
+        else:
+            rows = request.data if isinstance(request.data, list) else request.data.get("rows")
+            if not isinstance(rows, list):
+                return Response({"detail": "La iha dadus (rows)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = getattr(settings, "INGEST_API_MAX_ROWS", 5000)
+        if len(rows) > limit:
+            return Response({"detail": f"Maksimu {limit} liña kada pedidu."}, status=status.HTTP_400_BAD_REQUEST)
+        report = ingest.ingest(rows, user=request.user, files=files,
+                               batch_size=getattr(settings, "INGEST_BATCH_SIZE", 500))
+        code = status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=code)
+
+
+class OutgoingLetterViewSet(BaseViewSet):
+    queryset = OutgoingLetter.objects.all()
+    serializer_class = serializers.OutgoingLetterSerializer
+    filterset_class = filters.OutgoingLetterFilter
+    heavy = ("body",)
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+
+class DispositionViewSet(BaseViewSet):
+    queryset = Disposition.objects.all()
+    serializer_class = serializers.DispositionSerializer
+    filterset_class = filters.DispositionFilter
+    rhs_path = "letter__"
+    prefetch = {"assignments": Prefetch("assignments", queryset=DispositionAssignment.objects.order_by("id"))}
+
+    def perform_create(self, serializer):
+        serializer.save(sender=self.request.user)
+
+
+class DispositionAssignmentViewSet(BaseViewSet):
+    queryset = DispositionAssignment.objects.annotate(letter_pk=F("disposition__letter_id"))
+    serializer_class = serializers.DispositionAssignmentSerializer
+    filterset_class = filters.DispositionAssignmentFilter
+    rhs_path = "disposition__letter__"
+    pagination_class = AssignmentCursorPagination
+
+
+class InboxPagination(PageNumberPagination):
+    # urutan inbox (tenggat, prioritas) tidak unik → OFFSET, tapi count dibatasi
+    django_paginator_class = ApproxCountPaginator
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class InboxViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Inbox tarefa user yg login. ?show=open (default) / unread / overdue / done / all.
+    /inbox/counts/ → hitungan badge (di-cache).
+    """
+    serializer_class = serializers.InboxItemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = InboxPagination
+
+    def get_queryset(self):
+        show = self.request.query_params.get("show", "open")
+        if show not in inbox.SHOW_CHOICES:
+            raise ValidationError({"show": [f"Valor la válidu. Uza: {', '.join(inbox.SHOW_CHOICES)}."]})
+        return inbox.items(self.request.user, show)
+
+    @action(detail=False, methods=["get"])
+    def counts(self, request):
+        return Response(inbox.counts(request.user))
+
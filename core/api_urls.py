@@ -0,0 +1,12 @@
+from rest_framework.routers import DefaultRouter
+
+from . import api
+
+router = DefaultRouter()
+router.register("incoming", api.IncomingLetterViewSet, basename="api-incoming")
+router.register("outgoing", api.OutgoingLetterViewSet, basename="api-outgoing")
+router.register("dispositions", api.DispositionViewSet, basename="api-disposition")
+router.register("assignments", api.DispositionAssignmentViewSet, basename="api-assignment")
+router.register("inbox", api.InboxViewSet, basename="api-inbox")
+
+urlpatterns = router.urls
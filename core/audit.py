@@ -0,0 +1,259 @@
+"""
+Sink audit asinkron + batch.
+
+Request hanya memasukkan record ke antrian (put_nowait, tanpa I/O disk);
+satu thread latar mengambil record per batch (maks `batch_size` atau tiap
+`flush_interval` detik) lalu:
+  - menulis ke file dgn SATU write+flush per batch, rotasi ukuran/waktu;
+  - (opsional, `db=True`) bulk_create ke tabel AuditEvent.
+
+Kalau antrian penuh, record dibuang & dihitung (`dropped`) → latensi request
+tidak pernah ikut menunggu disk/DB.
+
+Dipasang lewat settings.LOGGING:
+    "audit_file": {"()": "core.audit.AsyncAuditHandler", "filename": ..., ...}
+
+Pencatatan event: `record(action, obj, ...)`, atau `record_on_commit(...)` utk
+perubahan data (tidak tercatat bila transaksi di-rollback). User & IP diambil
+dari request aktif (diikat oleh AuditViewMiddleware), jadi signal model pun
+tahu pelakunya.
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+_STOP = object()
+
+logger = logging.getLogger("audit")
+_request = contextvars.ContextVar("audit_request", default=None)
+
+WHEN_SECONDS = {"S": 1, "M": 60, "H": 3600, "D": 86400, "MIDNIGHT": 86400}
+
+
+# ========== PENCATATAN EVENT ==========
+
+def bind_request(request):
+    return _request.set(request)
+
+
+def unbind_request(token) -> None:
+    _request.reset(token)
+
+
+def record(action: str, obj=None, **kwargs) -> None:
+    """
+    Catat satu event audit (non-blocking). Field terstruktur → extra={"audit": ...}
+    utk sink DB; baris teks utk file audit.log.
+    """
+    message, data = _build(action, obj, **kwargs)
+    logger.info(message, extra={"audit": data})
+
+
+def record_on_commit(action: str, obj=None, **kwargs) -> None:
+    """
+    Seperti record(), tapi dikirim setelah transaksi commit: perubahan data
+    yg di-rollback tidak meninggalkan event. User/IP/pk diambil sekarang.
+    """
+    from django.db import transaction
+
+    message, data = _build(action, obj, **kwargs)
+    transaction.on_commit(lambda: logger.info(message, extra={"audit": data}))
+
+
+def _build(action: str, obj=None, *, request=None, status=None, extra=None,
+           message: str = "", content_type=None, object_id=None) -> tuple[str, dict]:
+    from django.contrib.contenttypes.models import ContentType
+
+    request = request or _request.get()
+    user = getattr(request, "user", None) if request is not None else None
+    if user is not None and not user.is_authenticated:
+        user = None
+    if obj is not None:
+        content_type = ContentType.objects.get_for_model(obj, for_concrete_model=True)
+        object_id = obj.pk
+    data = {
+        "action": action,
+        "user_id": user.pk if user else None,
+        "username": user.get_username() if user else "",
+        "content_type_id": content_type.pk if content_type else None,
+        "object_id": "" if object_id is None else str(object_id),
+        "method": request.method if request is not None else "",
+        "path": request.path[:500] if request is not None else "",
+        "status": status,
+        "ip": (request.META.get("REMOTE_ADDR") or None) if request is not None else None,
+        "extra": extra or None,
+    }
+    if not message:
+        target = f" obj={content_type.model}:{object_id}" if content_type else ""
+        message = f"{action} user={data['username'] or '-'}{target}"
+        if extra:
+            message += " " + " ".join(f"{k}={v}" for k, v in extra.items())
+    return message, data
+
+
+class RotatingWriter:
+    """
+    File append dgn rotasi bila ukuran > max_bytes ATAU umur file > `when`.
+    File lama diganti nama <file>.<YYYYmmdd-HHMMSS>, sisakan backup_count.
+    """
+
+    def __init__(self, filename, max_bytes=0, when=None, backup_count=0, encoding="utf-8"):
+        self.filename = os.fspath(filename)
+        self.max_bytes = max_bytes
+        self.when = (when or "").upper() or None
+        self.backup_count = backup_count
+        self.encoding = encoding
+        self.stream = None
+        self.rollover_at = None
+
+    def _open(self):
+        self.stream = open(self.filename, "a", encoding=self.encoding)
+        self.rollover_at = self._next_rollover(time.time())
+
+    def _next_rollover(self, now: float):
+        if not self.when:
+            return None
+        if self.when == "MIDNIGHT":
+            t = datetime.fromtimestamp(now)
+            return datetime(t.year, t.month, t.day).timestamp() + 86400
+        return now + WHEN_SECONDS[self.when]
+
+    def _should_rollover(self, incoming: int) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return bool(self.max_bytes) and self.stream.tell() + incoming > self.max_bytes and self.stream.tell() > 0
+
+    def _rollover(self):
+        self.stream.close()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target, n = f"{self.filename}.{stamp}", 1
+        while os.path.exists(target):
+            target, n = f"{self.filename}.{stamp}-{n}", n + 1
+        os.replace(self.filename, target)
+        if self.backup_count:
+            prefix = os.path.basename(self.filename) + "."
+            folder = os.path.dirname(self.filename) or "."
+            old = sorted(f for f in os.listdir(folder) if f.startswith(prefix))
+            for name in old[:-self.backup_count]:
+                os.remove(os.path.join(folder, name))
+        self._open()
+
+    def write_batch(self, lines: list[str]):
+        if self.stream is None:
+            self._open()
+        data = "".join(line + "\n" for line in lines)
+        if self._should_rollover(len(data.encode(self.encoding))):
+            self._rollover()
+        self.stream.write(data)
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+def _db_rows(records):
+    """Record → AuditEvent (hanya record yg membawa extra={"audit": {...}})."""
+    from core.models import AuditEvent
+    rows = []
+    for r in records:
+        data = getattr(r, "audit", None)
+        if data:
+            rows.append(AuditEvent(created_at=datetime.fromtimestamp(r.created, tz=dt_timezone.utc), **data))
+    return rows
+
+
+class AsyncAuditHandler(logging.Handler):
+    def __init__(self, filename=None, max_bytes=50 * 1024 * 1024, when="midnight", backup_count=30,
+                 batch_size=500, flush_interval=1.0, queue_size=10000, db=False):
+        super().__init__()
+        self.writer = RotatingWriter(filename, max_bytes, when, backup_count) if filename else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.db = db
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---- sisi request: murah, tanpa I/O ----
+    def emit(self, record):
+        try:
+            record.message = record.getMessage()
+            record.msg, record.args, record.exc_info = record.message, None, None
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    # ---- sisi thread latar ----
+    def _collect(self):
+        """Tunggu record pertama, lalu kumpulkan sampai batch penuh / interval habis."""
+        first = self.queue.get()
+        if first is _STOP:
+            self.queue.task_done()
+            return None
+        batch, deadline = [first], time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.task_done()
+                self.queue.put(_STOP)  # selesaikan batch ini dulu, berhenti di putaran berikut
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write(self, batch):
+        try:
+            if self.writer:
+                self.writer.write_batch([self.format(r) for r in batch])
+            if self.db:
+                self._write_db(batch)
+        except Exception:
+            self.handleError(batch[-1])
+
+    def _write_db(self, batch):
+        from django.db import connection
+        rows = _db_rows(batch)
+        if rows:
+            type(rows[0]).objects.bulk_create(rows, batch_size=self.batch_size)
+        connection.close()  # thread latar tidak ikut siklus request
+
+    def flush(self, timeout: float = 5.0):
+        """Tunggu semua record di antrian selesai ditulis (dipakai test/shutdown)."""
+        end = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and self._thread.is_alive() and time.monotonic() < end:
+            time.sleep(0.01)
+
+    def close(self):
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout=10)
+        if self.writer:
+            self.writer.close()
+        super().close()
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from core import inbox
+
+
+def inbox_counts(request):
+    """
+    Hitungan badge inbox utk navbar. Lazy: query/cache hanya disentuh kalau
+    template benar-benar memakai `inbox_counts`.
+    """
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        return {}
+    return {"inbox_counts": SimpleLazyObject(lambda: inbox.counts(user))}
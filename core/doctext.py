@@ -0,0 +1,114 @@
+"""
+Pipeline teks dokumen (Scan PDF & Asaun Tuir Mai) → DocumentText → indeks pencarian.
+
+  1. Signal memanggil mark_source(): hanya mencatat PENDING bila nama file
+     berubah (tanpa baca file) → re-save surat tanpa file baru = no-op.
+  2. `manage.py extract_document_text` memanggil process_pending():
+     file dibaca di proses utama, ekstraksi (CPU) di ProcessPoolExecutor,
+     hasil disimpan & surat di-index ulang.
+
+Settings:
+  DOCUMENT_OCR_ENABLED = False      # OCR lokal utk scan tanpa layer teks
+  DOCUMENT_OCR_LANG    = "por+eng"
+"""
+from __future__ import annotations
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+from core import search
+from core.models import DocumentText, FollowUp, IncomingLetter
+from core.utils.pdftext import extract_pdf_text
+
+logger = logging.getLogger(__name__)
+
+
+def mark_source(letter_id: int, source: str, source_id: int, file_field) -> None:
+    """Catat/hapus DocumentText utk satu file sumber (dipanggil dari signal)."""
+    name = file_field.name if file_field else ""
+    if not name:
+        DocumentText.objects.filter(source=source, source_id=source_id).delete()
+        return
+    current = (DocumentText.objects.filter(source=source, source_id=source_id)
+               .values_list("file_name", flat=True).first())
+    if current == name:
+        return  # file sama → tidak perlu ekstraksi ulang
+    DocumentText.objects.update_or_create(
+        source=source, source_id=source_id,
+        defaults={
+            "letter_id": letter_id, "file_name": name, "status": "PENDING",
+            "text": "", "error": "", "method": "", "pages": 0, "sha1": "",
+        },
+    )
+
+
+def _file_for(doc: DocumentText):
+    if doc.source == "scan":
+        return IncomingLetter.objects.only("scan_pdf").get(pk=doc.source_id).scan_pdf
+    return FollowUp.objects.only("file").get(pk=doc.source_id).file
+
+
+def _read(doc: DocumentText) -> bytes:
+    f = _file_for(doc)
+    with f.open("rb") as fh:
+        return fh.read()
+
+
+def _store(doc: DocumentText, result: dict) -> None:
+    doc.pages = result["pages"]
+    doc.text = result["text"]
+    doc.method = result["method"]
+    doc.sha1 = result["sha1"]
+    doc.error = result["error"]
+    doc.status = "FAILED" if result["error"] else ("DONE" if result["text"] else "EMPTY")
+    doc.extracted_at = timezone.now()
+    doc.save(update_fields=["pages", "text", "method", "sha1", "error", "status", "extracted_at"])
+
+
+def process_pending(workers: int = 2, limit: int | None = None, retry_failed: bool = False) -> dict:
+    """
+    Ekstrak semua DocumentText PENDING (opsional FAILED).
+    Return statistik: docs, pages, failed, seconds, pages_per_sec.
+    """
+    statuses = ["PENDING", "FAILED"] if retry_failed else ["PENDING"]
+    qs = DocumentText.objects.filter(status__in=statuses).order_by("pk")
+    docs = list(qs[:limit] if limit else qs)
+
+    ocr = getattr(settings, "DOCUMENT_OCR_ENABLED", False)
+    lang = getattr(settings, "DOCUMENT_OCR_LANG", "por+eng")
+    stats = {"docs": 0, "pages": 0, "failed": 0}
+    touched = set()
+    t0 = time.perf_counter()
+
+    # file dibaca per batch supaya memori tidak ikut membesar
+    batch_size = max(workers, 1) * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i in range(0, len(docs), batch_size):
+            futures = {}
+            for doc in docs[i:i + batch_size]:
+                try:
+                    data = _read(doc)
+                except Exception as e:
+                    logger.exception("Gagal baca file %s: %s", doc.file_name, e)
+                    _store(doc, {"pages": 0, "text": "", "method": "", "sha1": "", "error": str(e)[:1000]})
+                    stats["failed"] += 1
+                    continue
+                futures[pool.submit(extract_pdf_text, data, ocr, lang)] = doc
+
+            for fut, doc in futures.items():
+                result = fut.result()
+                _store(doc, result)
+                stats["docs"] += 1
+                stats["pages"] += result["pages"]
+                stats["failed"] += bool(result["error"])
+                touched.add(doc.letter_id)
+
+    # surat yg teksnya berubah → index ulang (teks dokumen ikut dicari)
+    search.index_rows("in", IncomingLetter.objects.filter(pk__in=touched).values("pk", *search.FIELDS["in"]))
+
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    stats["pages_per_sec"] = round(stats["pages"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
@@ -0,0 +1,95 @@
+"""
+FilterSet API (core/api.py) — sama dgn list_filter admin masing-masing model,
+plus ?q= (full-text lewat core/search.py, fallback icontains spt admin).
+
+Tanggal: ?created_at_after=YYYY-MM-DD&created_at_before=YYYY-MM-DD (inklusif),
+diterjemahkan ke batas datetime → tetap bisa pakai indeks (lihat
+core/utils/export.py:filter_date_range).
+"""
+from __future__ import annotations
+
+from functools import reduce
+from operator import or_
+
+import django_filters as filters
+from django.db.models import Q
+
+from core import search
+from core.models import (
+    IncomingLetter, OutgoingLetter, Disposition, DispositionAssignment, ClassificationTag,
+)
+from core.utils.export import filter_date_range
+
+
+class DayRangeFilter(filters.DateFromToRangeFilter):
+    """Rentang tanggal (inklusif) pada field DateTime, sargable: >= awal, < hari berikut."""
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        # DateRangeField mengembalikan datetime awal/akhir hari → ambil tanggalnya saja
+        start, stop = (v.date() if v else None for v in (value.start, value.stop))
+        return filter_date_range(qs, start, stop, self.field_name)
+
+
+class SearchFilterMixin(filters.FilterSet):
+    q = filters.CharFilter(method="filter_q", label="Buka")
+
+    search_kind = None
+    search_fields = ()
+
+    def filter_q(self, qs, name, value):
+        if not value.strip():
+            return qs
+        found = search.filter_queryset(qs, value, self.search_kind) if self.search_kind else None
+        if found is not None:
+            return found
+        return qs.filter(reduce(or_, (Q(**{f"{f}__icontains": value}) for f in self.search_fields)))
+
+
+class IncomingLetterFilter(SearchFilterMixin):
+    created_at = DayRangeFilter()
+    classification_tags = filters.ModelMultipleChoiceFilter(
+        field_name="classification_tags__name", to_field_name="name",
+        queryset=ClassificationTag.objects.all(),
+    )
+
+    search_kind = "in"
+    search_fields = ("agenda_number", "subject", "origin", "origin_number")
+
+    class Meta:
+        model = IncomingLetter
+        fields = ["priority", "status", "received_via", "current_handler", "created_at", "classification_tags"]
+
+
+class OutgoingLetterFilter(SearchFilterMixin):
+    created_at = DayRangeFilter()
+
+    search_kind = "out"
+    search_fields = ("number", "subject", "created_by__username", "created_by__email")
+
+    class Meta:
+        model = OutgoingLetter
+        fields = ["template_type", "status", "created_by", "created_at"]
+
+
+class DispositionFilter(SearchFilterMixin):
+    created_at = DayRangeFilter()
+    due_date = filters.DateFromToRangeFilter()
+
+    search_fields = ("letter__agenda_number", "sender__username", "sender__email")
+
+    class Meta:
+        model = Disposition
+        fields = ["letter", "sender", "allow_parallel", "created_at", "due_date"]
+
+
+class DispositionAssignmentFilter(SearchFilterMixin):
+    read = filters.BooleanFilter(field_name="read_at", lookup_expr="isnull", exclude=True)
+    completed = filters.BooleanFilter(field_name="completed_at", lookup_expr="isnull", exclude=True)
+
+    search_fields = ("disposition__letter__agenda_number", "assignee__username", "assignee__email")
+
+    class Meta:
+        model = DispositionAssignment
+        fields = ["disposition", "disposition__letter", "assignee", "read", "completed"]
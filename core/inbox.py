@@ -0,0 +1,151 @@
+"""
+Inbox tarefa per user, di atas proyeksi InboxItem.
+
+Sinkronisasi (dipanggil dari core/signals.py):
+  - DispositionAssignment dibuat/diubah → upsert satu baris InboxItem
+  - Disposition.due_date / surat (nomor, asuntu, prioridade) berubah →
+    satu UPDATE atas baris terkait
+  - hapus → ikut terhapus (CASCADE)
+Bisa dibangun ulang penuh dgn `rebuild()`.
+
+Hitungan badge navbar (terbuka / belum dibaca / lewat tenggat) di-cache per
+user & hari; di-invalidate setelah commit saat inbox user itu berubah.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import (
+    Disposition, DispositionAssignment, InboxItem, IncomingLetter, PRIORITY_RANK,
+)
+
+
+def _rank(priority: str) -> int:
+    return PRIORITY_RANK.get(priority, PRIORITY_RANK["B"])
+
+
+# ========== SINKRONISASI ==========
+
+def sync_assignment(assignment: DispositionAssignment) -> None:
+    """Upsert baris inbox utk satu tugas (satu SELECT + satu upsert)."""
+    dispo = (Disposition.objects.select_related("letter")
+             .only("due_date", "created_at", "letter__agenda_number", "letter__subject", "letter__priority")
+             .get(pk=assignment.disposition_id))
+    letter = dispo.letter
+    old = InboxItem.objects.filter(pk=assignment.pk).values_list("assignee_id", flat=True).first()
+    InboxItem.objects.update_or_create(
+        assignment_id=assignment.pk,
+        defaults={
+            "assignee_id": assignment.assignee_id,
+            "disposition_id": dispo.pk,
+            "letter_id": letter.pk,
+            "agenda_number": letter.agenda_number,
+            "subject": letter.subject,
+            "priority": letter.priority,
+            "priority_rank": _rank(letter.priority),
+            "due_date": dispo.due_date,
+            "assigned_at": dispo.created_at,
+            "read_at": assignment.read_at,
+            "completed_at": assignment.completed_at,
+        },
+    )
+    invalidate_counts(assignment.assignee_id, old)
+
+
+def sync_assignment_state(assignment: DispositionAssignment) -> None:
+    """Jalur cepat (save(update_fields=[read_at/completed_at])): satu UPDATE."""
+    updated = InboxItem.objects.filter(pk=assignment.pk).update(
+        read_at=assignment.read_at, completed_at=assignment.completed_at,
+    )
+    if not updated:
+        return sync_assignment(assignment)
+    invalidate_counts(assignment.assignee_id)
+
+
+def sync_disposition(dispo: Disposition) -> None:
+    items = InboxItem.objects.filter(disposition_id=dispo.pk)
+    if items.exclude(due_date=dispo.due_date).update(due_date=dispo.due_date):
+        invalidate_counts(*items.values_list("assignee_id", flat=True))
+
+
+def sync_letter(letter: IncomingLetter) -> None:
+    InboxItem.objects.filter(letter_id=letter.pk).exclude(
+        agenda_number=letter.agenda_number, subject=letter.subject, priority=letter.priority,
+    ).update(
+        agenda_number=letter.agenda_number, subject=letter.subject,
+        priority=letter.priority, priority_rank=_rank(letter.priority),
+    )
+
+
+def rebuild(batch_size: int = 2000) -> int:
+    """Bangun ulang seluruh proyeksi dari DispositionAssignment."""
+    rows = (DispositionAssignment.objects.order_by("pk").values(
+        "pk", "assignee_id", "disposition_id", "read_at", "completed_at",
+        "disposition__letter_id", "disposition__due_date", "disposition__created_at",
+        "disposition__letter__agenda_number", "disposition__letter__subject",
+        "disposition__letter__priority",
+    ).iterator(chunk_size=batch_size))
+    items = [InboxItem(
+        assignment_id=r["pk"], assignee_id=r["assignee_id"], disposition_id=r["disposition_id"],
+        letter_id=r["disposition__letter_id"], agenda_number=r["disposition__letter__agenda_number"],
+        subject=r["disposition__letter__subject"], priority=r["disposition__letter__priority"],
+        priority_rank=_rank(r["disposition__letter__priority"]), due_date=r["disposition__due_date"],
+        assigned_at=r["disposition__created_at"], read_at=r["read_at"], completed_at=r["completed_at"],
+    ) for r in rows]
+    with transaction.atomic():
+        InboxItem.objects.all().delete()
+        InboxItem.objects.bulk_create(items, batch_size=batch_size)
+    return len(items)
+
+
+# ========== BACA ==========
+
+def open_items(user):
+    """Tugas terbuka user, urut tenggat lalu prioritas (pakai core_inbox_open_idx)."""
+    return InboxItem.objects.filter(assignee=user, completed_at__isnull=True)
+
+
+SHOW_CHOICES = ("open", "unread", "overdue", "done", "all")
+
+
+def items(user, show: str = "open"):
+    """Tab inbox: open / unread / overdue / done / all (nilai lain → open)."""
+    if show in ("all", "done"):
+        # riwayat: terbaru dulu (core_inbox_all_idx)
+        qs = InboxItem.objects.filter(assignee=user).order_by("-assigned_at")
+        return qs.exclude(completed_at=None) if show == "done" else qs
+    qs = open_items(user)
+    if show == "unread":
+        return qs.filter(read_at__isnull=True)
+    if show == "overdue":
+        return qs.filter(due_date__lt=timezone.localdate())
+    return qs
+
+
+def _counts_key(user_id: int, day) -> str:
+    return f"inbox:counts:{user_id}:{day:%Y%m%d}"
+
+
+def counts(user) -> dict:
+    """{"open", "unread", "overdue"} utk badge navbar — satu query agregasi, di-cache."""
+    today = timezone.localdate()
+    key = _counts_key(user.pk, today)
+    data = cache.get(key)
+    if data is None:
+        data = open_items(user).aggregate(
+            open=Count("pk"),
+            unread=Count("pk", filter=Q(read_at__isnull=True)),
+            overdue=Count("pk", filter=Q(due_date__lt=today)),
+        )
+        cache.set(key, data, getattr(settings, "INBOX_COUNTS_TTL", 300))
+    return data
+
+
+def invalidate_counts(*user_ids) -> None:
+    keys = [_counts_key(uid, timezone.localdate()) for uid in set(user_ids) if uid]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
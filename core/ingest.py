@@ -0,0 +1,279 @@
+"""
+Import massal Karta Tama (API `POST /api/v1/incoming/bulk/` & `manage.py import_incoming`).
+
+Per batch (default 500 baris):
+  1. validasi tiap baris (field model + tag + file scan) tanpa query per baris;
+     duplikat (origin, origin_number, origin_date) dicek satu query per batch;
+  2. pesan blok nomor agenda (satu UPDATE), simpan file scan, bulk_create
+     surat + relasi tag;
+  3. efek yg biasanya dikerjakan signal post_save dikerjakan massal: rekap
+     harian, indeks full-text, antrian ekstraksi teks, job QR/barcode
+     (dirender worker setelah commit), audit, cache dashboard/verifikasi.
+
+Baris yg gagal dilaporkan (nomor baris + pesan) tanpa membatalkan baris lain.
+Kalau bulk_create gagal di DB (mis. constraint), batch itu diulang per baris
+lewat save() biasa supaya baris yg bermasalah saja yg ditolak.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import DatabaseError, transaction
+
+from core import audit, rollup, search, verify
+from core.jobs import enqueue_render_many
+from core.models import ClassificationTag, DocumentText, IncomingLetter
+from core.utils.numbering import reserve_agenda_numbers
+from core.utils.stats import invalidate_dashboard
+
+FIELDS = (
+    "received_via", "origin", "origin_number", "origin_date", "subject", "priority",
+    "status", "retention_class", "retention_until",
+)
+TAG_SEPARATOR = ";"
+
+
+# ========== BACA FILE ==========
+
+def read_rows(fh, name: str = ""):
+    """
+    CSV (header = nama field) atau JSONL (satu objek per baris), dari ekstensi nama file.
+    Baris yg tidak terbaca (JSON rusak, bukan UTF-8) di-yield sbg ValueError →
+    dilaporkan per baris oleh ingest(), baris lain tetap diproses.
+    """
+    if name.lower().endswith((".jsonl", ".ndjson", ".json")):
+        for line in fh:
+            try:
+                line = line.decode("utf-8-sig") if isinstance(line, bytes) else line
+            except UnicodeDecodeError:
+                yield ValueError("Liña ne'e la'ós UTF-8.")
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"JSON la válidu: {e}")
+        return
+
+    bad = set()  # nomor baris fisik yg bukan UTF-8
+
+    def lines():
+        for number, line in enumerate(fh, start=1):
+            if isinstance(line, bytes):
+                try:
+                    line = line.decode("utf-8-sig" if number == 1 else "utf-8")
+                except UnicodeDecodeError:
+                    bad.add(number)
+                    line = line.decode("utf-8", "replace")
+            yield line
+
+    reader, last = csv.DictReader(lines()), 0
+    for row in reader:
+        # satu record CSV bisa lebih dari satu baris fisik (field ber-kutip)
+        if bad.intersection(range(last + 1, reader.line_num + 1)):
+            row = ValueError("Liña ne'e la'ós UTF-8.")
+        last = reader.line_num
+        yield row
+
+
+# ========== VALIDASI ==========
+
+class _Batch:
+    """Konteks validasi satu batch: tag & file scan di-resolve sekali."""
+
+    def __init__(self, user, scan_dir, files):
+        self.user = user
+        self.scan_dir = scan_dir
+        self.files = files or {}
+        self.used = set()  # nama file upload yg dirujuk baris
+        self.tags = dict(ClassificationTag.objects.values_list("name", "pk"))
+
+    def tag_names(self, raw) -> list[str]:
+        if not raw:
+            return []
+        names = raw if isinstance(raw, list) else str(raw).split(TAG_SEPARATOR)
+        names = [n.strip() for n in names if n and n.strip()]
+        unknown = [n for n in names if n not in self.tags]
+        if unknown:
+            raise ValidationError({"classification_tags": f"Klasifikasaun la iha: {', '.join(unknown)}"})
+        return names
+
+    def scan(self, name):
+        if not name:
+            return None
+        if not str(name).lower().endswith(".pdf"):
+            raise ValidationError({"scan_pdf": "Scan tenke PDF."})
+        if name in self.files:
+            self.used.add(name)
+            found = self.files[name]
+            if isinstance(found, list):
+                if len(found) > 1:
+                    raise ValidationError({"scan_pdf": f"Ficheiru '{name}' upload dala {len(found)} (naran hanesan)."})
+                found = found[0]
+            return found
+        path = os.path.join(self.scan_dir or "", os.path.basename(name))
+        if not self.scan_dir or not os.path.isfile(path):
+            raise ValidationError({"scan_pdf": f"Ficheiru la hetan: {name}"})
+        return path
+
+    def build(self, row: dict):
+        """Baris → (IncomingLetter belum disimpan, [tag], scan) atau ValidationError."""
+        letter = IncomingLetter(
+            created_by=self.user,
+            **{f: row[f] for f in FIELDS if row.get(f) not in (None, "")},
+        )
+        errors = {}
+        try:
+            tags = self.tag_names(row.get("classification_tags"))
+        except ValidationError as e:
+            errors.update(e.message_dict)
+            tags = []
+        try:
+            scan = self.scan(row.get("scan_pdf"))
+        except ValidationError as e:
+            errors.update(e.message_dict)
+            scan = None
+        try:
+            # unik, constraint & FK dicek DB saat insert; di sini hanya tipe/pilihan/panjang
+            letter.full_clean(exclude=["agenda_number", "created_by"],
+                              validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            errors.update(e.message_dict)
+        if errors:
+            raise ValidationError(errors)
+        return letter, tags, scan
+
+
+def _duplicates(letters) -> set[tuple]:
+    """(origin, origin_number, origin_date) yg sudah ada di DB — satu query per batch."""
+    keys = {(l.origin, l.origin_number, l.origin_date) for l in letters}
+    existing = (IncomingLetter.objects
+                .filter(origin_number__in={k[1] for k in keys})
+                .values_list("origin", "origin_number", "origin_date"))
+    return keys & set(existing)
+
+
+# ========== SIMPAN ==========
+
+def _store_scan(letter, scan) -> None:
+    if scan is None or letter.scan_pdf:
+        return
+    if isinstance(scan, str):
+        with open(scan, "rb") as fh:
+            letter.scan_pdf.save(os.path.basename(scan), File(fh), save=False)
+    else:
+        letter.scan_pdf.save(scan.name, scan, save=False)
+
+
+def _after_insert(letters, tags_by_pk) -> None:
+    """Efek signal post_save, versi massal."""
+    rollup.on_bulk_create(letters, tags_by_pk)
+    search.index_rows("in", ({"pk": l.pk, **{f: getattr(l, f) for f in search.FIELDS["in"]}}
+                             for l in letters), with_docs=False)
+    DocumentText.objects.bulk_create([
+        DocumentText(letter_id=l.pk, source="scan", source_id=l.pk, file_name=l.scan_pdf.name)
+        for l in letters if l.scan_pdf
+    ])
+    if getattr(settings, "CODE_STORE_IMAGES", False):
+        enqueue_render_many("in", [l.pk for l in letters])
+    for l in letters:
+        audit.record_on_commit("create", l, extra={"status": l.status, "source": "import"})
+    invalidate_dashboard()
+    verify.invalidate(*(l.agenda_number for l in letters))
+
+
+def _insert_batch(items, tag_ids: dict) -> list[IncomingLetter]:
+    """bulk_create satu batch (sudah valid) dalam satu transaksi."""
+    through = IncomingLetter.classification_tags.through
+    with transaction.atomic():
+        numbers = reserve_agenda_numbers(len(items))
+        for (letter, _, scan), number in zip(items, numbers):
+            letter.agenda_number = number
+            _store_scan(letter, scan)
+        letters = IncomingLetter.objects.bulk_create([letter for letter, _, _ in items])
+        tags_by_pk = {l.pk: tags for l, (_, tags, _) in zip(letters, items) if tags}
+        through.objects.bulk_create([
+            through(incomingletter_id=pk, classificationtag_id=tag_ids[name])
+            for pk, names in tags_by_pk.items() for name in names
+        ])
+        _after_insert(letters, tags_by_pk)
+    return letters
+
+
+def _insert_one(letter, tags, scan) -> IncomingLetter:
+    """Jalur lambat (save + signal) utk mengisolasi baris yg ditolak DB."""
+    letter.agenda_number = ""  # nomor dari blok yg di-rollback → ambil baru di pre_save
+    with transaction.atomic():
+        _store_scan(letter, scan)
+        letter.save()
+        if tags:
+            letter.classification_tags.set(ClassificationTag.objects.filter(name__in=tags))
+    return letter
+
+
+def ingest(rows, *, user=None, scan_dir=None, files=None, batch_size: int = 500) -> dict:
+    """
+    Import iterable dict `rows`. File scan dicari di `scan_dir` (command) atau
+    `files` {nama: UploadedFile | [UploadedFile, ...]} (API; nama ganda → baris ditolak).
+    Return {"created", "ids", "errors": [{"row", "errors"}], "unused_files"}
+    (unused_files = file upload yg tidak dirujuk baris mana pun).
+    """
+    report = {"created": 0, "ids": [], "errors": [], "unused_files": []}
+    ctx = _Batch(user, scan_dir, files)
+
+    def flush(batch):
+        items, seen = [], set()
+        for number, row in batch:
+            if isinstance(row, Exception) or not isinstance(row, dict):
+                message = str(row) if isinstance(row, Exception) else "Liña tenke objetu (JSON object)."
+                report["errors"].append({"row": number, "errors": {"__all__": [message]}})
+                continue
+            try:
+                item = ctx.build(row)
+            except ValidationError as e:
+                report["errors"].append({"row": number, "errors": e.message_dict})
+                continue
+            except (TypeError, ValueError) as e:  # tipe nilai aneh (list/dict di field teks, dst.)
+                report["errors"].append({"row": number, "errors": {"__all__": [str(e)]}})
+                continue
+            items.append((number, item))
+        dupes = _duplicates([letter for _, (letter, _, _) in items])
+        valid = []
+        for number, item in items:
+            letter = item[0]
+            key = (letter.origin, letter.origin_number, letter.origin_date)
+            if key in dupes or key in seen:
+                report["errors"].append({"row": number, "errors": {"__all__": ["Karta ne'e rejista tiha ona."]}})
+                continue
+            seen.add(key)
+            valid.append((number, item))
+        if not valid:
+            return
+        try:
+            letters = _insert_batch([item for _, item in valid], ctx.tags)
+        except DatabaseError:
+            letters = []
+            for number, item in valid:
+                try:
+                    letters.append(_insert_one(*item))
+                except DatabaseError as e:
+                    report["errors"].append({"row": number, "errors": {"__all__": [str(e)]}})
+        report["created"] += len(letters)
+        report["ids"] += [l.pk for l in letters]
+
+    batch = []
+    for number, row in enumerate(rows, start=1):
+        batch.append((number, row))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    report["unused_files"] = sorted(set(ctx.files) - ctx.used)
+    return report
@@ -0,0 +1,186 @@
+"""
+Antrian job rendering QR/barcode.
+
+Alur:
+  - Signal post_save hanya mencatat RenderJob (di transaksi yg sama dgn surat).
+  - Setelah commit, job id dikirim ke thread pool → admin langsung selesai,
+    gambar muncul beberapa saat kemudian.
+  - Job yg gagal / tertinggal (server restart) dikuras lagi dengan
+    `python manage.py render_codes`.
+
+Settings:
+  CODE_RENDER_ASYNC   = True   # False → render langsung setelah commit (tanpa thread; dipakai test)
+  CODE_RENDER_WORKERS = 2      # ukuran thread pool
+
+Thread pool dibuat sekali per proses saat job pertama (bukan saat import):
+setelah fork (worker gunicorn/uwsgi) pool induk dibuang & dibuat ulang,
+saat proses berhenti job yg belum jalan dibatalkan — tetap PENDING di DB,
+diambil `render_codes` berikutnya.
+"""
+from __future__ import annotations
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from core.models import IncomingLetter, OutgoingLetter, RenderJob
+from core.utils.qr import make_qr_png
+from core.verify import qr_url
+from core.utils.barcode import make_code128_png
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "CODE_RENDER_WORKERS", 2),
+                thread_name_prefix="render-codes",
+            )
+        return _executor
+
+
+def _reset_executor() -> None:
+    # anak hasil fork tidak mewarisi thread worker → pool lama tidak bisa dipakai
+    global _executor, _executor_lock
+    _executor, _executor_lock = None, threading.Lock()
+
+
+def shutdown(wait: bool = False) -> None:
+    """Hentikan pool; job yg belum mulai dibatalkan (tetap PENDING di DB)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+# ========== RENDER ==========
+
+def _render_incoming(pk: int) -> None:
+    letter = IncomingLetter.objects.filter(pk=pk).only(
+        "pk", "agenda_number", "status", "created_at", "qr_image", "barcode_image"
+    ).first()
+    if not letter or not letter.agenda_number:
+        return
+
+    fields = {}
+    # URL verifikasi publik menggunakan nomor agenda (stabil), + token bila VERIFY_SIGNED_QR
+    if not letter.qr_image:
+        qr = make_qr_png(qr_url(letter.agenda_number, letter.status, timezone.localdate(letter.created_at)))
+        letter.qr_image.save(f"qr_in_{pk}.png", qr, save=False)
+        fields["qr_image"] = letter.qr_image.name
+    # Barcode pakai nomor agenda
+    if not letter.barcode_image:
+        bc = make_code128_png(letter.agenda_number)
+        letter.barcode_image.save(f"bc_in_{pk}.png", bc, save=False)
+        fields["barcode_image"] = letter.barcode_image.name
+
+    # update() → tidak memicu signal/save() kedua
+    if fields:
+        IncomingLetter.objects.filter(pk=pk).update(**fields)
+
+
+def _render_outgoing(pk: int) -> None:
+    letter = OutgoingLetter.objects.filter(pk=pk).only("pk", "number", "status", "created_at", "qr_image").first()
+    if not letter or not letter.number or letter.qr_image:
+        return
+    qr = make_qr_png(qr_url(letter.number, letter.status, timezone.localdate(letter.created_at)))
+    letter.qr_image.save(f"qr_out_{pk}.png", qr, save=False)
+    OutgoingLetter.objects.filter(pk=pk).update(qr_image=letter.qr_image.name)
+
+
+RENDERERS = {"in": _render_incoming, "out": _render_outgoing}
+
+
+def run_job(job_id: int) -> bool:
+    """Jalankan satu job. Return True kalau sukses."""
+    job = RenderJob.objects.filter(pk=job_id).first()
+    if job is None or job.status == "DONE":
+        return True
+    job.attempts += 1
+    try:
+        RENDERERS[job.kind](job.object_id)
+    except Exception as e:
+        logger.exception("Gagal render QR/Barcode %s id=%s: %s", job.kind, job.object_id, e)
+        job.status, job.last_error = "FAILED", str(e)[:1000]
+    else:
+        job.status, job.last_error = "DONE", ""
+    job.save(update_fields=["status", "attempts", "last_error", "updated_at"])
+    return job.status == "DONE"
+
+
+def _run_in_worker(job_id: int) -> None:
+    # Thread worker punya koneksi DB sendiri → tutup setelah selesai
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+# ========== ENQUEUE ==========
+
+def enqueue_render(kind: str, object_id: int) -> None:
+    """
+    Catat job (idempoten per surat) lalu jadwalkan eksekusi setelah commit.
+    Aman dipanggil dari signal post_save.
+    """
+    job, _ = RenderJob.objects.update_or_create(
+        kind=kind, object_id=object_id,
+        defaults={"status": "PENDING"},
+    )
+    if getattr(settings, "CODE_RENDER_ASYNC", True):
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.pk))
+    else:
+        transaction.on_commit(lambda: run_job(job.pk))
+
+
+def enqueue_render_many(kind: str, object_ids) -> None:
+    """Versi massal enqueue_render (import): satu bulk_create, eksekusi setelah commit."""
+    object_ids = list(object_ids)
+    if not object_ids:
+        return
+    RenderJob.objects.bulk_create(
+        [RenderJob(kind=kind, object_id=pk) for pk in object_ids],
+        update_conflicts=True, unique_fields=["kind", "object_id"], update_fields=["status"],
+    )
+    job_ids = list(RenderJob.objects.filter(kind=kind, object_id__in=object_ids).values_list("pk", flat=True))
+    if getattr(settings, "CODE_RENDER_ASYNC", True):
+        transaction.on_commit(lambda: [_get_executor().submit(_run_in_worker, pk) for pk in job_ids])
+    else:
+        transaction.on_commit(lambda: [run_job(pk) for pk in job_ids])
+
+
+def drain(include_failed: bool = False, limit: int | None = None, max_attempts: int | None = None):
+    """
+    Jalankan job PENDING (dan FAILED bila diminta) secara sinkron.
+    Return (ok, failed).
+    """
+    statuses = ["PENDING", "FAILED"] if include_failed else ["PENDING"]
+    qs = RenderJob.objects.filter(status__in=statuses).order_by("created_at")
+    if max_attempts:
+        qs = qs.filter(attempts__lt=max_attempts)
+    ids = list(qs.values_list("pk", flat=True)[:limit] if limit else qs.values_list("pk", flat=True))
+    ok = failed = 0
+    for job_id in ids:
+        if run_job(job_id):
+            ok += 1
+        else:
+            failed += 1
+    return ok, failed
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from core.utils.codes import render_code
+
+class Command(BaseCommand):
+    help = "Micro-benchmark render QR/Barcode: PNG (Pillow) vs SVG (vektor)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--number", type=int, default=200, help="Jumlah render per kombinasi")
+
+    def handle(self, *args, **opts):
+        n = opts["number"]
+        codes = [f"AGD/2026/{i:06d}" for i in range(1, n + 1)]
+        self.stdout.write(f"{'jenis':<8} {'format':<6} {'ms/render':>10} {'rata2 byte':>11}")
+        for kind in ("qr", "barcode"):
+            for fmt in ("png", "svg"):
+                size = 0
+                t0 = time.perf_counter()
+                for code in codes:
+                    size += len(render_code(kind, code, fmt))
+                ms = (time.perf_counter() - t0) * 1000 / n
+                self.stdout.write(f"{kind:<8} {fmt:<6} {ms:>10.2f} {size // n:>11}")
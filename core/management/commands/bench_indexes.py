@@ -0,0 +1,141 @@
+"""
+Benchmark index pola akses utama: EXPLAIN + waktu query, dgn & tanpa index
+dari migrasi 0016 (di-DROP sementara dalam transaksi lalu di-rollback).
+
+    python manage.py bench_indexes --seed 20000      # isi data sintetis dulu (core/synth.py)
+    python manage.py bench_indexes --repeat 50       # pakai data yg sudah ada
+
+--seed MENULIS ke DB yg dikonfigurasi → jalankan di salinan / DB lokal.
+Di PostgreSQL, DROP INDEX mengunci tabel selama benchmark (jangan di produksi).
+"""
+import datetime
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core import sla, synth
+from core.models import (
+    IncomingLetter, OutgoingLetter, Disposition, DispositionAssignment, ReviewStep,
+)
+
+# index yg diukur (model, nama) — lihat Meta.indexes / migrasi 0016
+TARGETS = [
+    (IncomingLetter, ["current_handler", "status"]),
+    (IncomingLetter, "core_in_retention_idx"),
+    (OutgoingLetter, "core_out_retention_idx"),
+    (Disposition, "core_dispo_due_idx"),
+    (DispositionAssignment, ["assignee", "completed_at"]),
+    (DispositionAssignment, "core_assign_open_idx"),
+    (ReviewStep, ["reviewer", "approved_at"]),
+]
+
+
+def target_indexes():
+    """[(model, nama index)] sesuai Meta.indexes (nama otomatis di-resolve)."""
+    found = []
+    for model, key in TARGETS:
+        for index in model._meta.indexes:
+            if index.name == key or list(index.fields) == key:
+                found.append((model, index.name))
+    return found
+
+
+def queries(user, today):
+    """Query nyata per pola akses: (label, queryset)."""
+    return [
+        ("karta iha responsável", IncomingLetter.objects.filter(current_handler=user, status="REG")
+            .order_by("-created_at")[:50]),
+        ("sapuan retensi (tama)", IncomingLetter.objects.filter(retention_until__lte=today)
+            .order_by("retention_until").values("pk")[:500]),
+        ("sapuan retensi (sai)", OutgoingLetter.objects.filter(retention_until__lte=today)
+            .order_by("retention_until").values("pk")[:500]),
+        ("despacho liu prazu", Disposition.objects.filter(
+            due_date__range=(today - datetime.timedelta(days=7), today)).values("pk")),
+        ("tarefa loke user", DispositionAssignment.objects.filter(assignee=user, completed_at__isnull=True)
+            .values("pk", "disposition_id")),
+        ("pengingat SLA", sla.pending(today, include_notified=True)),
+        ("paraf pendente", ReviewStep.objects.filter(reviewer=user, approved_at__isnull=True)
+            .values("pk", "letter_id")),
+    ]
+
+
+def explain(qs, tag: str) -> str:
+    """
+    EXPLAIN lewat SQL mentah; komentar `tag` membuat teks SQL beda per fase
+    (cache statement sqlite3 bisa mengembalikan rencana lama setelah DROP INDEX).
+    """
+    sql, params = qs.query.sql_with_params()
+    with connection.cursor() as cur:
+        cur.execute(f"{connection.ops.explain_query_prefix()} /* {tag} */ {sql}", params)
+        return "\n".join(" ".join(str(col) for col in row) for row in cur.fetchall())
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN & waktu query pola akses utama, dgn vs tanpa index baru (migrasi 0016)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Buat N surat masuk sintetis dulu (0 = pakai data ada)")
+        parser.add_argument("--repeat", type=int, default=20, help="Ulangan per query (median dilaporkan)")
+        parser.add_argument("--no-explain", action="store_true", help="Tanpa cetak rencana EXPLAIN")
+
+    def handle(self, *args, **opts):
+        if opts["seed"]:
+            self.seed(opts["seed"])
+        self.analyze()
+
+        # user dgn tugas terbuka terbanyak → kasus terberat yg realistis
+        user_id = (DispositionAssignment.objects.filter(completed_at__isnull=True)
+                   .values("assignee_id").annotate(n=Count("pk")).order_by("-n")
+                   .values_list("assignee_id", flat=True).first())
+        if user_id is None:
+            raise CommandError("Seidauk iha dadus. Uza --seed N.")
+        user = User.objects.get(pk=user_id)
+        today = timezone.localdate()
+
+        after = self.measure(user, today, opts["repeat"], "dgn")
+        indexes = target_indexes()
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                for _, name in indexes:
+                    cur.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+            before = self.measure(user, today, opts["repeat"], "tanpa")
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"index diukur: {', '.join(name for _, name in indexes)}\n")
+        self.stdout.write(f"{'query':<24} {'tanpa ms':>10} {'dgn ms':>10} {'x':>6}")
+        for label in after:
+            b, a = before[label]["ms"], after[label]["ms"]
+            self.stdout.write(f"{label:<24} {b:>10.3f} {a:>10.3f} {b / a if a else 0:>6.1f}")
+        if opts["no_explain"]:
+            return
+        for label in after:
+            self.stdout.write(f"\n== {label}")
+            self.stdout.write("-- tanpa index baru:\n" + before[label]["plan"])
+            self.stdout.write("-- dgn index baru:\n" + after[label]["plan"])
+
+    def measure(self, user, today, repeat, tag):
+        result = {}
+        for label, qs in queries(user, today):
+            plan = explain(qs, tag)
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                list(qs._chain())  # salinan baru → tanpa result cache
+                times.append((time.perf_counter() - t0) * 1000)
+            result[label] = {"ms": statistics.median(times), "plan": plan}
+        return result
+
+    def analyze(self):
+        # statistik planner segar supaya pilihan index mencerminkan data
+        with connection.cursor() as cur:
+            cur.execute("ANALYZE")
+
+    def seed(self, n):
+        """~n surat masuk sintetis, 3 tahun (lihat core/synth.py)."""
+        counts = synth.generate(years=3, per_day=n / (3 * 265))
+        self.stdout.write("seed: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
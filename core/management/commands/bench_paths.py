@@ -0,0 +1,187 @@
+"""
+Benchmark jalur utama aplikasi, hasil JSON utk dilacak antar commit.
+
+    python manage.py generate_data --years 3          # sekali, di DB lokal
+    python manage.py bench_paths --repeat 30 --json bench/$(git rev-parse --short HEAD).json
+    python manage.py bench_paths --only list. --only verify.
+
+Jalur: penomoran, halaman daftar (portal/admin/API), detail, dashboard
+(cache dingin & hangat), export CSV/XLSX, verifikasi publik.
+Semua dijalankan lewat test Client di dalam satu transaksi yg di-rollback
+(user benchmark, nomor yg terpakai, dsb. tidak tertinggal di DB).
+"""
+import datetime
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import verify
+from core.audit import AsyncAuditHandler
+from core.models import IncomingLetter, OutgoingLetter
+from core.utils import stats
+from core.utils.numbering import generate_agenda_number, reserve_agenda_numbers
+
+SAMPLE = 20
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = "Benchmark jalur utama (penomoran, daftar, detail, dashboard, export, verifikasi) → JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Ulangan per kasus (setelah pemanasan)")
+        parser.add_argument("--only", action="append", default=[], help="Hanya kasus berawalan ini (boleh berulang)")
+        parser.add_argument("--json", dest="json_path", help="Tulis hasil ke file JSON (default: stdout)")
+
+    def handle(self, *args, **opts):
+        if not IncomingLetter.objects.exists() or not OutgoingLetter.objects.exists():
+            raise CommandError("Seidauk iha dadus. Uza `manage.py generate_data` uluk.")
+        # sink DB audit menulis dari thread lain → bentrok dgn transaksi benchmark yg terbuka
+        handlers = [h for h in logging.getLogger("audit").handlers if isinstance(h, AsyncAuditHandler)]
+        saved = [h.db for h in handlers]
+        for h in handlers:
+            h.db = False
+        try:
+            # rate limit verifikasi publik dimatikan: benchmark memanggilnya ratusan kali
+            with override_settings(VERIFY_RATE_PER_SEC=10**6, VERIFY_RATE_BURST=10**9), transaction.atomic():
+                results = self.run_cases(opts["repeat"], opts["only"])
+                transaction.set_rollback(True)
+        finally:
+            for h, db in zip(handlers, saved):
+                h.db = db
+
+        report = {
+            "timestamp": timezone.now().isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "rows": {
+                "incoming": IncomingLetter.objects.count(),
+                "outgoing": OutgoingLetter.objects.count(),
+            },
+            "repeat": opts["repeat"],
+            "results": results,
+        }
+        self.print_table(results)
+        data = json.dumps(report, indent=2, ensure_ascii=False)
+        if opts["json_path"]:
+            with open(opts["json_path"], "w", encoding="utf-8") as fh:
+                fh.write(data + "\n")
+            self.stderr.write(f"JSON → {opts['json_path']}")
+        else:
+            self.stdout.write(data)
+
+    # ---------- kasus ----------
+
+    def cases(self):
+        user = User.objects.create_superuser("bench_paths", "bench@example.org", None)
+        client = Client(HTTP_HOST="localhost")
+        client.force_login(user)
+        public = Client(HTTP_HOST="localhost")
+
+        incoming = list(IncomingLetter.objects.order_by("?").values_list("pk", "agenda_number")[:SAMPLE])
+        outgoing = list(OutgoingLetter.objects.exclude(number=None).order_by("?")
+                        .values_list("pk", "number")[:SAMPLE])
+        today = timezone.localdate()
+        month = f"?from={today - datetime.timedelta(days=30)}&to={today}"
+
+        def get(url_or_fn, client=client):
+            def case(i):
+                url = url_or_fn(i) if callable(url_or_fn) else url_or_fn
+                response = client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                if response.status_code != 200:
+                    raise CommandError(f"{url}: HTTP {response.status_code}")
+            return case
+
+        def cold(fn, reset):
+            def case(i):
+                reset()
+                fn(i)
+            return case
+
+        incoming_detail = get(lambda i: reverse("admin_incoming_detail", args=[incoming[i % len(incoming)][0]]))
+        verify_page = get(lambda i: reverse("verify_document", args=[incoming[i % len(incoming)][1]]), public)
+        dashboard = get(reverse("admin_home"))
+
+        # hapus langsung (bukan invalidate_*: on_commit tidak jalan di transaksi
+        # benchmark) & hanya key kasus ini → cache lain tetap hangat
+        def drop_dashboard():
+            cache.delete(stats._key(timezone.localdate()))
+
+        def drop_verify():
+            cache.delete_many([verify._key(code) for _, code in incoming])
+        return {
+            "numbering.agenda": lambda i: generate_agenda_number(),
+            "numbering.block_100": lambda i: reserve_agenda_numbers(100),
+            "list.portal_incoming": get(reverse("incoming_list")),
+            "list.admin_incoming": get(reverse("admin:core_incomingletter_changelist")),
+            "list.admin_outgoing": get(reverse("admin:core_outgoingletter_changelist")),
+            "list.admin_incoming_search": get(reverse("admin:core_incomingletter_changelist") + "?q=orsamentu"),
+            "list.api_incoming": get(reverse("api-incoming-list") + "?page_size=50"),
+            "list.inbox": get(reverse("admin_inbox")),
+            "detail.incoming": incoming_detail,
+            "detail.outgoing": get(lambda i: reverse("admin_outgoing_detail", args=[outgoing[i % len(outgoing)][0]])),
+            "dashboard.cold": cold(dashboard, drop_dashboard),
+            "dashboard.warm": dashboard,
+            "export.incoming_csv_30d": get(reverse("admin_export_agenda", args=["incoming"]) + month),
+            "export.outgoing_xlsx_30d": get(reverse("admin_export_agenda", args=["outgoing"]) + month + "&format=xlsx"),
+            "verify.cold": cold(verify_page, drop_verify),
+            "verify.warm": verify_page,
+        }
+
+    def run_cases(self, repeat, only):
+        results = {}
+        for name, case in self.cases().items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            # pemanasan atas semua sampel → kasus *.warm benar-benar dari cache
+            for i in range(min(repeat, SAMPLE)):
+                case(i)
+            times, queries = [], []
+            for i in range(repeat):
+                with CaptureQueriesContext(connection) as ctx:
+                    t0 = time.perf_counter()
+                    case(i)
+                    times.append((time.perf_counter() - t0) * 1000)
+                queries.append(len(ctx))
+            results[name] = {
+                "mean_ms": round(statistics.fmean(times), 3),
+                "p50_ms": round(_pct(times, 50), 3),
+                "p95_ms": round(_pct(times, 95), 3),
+                "max_ms": round(max(times), 3),
+                "queries": max(queries),
+            }
+        return results
+
+    def print_table(self, results):
+        self.stderr.write(f"{'kasus':<28} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'query':>6}")
+        for name, r in results.items():
+            self.stderr.write(f"{name:<28} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['max_ms']:>9.2f} {r['queries']:>6}")
@@ -1,16 +1,50 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from core.models import IncomingLetter
+from core.utils.export import filter_date_range, iter_rows, write_xlsx
 import csv, os
 
+# Kolom & nilai tetap seperti format lama (status = kode mentah, tanpa Priority):
+# file ini dibaca proses lain. Label tampilan ada di export admin (INCOMING_COLUMNS).
+COLUMNS = [
+    ("Agenda", "agenda_number", None),
+    ("Subject", "subject", None),
+    ("Origin", "origin", None),
+    ("Status", "status", None),
+    ("Created", "created_at", None),
+]
+
 class Command(BaseCommand):
-    help = "Export Buku Agenda Karta Tama bulan ini ke CSV"
+    help = "Export Buku Agenda Karta Tama ke CSV/XLSX (default: bulan ini)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="Tanggal awal YYYY-MM-DD (inklusif)")
+        parser.add_argument("--to", dest="date_to", help="Tanggal akhir YYYY-MM-DD (inklusif)")
+        parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+        parser.add_argument("-o", "--output", help="Nama file output")
+
+    def handle(self, *args, **opts):
+        now = timezone.localtime()
+        date_from, date_to = opts["date_from"], opts["date_to"]
+        if date_from or date_to:
+            date_from = parse_date(date_from) if date_from else None
+            date_to = parse_date(date_to) if date_to else None
+            if (opts["date_from"] and not date_from) or (opts["date_to"] and not date_to):
+                raise CommandError("Format tanggal harus YYYY-MM-DD.")
+            qs = filter_date_range(IncomingLetter.objects.all(), date_from, date_to)
+            stem = f"agenda_incoming_{date_from or 'awal'}_{date_to or 'akhir'}"
+        else:
+            qs = IncomingLetter.objects.filter(created_at__year=now.year, created_at__month=now.month)
+            stem = f"agenda_incoming_{now.strftime('%Y_%m')}"
+        qs = qs.order_by("created_at")
 
-    def handle(self, *args, **kwargs):
-        now = timezone.now()
-        qs = IncomingLetter.objects.filter(created_at__year=now.year, created_at__month=now.month)
-        fn = f"agenda_incoming_{now.strftime('%Y_%m')}.csv"
-        with open(fn, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f); w.writerow(["Agenda","Subject","Origin","Status","Created"])
-            for o in qs: w.writerow([o.agenda_number,o.subject,o.origin,o.status,o.created_at])
+        fn = opts["output"] or f"{stem}.{opts['format']}"
+        if opts["format"] == "xlsx":
+            with open(fn, "wb") as f:
+                write_xlsx(qs, COLUMNS, f)
+        else:
+            with open(fn, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f); w.writerow([h for h, _, _ in COLUMNS])
+                w.writerows(iter_rows(qs, COLUMNS))
         self.stdout.write(self.style.SUCCESS(f"Export OK: {os.path.abspath(fn)}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from core.doctext import process_pending
+
+class Command(BaseCommand):
+    help = "Ekstrak teks Scan PDF / Asaun Tuir Mai yg PENDING (worker pool) & index ulang"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-w", "--workers", type=int, default=2, help="Jumlah proses worker")
+        parser.add_argument("--limit", type=int, default=None, help="Maksimum dokumen yg diproses")
+        parser.add_argument("--retry-failed", action="store_true", help="Ulangi juga yg FAILED")
+
+    def handle(self, *args, **opts):
+        st = process_pending(workers=opts["workers"], limit=opts["limit"], retry_failed=opts["retry_failed"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Dokumen: {st['docs']} ({st['failed']} gagal), pajina: {st['pages']}, "
+            f"{st['seconds']}s → {st['pages_per_sec']} pajina/detik"
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import synth
+
+
+class Command(BaseCommand):
+    help = "Isi DB dgn data sintetis realistis (N tahun surat, despacho, tugas, revisaun, ekspedisaun)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=3, help="Rentang tahun ke belakang dari hari ini")
+        parser.add_argument("--per-day", type=float, default=30, help="Rata-rata surat masuk per hari kerja")
+        parser.add_argument("--users", type=int, default=60, help="Jumlah user staf sintetis (synth_NNN)")
+        parser.add_argument("--seed", type=int, default=2026, help="Seed acak (hasil bisa diulang)")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        counts = synth.generate(
+            years=opts["years"], per_day=opts["per_day"], users=opts["users"], seed=opts["seed"],
+            log=lambda msg: self.stdout.write(msg) if opts["verbosity"] > 1 else None,
+        )
+        summary = ", ".join(f"{k}={v}" for k, v in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Dadus OK ({time.perf_counter() - t0:.1f} s): {summary}"))
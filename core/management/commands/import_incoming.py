@@ -0,0 +1,45 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ingest import ingest, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import massal Karta Tama dari CSV/JSONL (+ folder Scan PDF, kolom scan_pdf = nama file)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="File .csv atau .jsonl")
+        parser.add_argument("--scans", default=None, help="Folder berisi file Scan PDF")
+        parser.add_argument("--user", default=None, help="Username pencatat (created_by)")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--errors", default=None, help="Tulis baris gagal ke file JSONL ini")
+
+    def handle(self, *args, **opts):
+        user = None
+        if opts["user"]:
+            user = get_user_model().objects.filter(username=opts["user"]).first()
+            if user is None:
+                raise CommandError(f"User '{opts['user']}' la iha.")
+
+        start = time.monotonic()
+        with open(opts["file"], "rb") as fh:
+            report = ingest(read_rows(fh, opts["file"]), user=user, scan_dir=opts["scans"],
+                            batch_size=opts["batch_size"])
+        elapsed = time.monotonic() - start
+
+        if opts["errors"]:
+            with open(opts["errors"], "w", encoding="utf-8") as out:
+                for err in report["errors"]:
+                    out.write(json.dumps(err, ensure_ascii=False) + "\n")
+        else:
+            for err in report["errors"][:20]:
+                self.stderr.write(f"Baris {err['row']}: {err['errors']}")
+
+        rate = report["created"] / elapsed * 60 if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Rejista: {report['created']}, falla: {len(report['errors'])} "
+            f"({elapsed:.1f} s, ~{rate:.0f} karta/minutu)"
+        ))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from core import rollup
+
+class Command(BaseCommand):
+    help = "Bangun ulang rekap harian (DailyLetterStats) dari data surat"
+
+    def handle(self, *args, **kwargs):
+        n = rollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rekap OK: {n} baris"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core import search
+from core.models import IncomingLetter, OutgoingLetter
+
+class Command(BaseCommand):
+    help = "Bangun ulang indeks full-text Karta Tama & Karta Sai"
+
+    def handle(self, *args, **kwargs):
+        if not search.backend():
+            self.stdout.write(self.style.WARNING("Backend DB tidak mendukung FTS, dilewati."))
+            return
+        n_in = search.rebuild("in", IncomingLetter.objects.all())
+        n_out = search.rebuild("out", OutgoingLetter.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Indeks OK: {n_in} karta tama, {n_out} karta sai"))
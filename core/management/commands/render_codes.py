@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from core.jobs import drain
+
+class Command(BaseCommand):
+    help = "Kuras antrian job QR/Barcode (PENDING, opsional ulangi yg FAILED)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-failed", action="store_true", help="Ulangi juga job yg FAILED")
+        parser.add_argument("--limit", type=int, default=None, help="Maksimum job yg diproses")
+        parser.add_argument("--max-attempts", type=int, default=None, help="Lewati job yg sudah dicoba N kali")
+
+    def handle(self, *args, **opts):
+        ok, failed = drain(
+            include_failed=opts["retry_failed"],
+            limit=opts["limit"],
+            max_attempts=opts["max_attempts"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Render OK: {ok}, gagal: {failed}"))
@@ -1,14 +1,24 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from core.models import Disposition, DispositionAssignment
+
+from core import sla
+
 
 class Command(BaseCommand):
-    help = "Reminder SLA disposisi (due_date mendekat/terlewati)"
-
-    def handle(self, *args, **kwargs):
-        today = timezone.now().date()
-        warn = Disposition.objects.filter(due_date__isnull=False, due_date__lte=today).order_by("due_date")
-        for d in warn:
-            assignees = DispositionAssignment.objects.filter(disposition=d).values_list("assignee__username", flat=True)
-            self.stdout.write(f"[REMINDER] Dispo {d.id} → due {d.due_date} → assignees={list(assignees)}")
-        self.stdout.write(self.style.SUCCESS("SLA reminder selesai."))
+    help = "Reminder SLA disposisi: satu digest per user utk tugas terbuka yg mendekati/lewat data-limite"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--soon-days", type=int, default=None,
+                            help="Ingatkan tugas yg jatuh tempo dalam N hari (default SLA_DUE_SOON_DAYS)")
+        parser.add_argument("--notifier", default=None, help="Dotted path kelas notifier (default SLA_NOTIFIER)")
+        parser.add_argument("--dry-run", action="store_true", help="Hitung saja, tanpa kirim & tanpa mencatat")
+
+    def handle(self, *args, **opts):
+        summary = sla.run(
+            soon_days=opts["soon_days"],
+            notifier=sla.get_notifier(opts["notifier"]),
+            dry_run=opts["dry_run"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            "SLA reminder selesai: {users} user, {tasks} tugas, {notified} digest terkirim, "
+            "{skipped} dilewati.".format(**summary)
+        ))
@@ -0,0 +1,56 @@
+"""
+Uji beban konkuren penomoran agenda & transisi FINAL (lihat core/stress.py).
+
+    python manage.py stress_numbering --workers 16 --ops 100
+    python manage.py stress_numbering --mode process --workers 8 --json stress.json
+
+Counter NumberSequence ikut naik → jalankan di DB uji/salinan, bukan produksi.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import stress
+
+
+class Command(BaseCommand):
+    help = "Stress test penomoran (unik, tanpa lubang, monoton) dgn worker paralel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Jumlah worker paralel")
+        parser.add_argument("--ops", type=int, default=50, help="Operasi per worker")
+        parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+        parser.add_argument("--final-ratio", type=float, default=0.5, help="Porsi operasi transisi FINAL (0–1)")
+        parser.add_argument("--rollback-rate", type=float, default=0.05, help="Porsi operasi yg sengaja di-rollback")
+        parser.add_argument("--seed", type=int, default=2026)
+        parser.add_argument("--keep", action="store_true", help="Jangan hapus data uji")
+        parser.add_argument("--json", dest="json_path", help="Tulis laporan ke file JSON")
+
+    def handle(self, *args, **opts):
+        self.stderr.write(self.style.WARNING("Counter NumberSequence sei sae — uza DB teste."))
+        report = stress.run(
+            workers=opts["workers"], ops=opts["ops"], mode=opts["mode"], final_ratio=opts["final_ratio"],
+            rollback_rate=opts["rollback_rate"], seed=opts["seed"], keep=opts["keep"],
+        )
+        self.stdout.write(
+            f"{report['mode']} x{report['workers']}: {report['ops']} op, {report['committed']} commit, "
+            f"{report['rolled_back']} rollback, {report['errors']} error, "
+            f"{report['throughput_ops_s']} op/s ({report['elapsed_s']} s)"
+        )
+        self.stdout.write(f"{'op':<10} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for kind, r in report["latency_ms"].items():
+            if r["n"]:
+                self.stdout.write(f"{kind:<10} {r['n']:>6} {r['p50']:>9.2f} {r['p95']:>9.2f} "
+                                  f"{r['p99']:>9.2f} {r['max']:>9.2f}")
+        if opts["json_path"]:
+            with open(opts["json_path"], "w", encoding="utf-8") as fh:
+                fh.write(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+            self.stderr.write(f"JSON → {opts['json_path']}")
+
+        for msg in report["error_samples"]:
+            self.stderr.write(f"error: {msg}")
+        for msg in report["violations"]:
+            self.stderr.write(f"violasaun: {msg}")
+        if not report["ok"]:
+            raise CommandError(f"{len(report['violations'])} violasaun, {report['errors']} error")
+        self.stdout.write(self.style.SUCCESS("OK: unik, la iha buraku, monotóniku."))
@@ -0,0 +1,51 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core import verify
+from core.models import IncomingLetter, OutgoingLetter
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifikasi massal hasil pindaian QR bertanda tangan (kiosk mailroom). "
+        "Satu baris = URL QR atau '<kode> <token>'. Tanpa --fresh tidak ada akses DB — "
+        "hanya tanda tangan yg dicek; token tidak kedaluwarsa, status yg sudah berubah "
+        "baru terdeteksi dgn --fresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", nargs="?", help="File hasil pindaian (default: stdin)")
+        parser.add_argument("--fresh", action="store_true",
+                            help="Cek status sekarang di DB (satu query per jenis surat)")
+
+    def handle(self, *args, **opts):
+        fh = open(opts["file"], encoding="utf-8") if opts["file"] else sys.stdin
+        with fh:
+            scans = [verify.parse_scan(line) for line in fh if line.strip()]
+
+        results = []
+        for code, token in scans:
+            signed = verify.read_token(code, token) if token and verify.kind_of(code) else None
+            results.append({
+                "code": code,
+                "valid": signed is not None,
+                "status": signed["status"] if signed else None,
+                "date": signed["date"].isoformat() if signed else None,
+            })
+
+        if opts["fresh"]:
+            valid = [r["code"] for r in results if r["valid"]]
+            current = dict(IncomingLetter.objects.filter(agenda_number__in=valid)
+                           .values_list("agenda_number", "status"))
+            current.update(OutgoingLetter.objects.filter(number__in=valid).values_list("number", "status"))
+            for r in results:
+                if r["valid"]:
+                    r["current_status"] = current.get(r["code"])
+                    r["fresh"] = r["current_status"] == r["status"]
+
+        for r in results:
+            self.stdout.write(json.dumps(r))
+        bad = sum(not r["valid"] for r in results)
+        self.stderr.write(f"Total: {len(results)}, válidu: {len(results) - bad}, la válidu: {bad}")
@@ -1,20 +1,133 @@
+import json
 import logging
-logger = logging.getLogger("audit")
+import random
+import time
+from contextlib import ExitStack
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.utils import timezone
+
+from . import audit, profiling
+
+perf_logger = logging.getLogger("perf")
 
 class AuditViewMiddleware:
+    """
+    Catat akses /admin/ & halaman detail surat (user login) serta /verify/
+    (publik) ke logger "audit". Handler-nya asinkron (core/audit.py) →
+    request tidak menunggu disk/DB. Request diikat ke context selama diproses
+    supaya event dari signal model ikut tahu user & IP-nya.
+    """
+    # url_name → model utk halaman detail di luar ModelAdmin
+    OBJECT_VIEWS = {
+        "incoming_detail": "incomingletter",
+        "admin_incoming_detail": "incomingletter",
+        "outgoing_detail": "outgoingletter",
+        "admin_outgoing_detail": "outgoingletter",
+    }
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        resp = self.get_response(request)
-        if request.user.is_authenticated and request.path.startswith("/admin/"):
-            logger.info(
-                "user=%s method=%s path=%s status=%s",
-                request.user.username,
-                request.method,
-                request.path,
-                getattr(resp, "status_code", "?"),
+        token = audit.bind_request(request)
+        try:
+            resp = self.get_response(request)
+        finally:
+            audit.unbind_request(token)
+        status = getattr(resp, "status_code", None)
+        content_type, object_id = self._viewed_object(request)
+        if request.user.is_authenticated and (request.path.startswith("/admin/") or content_type):
+            audit.record(
+                "view", request=request, status=status,
+                content_type=content_type, object_id=object_id,
+                message=f"user={request.user.username} method={request.method} "
+                        f"path={request.path} status={status or '?'}",
             )
-        if request.path.startswith("/verify/"):
-            logger.info("public_verify ip=%s path=%s", request.META.get("REMOTE_ADDR"), request.path)
+        # 429 tidak dicatat: throttle harus tetap tanpa DB (sink audit DB)
+        if request.path.startswith("/verify/") and status != 429:
+            audit.record(
+                "verify", request=request, status=status,
+                message=f"public_verify ip={request.META.get('REMOTE_ADDR')} path={request.path}",
+            )
+        return resp
+
+    def _viewed_object(self, request):
+        """(ContentType, id) utk halaman change admin / detail surat, selain itu (None, None)."""
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return None, None
+        model_admin = getattr(match.func, "model_admin", None)
+        if model_admin is not None and match.url_name and match.url_name.endswith("_change"):
+            return ContentType.objects.get_for_model(model_admin.model), match.kwargs.get("object_id")
+        model = self.OBJECT_VIEWS.get(match.url_name)
+        if model and "pk" in match.kwargs:
+            return ContentType.objects.get_by_natural_key("core", model), match.kwargs["pk"]
+        return None, None
+
+class ProfilingMiddleware:
+    """
+    Ukur tiap request (murah: timer + execute_wrapper), lalu tulis JSON ke
+    logger "perf" bila request masuk sampel ATAU melewati ambang batas:
+      PROFILING_SAMPLE_RATE  (0..1)   porsi request normal yg dicatat
+      PROFILING_SLOW_MS               request lebih lama → selalu dicatat
+      PROFILING_QUERY_BUDGET          jumlah query lebih → selalu dicatat
+    Taruh paling atas di MIDDLEWARE supaya waktu middleware lain ikut terhitung.
+    """
+    SKIP_PREFIXES = ("/static/", "/media/")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = profiling.setting("ENABLED", False)
+        if self.enabled:
+            profiling.install_template_timer()
+
+    def __call__(self, request):
+        if not self.enabled or request.path.startswith(self.SKIP_PREFIXES):
+            return self.get_response(request)
+
+        stats = profiling.RequestStats()
+        token = profiling.activate(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                resp = self.get_response(request)
+        finally:
+            profiling.deactivate(token)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        flags = []
+        if wall_ms >= profiling.setting("SLOW_MS", 1000):
+            flags.append("slow")
+        if stats.queries > profiling.setting("QUERY_BUDGET", 50):
+            flags.append("query_budget")
+        rate = profiling.setting("SAMPLE_RATE", 0.1)
+        if flags:
+            self._emit(request, resp, stats, wall_ms, flags, weight=1)
+        elif rate > 0 and random.random() < rate:
+            # satu sampel mewakili 1/rate request normal → bobot utk persentil
+            self._emit(request, resp, stats, wall_ms, flags, weight=round(1 / rate, 4))
         return resp
+
+    def _emit(self, request, resp, stats, wall_ms, flags, weight=1):
+        match = getattr(request, "resolver_match", None)
+        user = getattr(request, "user", None)
+        perf_logger.info(json.dumps({
+            "ts": timezone.now().isoformat(timespec="milliseconds"),
+            "method": request.method,
+            "path": request.path,
+            "endpoint": (match.view_name or match.route) if match else None,
+            "status": getattr(resp, "status_code", None),
+            "user": user.get_username() if user is not None and user.is_authenticated else None,
+            "wall_ms": round(wall_ms, 2),
+            "db_queries": stats.queries,
+            "db_ms": round(stats.db_ms, 2),
+            "template_ms": round(stats.template_ms, 2),
+            "slowest_sql_ms": round(stats.slowest_ms, 2),
+            "slowest_sql": stats.slowest_sql,
+            "flags": flags,
+            "weight": weight,
+        }, ensure_ascii=False))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+def blank_to_null(apps, schema_editor):
+    OutgoingLetter = apps.get_model("core", "OutgoingLetter")
+    OutgoingLetter.objects.filter(number="").update(number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_destructionrecord_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10, verbose_name='Prefiksu')),
+                ('year', models.PositiveIntegerField(verbose_name='Tinan')),
+                ('last_value', models.PositiveIntegerField(default=0, verbose_name='Valor Ikus')),
+            ],
+            options={
+                'verbose_name': 'Sekuénsia Númeru',
+                'verbose_name_plural': 'Sekuénsia Númeru',
+                'unique_together': {('prefix', 'year')},
+            },
+        ),
+        migrations.AlterField(
+            model_name='outgoingletter',
+            name='number',
+            field=models.CharField(blank=True, help_text='Sei tau automátiku bainhira estadu FINAL (númeru rai).', max_length=40, null=True, unique=True, verbose_name='Númeru'),
+        ),
+        # balik ke "" tidak bisa (lebih dari satu draf → bentrok unik) → noop
+        migrations.RunPython(blank_to_null, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_numbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('in', 'Karta Tama'), ('out', 'Karta Sai')], max_length=3, verbose_name='Tipu')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID Karta')),
+                ('status', models.CharField(choices=[('PENDING', 'Hein'), ('DONE', 'Remata'), ('FAILED', 'Falla')], default='PENDING', max_length=7, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativa')),
+                ('last_error', models.TextField(blank=True, verbose_name='Erru Ikus')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Kria iha')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualiza iha')),
+            ],
+            options={
+                'verbose_name': 'Job Rendering',
+                'verbose_name_plural': 'Job Rendering',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_render_status_20c34e_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
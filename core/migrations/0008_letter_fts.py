@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:30
+
+from django.db import migrations
+
+# Salinan beku dari core/search.py saat migrasi ini dibuat (jangan impor kode app).
+TABLE = "core_letter_fts"
+FIELDS = {
+    "in": ("agenda_number", "subject", "origin", "origin_number"),
+    "out": ("number", "subject", "body"),
+}
+KIND_BIT = {"in": 0, "out": 1}
+
+
+def create_fts(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, code, subject, content, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif conn.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            "kind varchar(3) NOT NULL, object_id bigint NOT NULL, "
+            "document tsvector NOT NULL, PRIMARY KEY (kind, object_id))"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TABLE}_document_gin ON {TABLE} USING GIN (document)"
+        )
+    else:
+        return
+
+    # isi indeks dari data yg sudah ada (DocumentText belum ada → tanpa teks dokumen)
+    models = {"in": apps.get_model("core", "IncomingLetter"), "out": apps.get_model("core", "OutgoingLetter")}
+    with conn.cursor() as cur:
+        for kind, model in models.items():
+            code_field, subject_field, *rest = FIELDS[kind]
+            rows = model.objects.using(conn.alias).values("pk", *FIELDS[kind]).iterator(chunk_size=2000)
+            for r in rows:
+                code, subject = r[code_field] or "", r[subject_field] or ""
+                content = " ".join(str(r[f] or "") for f in rest)
+                if conn.vendor == "sqlite":
+                    cur.execute(
+                        f"INSERT OR REPLACE INTO {TABLE} (rowid, kind, object_id, code, subject, content) "
+                        "VALUES (%s, %s, %s, %s, %s, %s)",
+                        [r["pk"] * 2 + KIND_BIT[kind], kind, r["pk"], code, subject, f"{content}\n"],
+                    )
+                else:
+                    cur.execute(
+                        f"INSERT INTO {TABLE} (kind, object_id, document) VALUES (%s, %s, "
+                        "setweight(to_tsvector('simple', %s), 'A') || "
+                        "setweight(to_tsvector('simple', %s), 'B') || "
+                        "setweight(to_tsvector('simple', %s), 'C')) "
+                        "ON CONFLICT (kind, object_id) DO UPDATE SET document = EXCLUDED.document",
+                        [kind, r["pk"], code.replace("/", " "), subject, content],
+                    )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_renderjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
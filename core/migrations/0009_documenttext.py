@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_letter_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('scan', 'Scan PDF'), ('followup', 'Asaun Tuir Mai')], max_length=10, verbose_name='Fonte')),
+                ('source_id', models.PositiveBigIntegerField(verbose_name='ID Fonte')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Ficheiru')),
+                ('sha1', models.CharField(blank=True, max_length=40, verbose_name='SHA1')),
+                ('status', models.CharField(choices=[('PENDING', 'Hein'), ('DONE', 'Remata'), ('EMPTY', 'La iha testu'), ('FAILED', 'Falla')], default='PENDING', max_length=7, verbose_name='Estado')),
+                ('method', models.CharField(blank=True, help_text='text = layer teks PDF, ocr = OCR lokal', max_length=4, verbose_name='Métodu')),
+                ('pages', models.PositiveIntegerField(default=0, verbose_name='Pájina')),
+                ('text', models.TextField(blank=True, verbose_name='Testu')),
+                ('error', models.TextField(blank=True, verbose_name='Erru')),
+                ('extracted_at', models.DateTimeField(blank=True, null=True, verbose_name='Estrai iha')),
+                ('letter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_texts', to='core.incomingletter', verbose_name='Karta')),
+            ],
+            options={
+                'verbose_name': 'Testu Dokumentu',
+                'verbose_name_plural': 'Testu Dokumentu',
+                'indexes': [models.Index(fields=['status'], name='core_docume_status_107de9_idx')],
+                'unique_together': {('source', 'source_id')},
+            },
+        ),
+    ]
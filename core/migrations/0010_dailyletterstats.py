@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+# Salinan beku dari core/rollup.py saat migrasi ini dibuat (jangan impor kode app).
+DIMENSIONS = {
+    "in": {"status": "status", "priority": "priority", "received_via": "received_via"},
+    "out": {"status": "status", "template": "template_type"},
+}
+
+
+def fill_stats(apps, schema_editor):
+    IncomingLetter = apps.get_model("core", "IncomingLetter")
+    OutgoingLetter = apps.get_model("core", "OutgoingLetter")
+    DailyLetterStats = apps.get_model("core", "DailyLetterStats")
+    db = schema_editor.connection.alias
+
+    rows = []
+    for kind, model in (("in", IncomingLetter), ("out", OutgoingLetter)):
+        for dim, field in DIMENSIONS[kind].items():
+            grouped = (model.objects.using(db).order_by().annotate(day=TruncDate("created_at"))
+                       .values("day", field).annotate(n=Count("pk")))
+            rows += [DailyLetterStats(day=r["day"], kind=kind, dimension=dim, value=r[field], count=r["n"])
+                     for r in grouped]
+
+    grouped = (IncomingLetter.classification_tags.through.objects.using(db).order_by()
+               .annotate(day=TruncDate("incomingletter__created_at"))
+               .values("day", "classificationtag__name").annotate(n=Count("pk")))
+    rows += [DailyLetterStats(day=r["day"], kind="in", dimension="tag",
+                              value=r["classificationtag__name"], count=r["n"]) for r in grouped]
+    DailyLetterStats.objects.using(db).bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_documenttext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyLetterStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Loron')),
+                ('kind', models.CharField(choices=[('in', 'Karta Tama'), ('out', 'Karta Sai')], max_length=3, verbose_name='Tipu')),
+                ('dimension', models.CharField(max_length=20, verbose_name='Dimensaun')),
+                ('value', models.CharField(max_length=100, verbose_name='Valor')),
+                ('count', models.IntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Estatístika Loron-loron',
+                'verbose_name_plural': 'Estatístika Loron-loron',
+                'indexes': [models.Index(fields=['kind', 'dimension', 'day'], name='core_dailyl_kind_da38cd_idx')],
+                'unique_together': {('day', 'kind', 'dimension', 'value')},
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
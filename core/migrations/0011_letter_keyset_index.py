@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_dailyletterstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incomingletter',
+            index=models.Index(fields=['-created_at', '-id'], name='core_incomi_created_f664d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingletter',
+            index=models.Index(fields=['-created_at', '-id'], name='core_outgoi_created_b8606b_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_letter_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, verbose_name='Tempu')),
+                ('username', models.CharField(blank=True, max_length=150, verbose_name='Uzuáriu')),
+                ('action', models.CharField(max_length=20, verbose_name='Asaun')),
+                ('method', models.CharField(blank=True, max_length=8, verbose_name='Métodu')),
+                ('path', models.CharField(max_length=500, verbose_name='Path')),
+                ('status', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Status')),
+                ('ip', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP')),
+            ],
+            options={
+                'verbose_name': 'Eventu Auditoria',
+                'verbose_name_plural': 'Eventu Auditoria',
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_brin(apps, schema_editor):
+    # Postgres: BRIN created_at (tabel append-only → ringkas, pruning per rentang waktu)
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS core_audite_created_brin "
+            "ON core_auditevent USING brin (created_at)"
+        )
+
+
+def drop_brin(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS core_audite_created_brin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0012_auditevent'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='auditevent',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Eventu Auditoria', 'verbose_name_plural': 'Eventu Auditoria'},
+        ),
+        migrations.AddField(
+            model_name='auditevent',
+            name='content_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='contenttypes.contenttype', verbose_name='Tipu Objetu'),
+        ),
+        migrations.AddField(
+            model_name='auditevent',
+            name='extra',
+            field=models.JSONField(blank=True, null=True, verbose_name='Detalle'),
+        ),
+        migrations.AddField(
+            model_name='auditevent',
+            name='object_id',
+            field=models.CharField(blank=True, max_length=64, verbose_name='ID Objetu'),
+        ),
+        migrations.AddField(
+            model_name='auditevent',
+            name='user_id',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='ID Uzuáriu'),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='action',
+            field=models.CharField(choices=[('view', 'Haree pájina'), ('verify', 'Verifika públiku'), ('create', 'Kria'), ('status', 'Muda estado'), ('dispo_read', 'Despacho lee'), ('dispo_done', 'Despacho kompleta')], max_length=20, verbose_name='Asaun'),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='path',
+            field=models.CharField(blank=True, max_length=500, verbose_name='Path'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevent',
+            index=models.Index(fields=['content_type', 'object_id', '-created_at'], name='core_audite_content_e8648d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevent',
+            index=models.Index(fields=['user_id', '-created_at'], name='core_audite_user_id_14c149_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevent',
+            index=models.Index(fields=['action', '-created_at'], name='core_audite_action_b37622_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevent',
+            index=models.Index(fields=['-created_at', '-id'], name='core_audite_created_8df96b_idx'),
+        ),
+        migrations.RunPython(create_brin, drop_brin),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_auditevent_trail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlaNotice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('soon', 'Besik ona'), ('overdue', 'Liu ona')], max_length=7, verbose_name='Tipu')),
+                ('due_date', models.DateField(verbose_name='Data-limite')),
+                ('notified_at', models.DateTimeField(auto_now_add=True, verbose_name='Notifika iha')),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sla_notices', to='core.dispositionassignment', verbose_name='Tarefa')),
+            ],
+            options={
+                'verbose_name': 'Notifikasaun SLA',
+                'verbose_name_plural': 'Notifikasaun SLA',
+                'unique_together': {('assignment', 'kind', 'due_date')},
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Salinan beku dari core.models.PRIORITY_RANK (jangan impor kode app).
+PRIORITY_RANK = {"SS": 0, "S": 1, "B": 2}
+
+
+def backfill(apps, schema_editor):
+    DispositionAssignment = apps.get_model("core", "DispositionAssignment")
+    InboxItem = apps.get_model("core", "InboxItem")
+    db = schema_editor.connection.alias
+    rows = (DispositionAssignment.objects.using(db).order_by("pk").values(
+        "pk", "assignee_id", "disposition_id", "read_at", "completed_at",
+        "disposition__letter_id", "disposition__due_date", "disposition__created_at",
+        "disposition__letter__agenda_number", "disposition__letter__subject",
+        "disposition__letter__priority",
+    ).iterator(chunk_size=2000))
+    InboxItem.objects.using(db).bulk_create((InboxItem(
+        assignment_id=r["pk"], assignee_id=r["assignee_id"], disposition_id=r["disposition_id"],
+        letter_id=r["disposition__letter_id"], agenda_number=r["disposition__letter__agenda_number"],
+        subject=r["disposition__letter__subject"], priority=r["disposition__letter__priority"],
+        priority_rank=PRIORITY_RANK.get(r["disposition__letter__priority"], PRIORITY_RANK["B"]),
+        due_date=r["disposition__due_date"], assigned_at=r["disposition__created_at"],
+        read_at=r["read_at"], completed_at=r["completed_at"],
+    ) for r in rows), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_slanotice'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxItem',
+            fields=[
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox_item', serialize=False, to='core.dispositionassignment', verbose_name='Tarefa')),
+                ('agenda_number', models.CharField(blank=True, max_length=30, verbose_name='Númeru Agenda')),
+                ('subject', models.CharField(max_length=300, verbose_name='Asuntu')),
+                ('priority', models.CharField(choices=[('B', 'Normal'), ('S', 'Urgente'), ('SS', 'Muito Urgente')], default='B', max_length=2, verbose_name='Prioridade')),
+                ('priority_rank', models.PositiveSmallIntegerField(default=2, help_text='0 = Muito Urgente', verbose_name='Rank Prioridade')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Data-limite')),
+                ('assigned_at', models.DateTimeField(verbose_name="Hato'o iha")),
+                ('read_at', models.DateTimeField(blank=True, null=True, verbose_name='Lee iha')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Kompleta iha')),
+                ('assignee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to=settings.AUTH_USER_MODEL, verbose_name='Responsável')),
+                ('disposition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.disposition', verbose_name='Despacho')),
+                ('letter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.incomingletter', verbose_name='Karta')),
+            ],
+            options={
+                'verbose_name': 'Inbox Tarefa',
+                'verbose_name_plural': 'Inbox Tarefa',
+                'ordering': ['due_date', 'priority_rank', '-assigned_at'],
+                'indexes': [models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['assignee', 'due_date', 'priority_rank', '-assigned_at'], name='core_inbox_open_idx'), models.Index(fields=['assignee', '-assigned_at'], name='core_inbox_all_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
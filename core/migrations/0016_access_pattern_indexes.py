@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_inboxitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='disposition',
+            index=models.Index(condition=models.Q(('due_date__isnull', False)), fields=['due_date'], name='core_dispo_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dispositionassignment',
+            index=models.Index(fields=['assignee', 'completed_at'], name='core_dispos_assigne_7f0c1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dispositionassignment',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['disposition'], name='core_assign_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomingletter',
+            index=models.Index(fields=['current_handler', 'status'], name='core_incomi_current_62f28b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomingletter',
+            index=models.Index(condition=models.Q(('retention_until__isnull', False)), fields=['retention_until'], name='core_in_retention_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingletter',
+            index=models.Index(condition=models.Q(('retention_until__isnull', False)), fields=['retention_until'], name='core_out_retention_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewstep',
+            index=models.Index(fields=['reviewer', 'approved_at'], name='core_review_reviewe_a55e44_idx'),
+        ),
+    ]
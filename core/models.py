@@ -1,5 +1,5 @@
 import os
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import Group, User
 from django.utils import timezone
 from django.utils.text import slugify
@@ -92,8 +92,17 @@ class Attachment(models.Model):
         ordering = ["-uploaded_at"]
     def __str__(self): return self.title
 
+class AtomicSaveMixin:
+    """
+    save() dlm satu transaksi: nomor dari signal pre_save (counter
+    NumberSequence) & INSERT/UPDATE surat commit/rollback bersama → tanpa lubang.
+    """
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            super().save(*args, **kwargs)
+
 # ---------- Karta Tama ----------
-class IncomingLetter(models.Model):
+class IncomingLetter(AtomicSaveMixin, models.Model):
     received_via = models.CharField("Tama via", max_length=10, choices=RECEIVED_VIA, default="fisik")
     origin = models.CharField("Karta Husi", max_length=255)
     origin_number = models.CharField("Númeru Karta", max_length=100)
@@ -145,6 +154,13 @@ class IncomingLetter(models.Model):
             models.Index(fields=["agenda_number"]),
             models.Index(fields=["status", "created_at"]),
             models.Index(fields=["origin_date"]),
+            # paginasi keyset (-created_at, -id), lihat core/utils/pagination.py
+            models.Index(fields=["-created_at", "-id"]),
+            # "karta iha ha'u nia liman": filter responsável + estado
+            models.Index(fields=["current_handler", "status"]),
+            # sapuan retensi/pemusnahan: hanya surat yg punya tanggal retensi
+            models.Index(fields=["retention_until"], condition=models.Q(retention_until__isnull=False),
+                         name="core_in_retention_idx"),
         ]
     def __str__(self): return f"{self.agenda_number or '—'} — {self.subject}"
     @property
@@ -162,6 +178,11 @@ class Disposition(models.Model):
         verbose_name = "Despacho"
         verbose_name_plural = "Despacho"
         ordering = ["-created_at"]
+        indexes = [
+            # tenggat SLA; kebanyakan despacho tanpa data-limite → partial
+            models.Index(fields=["due_date"], condition=models.Q(due_date__isnull=False),
+                         name="core_dispo_due_idx"),
+        ]
     def __str__(self): return f"Dispo {self.id} — {self.letter.agenda_number or self.letter_id}"
 
 class DispositionAssignment(models.Model):
@@ -174,6 +195,13 @@ class DispositionAssignment(models.Model):
         verbose_name_plural = "Agenda"
         unique_together = ("disposition", "assignee")
         ordering = ["assignee__username"]
+        indexes = [
+            # tugas per user (terbuka = completed_at IS NULL)
+            models.Index(fields=["assignee", "completed_at"]),
+            # pengingat SLA: semua tugas terbuka → join ke despacho
+            models.Index(fields=["disposition"], condition=models.Q(completed_at__isnull=True),
+                         name="core_assign_open_idx"),
+        ]
     def __str__(self): return f"{self.assignee} ← Dispo {self.disposition_id}"
 
 class FollowUp(models.Model):
@@ -189,15 +217,50 @@ class FollowUp(models.Model):
         ordering = ["-created_at"]
     def __str__(self): return f"{self.get_doc_type_display()} — {self.title}"
 
+# ---------- Teks Dokumentu (ekstraksi PDF / OCR) ----------
+class DocumentText(models.Model):
+    """
+    Teks hasil ekstraksi dari Scan PDF surat masuk & file Asaun Tuir Mai.
+    Diisi offline oleh `manage.py extract_document_text`; satu baris per file
+    sumber. Kalau nama file tidak berubah, ekstraksi dilewati (inkremental).
+    """
+    SOURCE = (("scan", "Scan PDF"), ("followup", "Asaun Tuir Mai"))
+    STATUS = (
+        ("PENDING", "Hein"),
+        ("DONE",    "Remata"),
+        ("EMPTY",   "La iha testu"),
+        ("FAILED",  "Falla"),
+    )
+    letter = models.ForeignKey(IncomingLetter, verbose_name="Karta", on_delete=models.CASCADE, related_name="document_texts")
+    source = models.CharField("Fonte", max_length=10, choices=SOURCE)
+    source_id = models.PositiveBigIntegerField("ID Fonte")
+    file_name = models.CharField("Ficheiru", max_length=255)
+    sha1 = models.CharField("SHA1", max_length=40, blank=True)
+    status = models.CharField("Estado", max_length=7, choices=STATUS, default="PENDING")
+    method = models.CharField("Métodu", max_length=4, blank=True, help_text="text = layer teks PDF, ocr = OCR lokal")
+    pages = models.PositiveIntegerField("Pájina", default=0)
+    text = models.TextField("Testu", blank=True)
+    error = models.TextField("Erru", blank=True)
+    extracted_at = models.DateTimeField("Estrai iha", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Testu Dokumentu"
+        verbose_name_plural = "Testu Dokumentu"
+        unique_together = ("source", "source_id")
+        indexes = [models.Index(fields=["status"])]
+    def __str__(self): return f"{self.get_source_display()} {self.source_id} ({self.status})"
+
 # ---------- Karta Sai ----------
-class OutgoingLetter(models.Model):
+class OutgoingLetter(AtomicSaveMixin, models.Model):
     template_type = models.CharField("Formuláriu", max_length=2, choices=DOC_KIND, default="ND")
     subject = models.CharField("Asuntu", max_length=300)
     body = models.TextField("Konteúdu")
     attachments = models.ManyToManyField(Attachment, verbose_name="Anexu", blank=True)
 
+    # NULL (bukan "") selama draf: unik tetap berlaku utk nomor terisi,
+    # tapi draf sebanyak apa pun boleh ada bersamaan
     number = models.CharField(
-        "Númeru", max_length=40, unique=True, blank=True,
+        "Númeru", max_length=40, unique=True, blank=True, null=True,
         help_text="Sei tau automátiku bainhira estadu FINAL (númeru rai)."
     )
     status = models.CharField("Estado", max_length=10, choices=OUT_STATUS, default="DRAFT")
@@ -225,6 +288,9 @@ class OutgoingLetter(models.Model):
         indexes = [
             models.Index(fields=["status", "created_at"]),
             models.Index(fields=["number"]),
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["retention_until"], condition=models.Q(retention_until__isnull=False),
+                         name="core_out_retention_idx"),
         ]
     def __str__(self): return f"{self.number or '—'} — {self.subject}"
 
@@ -239,8 +305,198 @@ class ReviewStep(models.Model):
         verbose_name_plural = "Passu Revisaun"
         unique_together = ("letter", "order")
         ordering = ["order"]
+        indexes = [
+            # antrian paraf per revisor (belum disetujui = approved_at IS NULL)
+            models.Index(fields=["reviewer", "approved_at"]),
+        ]
     def __str__(self): return f"Review #{self.order} ba {self.letter_id}"
 
+# ---------- Numerasaun ----------
+class NumberSequence(models.Model):
+    """
+    Konta-dór ba númeru agenda/karta sai, ida ba kada (prefix, tinan).
+    Baris ne'e di-lock saat alokasi supaya númeru la duplika no la iha buraku.
+    """
+    prefix = models.CharField("Prefiksu", max_length=10)
+    year = models.PositiveIntegerField("Tinan")
+    last_value = models.PositiveIntegerField("Valor Ikus", default=0)
+
+    class Meta:
+        verbose_name = "Sekuénsia Númeru"
+        verbose_name_plural = "Sekuénsia Númeru"
+        unique_together = ("prefix", "year")
+    def __str__(self): return f"{self.prefix}/{self.year} → {self.last_value}"
+
+# ---------- Rekap Statistik Harian ----------
+class DailyLetterStats(models.Model):
+    """
+    Rekap jumlah surat per (hari dibuat, jenis, dimensi, nilai).
+    Dimensi: status / priority / received_via / tag (Karta Tama),
+             status / template (Karta Sai).
+    Diperbarui inkremental lewat signal (core/rollup.py), bisa dibangun ulang
+    dengan `manage.py rebuild_daily_stats`.
+    """
+    KIND = (("in", "Karta Tama"), ("out", "Karta Sai"))
+    day = models.DateField("Loron")
+    kind = models.CharField("Tipu", max_length=3, choices=KIND)
+    dimension = models.CharField("Dimensaun", max_length=20)
+    value = models.CharField("Valor", max_length=100)
+    count = models.IntegerField("Total", default=0)
+
+    class Meta:
+        verbose_name = "Estatístika Loron-loron"
+        verbose_name_plural = "Estatístika Loron-loron"
+        unique_together = ("day", "kind", "dimension", "value")
+        indexes = [models.Index(fields=["kind", "dimension", "day"])]
+    def __str__(self): return f"{self.day} {self.kind} {self.dimension}={self.value}: {self.count}"
+
+# ---------- Job Rendering QR/Barcode ----------
+class RenderJob(models.Model):
+    """
+    Antrian (DB) utk generate QR/barcode di luar request.
+    Satu baris per surat; dijalankan worker thread setelah commit, sisa
+    yg PENDING/FAILED bisa dikuras ulang via `manage.py render_codes`.
+    """
+    KIND = (("in", "Karta Tama"), ("out", "Karta Sai"))
+    STATUS = (
+        ("PENDING", "Hein"),
+        ("DONE",    "Remata"),
+        ("FAILED",  "Falla"),
+    )
+    kind = models.CharField("Tipu", max_length=3, choices=KIND)
+    object_id = models.PositiveBigIntegerField("ID Karta")
+    status = models.CharField("Estado", max_length=7, choices=STATUS, default="PENDING")
+    attempts = models.PositiveIntegerField("Tentativa", default=0)
+    last_error = models.TextField("Erru Ikus", blank=True)
+    created_at = models.DateTimeField("Kria iha", auto_now_add=True)
+    updated_at = models.DateTimeField("Atualiza iha", auto_now=True)
+
+    class Meta:
+        verbose_name = "Job Rendering"
+        verbose_name_plural = "Job Rendering"
+        unique_together = ("kind", "object_id")
+        indexes = [models.Index(fields=["status", "created_at"])]
+    def __str__(self): return f"{self.kind}:{self.object_id} ({self.status})"
+
+# ---------- Inbox Tarefa (proyeksi) ----------
+PRIORITY_RANK = {"SS": 0, "S": 1, "B": 2}
+
+class InboxItem(models.Model):
+    """
+    Proyeksi denormal DispositionAssignment → Disposition → IncomingLetter,
+    satu baris per tugas. Dijaga sinkron oleh signal (core/inbox.py) supaya
+    "tugas saya" cukup satu index scan tanpa JOIN.
+    """
+    assignment = models.OneToOneField(DispositionAssignment, verbose_name="Tarefa", on_delete=models.CASCADE, primary_key=True, related_name="inbox_item")
+    assignee = models.ForeignKey(User, verbose_name="Responsável", on_delete=models.CASCADE, related_name="inbox_items")
+    disposition = models.ForeignKey(Disposition, verbose_name="Despacho", on_delete=models.CASCADE, related_name="+")
+    letter = models.ForeignKey(IncomingLetter, verbose_name="Karta", on_delete=models.CASCADE, related_name="+")
+    agenda_number = models.CharField("Númeru Agenda", max_length=30, blank=True)
+    subject = models.CharField("Asuntu", max_length=300)
+    priority = models.CharField("Prioridade", max_length=2, choices=PRIORITY, default="B")
+    priority_rank = models.PositiveSmallIntegerField("Rank Prioridade", default=2, help_text="0 = Muito Urgente")
+    due_date = models.DateField("Data-limite", null=True, blank=True)
+    assigned_at = models.DateTimeField("Hato'o iha")
+    read_at = models.DateTimeField("Lee iha", null=True, blank=True)
+    completed_at = models.DateTimeField("Kompleta iha", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Inbox Tarefa"
+        verbose_name_plural = "Inbox Tarefa"
+        ordering = ["due_date", "priority_rank", "-assigned_at"]
+        indexes = [
+            # tugas terbuka per user, urut tenggat & prioritas (partial: hanya yg belum selesai)
+            models.Index(fields=["assignee", "due_date", "priority_rank", "-assigned_at"],
+                         condition=models.Q(completed_at__isnull=True), name="core_inbox_open_idx"),
+            models.Index(fields=["assignee", "-assigned_at"], name="core_inbox_all_idx"),
+        ]
+    def __str__(self): return f"{self.assignee_id}: {self.agenda_number or self.letter_id}"
+
+# ---------- Notifikasaun SLA ----------
+class SlaNotice(models.Model):
+    """
+    Catatan notifikasi SLA yg sudah dikirim (core/sla.py): satu baris per
+    (tugas, jenis, data-limite). Tugas yg sudah tercatat tidak dikirim ulang;
+    data-limite berubah → dianggap tenggat baru, diingatkan lagi.
+    """
+    KIND = (("soon", "Besik ona"), ("overdue", "Liu ona"))
+    assignment = models.ForeignKey(DispositionAssignment, verbose_name="Tarefa", on_delete=models.CASCADE, related_name="sla_notices")
+    kind = models.CharField("Tipu", max_length=7, choices=KIND)
+    due_date = models.DateField("Data-limite")
+    notified_at = models.DateTimeField("Notifika iha", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Notifikasaun SLA"
+        verbose_name_plural = "Notifikasaun SLA"
+        unique_together = ("assignment", "kind", "due_date")
+    def __str__(self): return f"{self.assignment_id} {self.kind} {self.due_date}"
+
+# ---------- Audit ----------
+class AuditEventQuerySet(models.QuerySet):
+    """Append-only: update/delete massal ditolak (lihat AuditEvent)."""
+    def update(self, **kwargs):
+        raise PermissionError("AuditEvent append-only: la bele update.")
+
+    def delete(self):
+        raise PermissionError("AuditEvent append-only: la bele hamoos.")
+
+
+class AuditEvent(models.Model):
+    """
+    Jejak audit: akses halaman (admin, detail surat, verifikasi publik) dan
+    perubahan model (transisi status, Despacho dibaca/selesai).
+    Ditulis batch (bulk_create) oleh thread latar core/audit.AsyncAuditHandler.
+
+    Append-only → baris terurut waktu secara fisik; index komposit diawali
+    objek/user/aksi lalu created_at sehingga "siapa membuka surat X bulan
+    lalu" cukup range-scan index (Postgres: tambahan BRIN di created_at).
+    """
+    ACTIONS = (
+        ("view",       "Haree pájina"),
+        ("verify",     "Verifika públiku"),
+        ("create",     "Kria"),
+        ("status",     "Muda estado"),
+        ("dispo_read", "Despacho lee"),
+        ("dispo_done", "Despacho kompleta"),
+    )
+    created_at = models.DateTimeField("Tempu", db_index=True)
+    user_id = models.PositiveIntegerField("ID Uzuáriu", null=True, blank=True)
+    username = models.CharField("Uzuáriu", max_length=150, blank=True)
+    action = models.CharField("Asaun", max_length=20, choices=ACTIONS)
+    content_type = models.ForeignKey(
+        ContentType, verbose_name="Tipu Objetu",
+        on_delete=models.PROTECT, null=True, blank=True, related_name="+",
+    )
+    object_id = models.CharField("ID Objetu", max_length=64, blank=True)
+    method = models.CharField("Métodu", max_length=8, blank=True)
+    path = models.CharField("Path", max_length=500, blank=True)
+    status = models.PositiveSmallIntegerField("Status", null=True, blank=True)
+    ip = models.GenericIPAddressField("IP", null=True, blank=True)
+    extra = models.JSONField("Detalle", null=True, blank=True)
+
+    objects = AuditEventQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Eventu Auditoria"
+        verbose_name_plural = "Eventu Auditoria"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "-created_at"]),
+            models.Index(fields=["user_id", "-created_at"]),
+            models.Index(fields=["action", "-created_at"]),
+            # paginasi keyset admin (-created_at, -id)
+            models.Index(fields=["-created_at", "-id"]),
+        ]
+    def __str__(self): return f"{self.created_at:%Y-%m-%d %H:%M} {self.username or '-'} {self.action} {self.object_id or self.path}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise PermissionError("AuditEvent append-only: la bele update.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise PermissionError("AuditEvent append-only: la bele hamoos.")
+
 # ---------- Ekspedisaun ----------
 class ExpeditionRecord(models.Model):
     content_type = models.ForeignKey(ContentType, verbose_name="Tipu Kontentu", on_delete=models.CASCADE)
@@ -0,0 +1,175 @@
+"""
+Profiling request: waktu total, jumlah & durasi query DB, query terlambat,
+dan waktu render template. Diukur oleh core.middleware.ProfilingMiddleware,
+ditulis sebagai JSON per baris ke logger "perf" (lihat settings.LOGGING).
+
+Halaman admin /admin/karta/perf/ membaca N baris terakhir file log dan
+menghitung p50/p95/p99 per endpoint (aman utk banyak proses/worker).
+Request lambat/boros selalu dicatat, request normal hanya disampel →
+persentil dihitung berbobot (`weight` = 1/PROFILING_SAMPLE_RATE utk sampel
+normal, 1 utk yg selalu dicatat) supaya tidak condong ke request lambat.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import math
+import os
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.template.base import Template
+
+SQL_PREVIEW = 500
+
+_current = contextvars.ContextVar("perf_request", default=None)
+
+
+def setting(name: str, default):
+    return getattr(settings, f"PROFILING_{name}", default)
+
+
+class RequestStats:
+    """Akumulator per request (disimpan di contextvar selama request)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = ""
+        self.template_ms = 0.0
+        self._depth = 0
+
+    # dipasang via connection.execute_wrapper()
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += ms
+            if ms > self.slowest_ms:
+                self.slowest_ms, self.slowest_sql = ms, sql[:SQL_PREVIEW]
+
+
+def activate(stats: RequestStats):
+    return _current.set(stats)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+# ========== WAKTU RENDER TEMPLATE ==========
+
+def install_template_timer() -> None:
+    """
+    Bungkus Template.render sekali per proses (pola yg sama dgn instrumentasi
+    test Django), hanya bila PROFILING_ENABLED. Hanya template terluar yg
+    dihitung → include tidak dobel.
+    """
+    original = Template.render
+    if not setting("ENABLED", False) or getattr(original, "_perf_wrapped", False):
+        return
+
+    def render(self, context):
+        stats = _current.get()
+        if stats is None:
+            return original(self, context)
+        stats._depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            stats._depth -= 1
+            if not stats._depth:
+                stats.template_ms += (time.perf_counter() - start) * 1000
+
+    render._perf_wrapped = True
+    Template.render = render
+
+
+# ========== BACA & AGREGASI ==========
+
+def _tail_lines(path, limit: int, block: int = 64 * 1024) -> list[bytes]:
+    """Ambil `limit` baris terakhir tanpa membaca seluruh file."""
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with fh:
+        fh.seek(0, os.SEEK_END)
+        pos, data = fh.tell(), b""
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(block, pos)
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step) + data
+    return data.splitlines()[-limit:]
+
+
+def read_samples(limit: int | None = None) -> list[dict]:
+    path = setting("LOG_FILE", None)
+    if not path:
+        return []
+    samples = []
+    for line in _tail_lines(path, limit or setting("WINDOW", 5000)):
+        try:
+            samples.append(json.loads(line))
+        except ValueError:
+            continue
+    return samples
+
+
+def percentile(values: list[float], pct: float, weights: list[float] | None = None) -> float:
+    """
+    Nearest-rank; `values` harus sudah terurut. Dgn `weights` (sejajar
+    `values`): nilai pertama yg bobot kumulatifnya mencapai pct% total.
+    """
+    if not values:
+        return 0.0
+    if weights is None:
+        return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+    target, total = pct / 100 * sum(weights), 0.0
+    for value, weight in zip(values, weights):
+        total += weight
+        if total >= target - 1e-9:
+            return value
+    return values[-1]
+
+
+def _weighted(items: list[dict], key: str):
+    """(nilai terurut, bobot sejajar); baris log lama tanpa `weight` = 1."""
+    pairs = sorted((s.get(key, 0), s.get("weight", 1)) for s in items)
+    return [v for v, _ in pairs], [w for _, w in pairs]
+
+
+def summarize(samples: list[dict]) -> list[dict]:
+    """Agregasi per endpoint (persentil berbobot), urut p95 terlama di atas."""
+    groups = defaultdict(list)
+    for s in samples:
+        groups[s.get("endpoint") or s.get("path")].append(s)
+    rows = []
+    for endpoint, items in groups.items():
+        wall, wall_w = _weighted(items, "wall_ms")
+        queries, queries_w = _weighted(items, "db_queries")
+        db, db_w = _weighted(items, "db_ms")
+        tpl, tpl_w = _weighted(items, "template_ms")
+        slowest = max(items, key=lambda s: s.get("slowest_sql_ms", 0))
+        rows.append({
+            "endpoint": endpoint,
+            "count": len(items),
+            "p50": percentile(wall, 50, wall_w),
+            "p95": percentile(wall, 95, wall_w),
+            "p99": percentile(wall, 99, wall_w),
+            "queries_p95": percentile(queries, 95, queries_w),
+            "queries_max": queries[-1],
+            "db_p95": percentile(db, 95, db_w),
+            "template_p95": percentile(tpl, 95, tpl_w),
+            "slowest_sql": slowest.get("slowest_sql", ""),
+            "slowest_sql_ms": slowest.get("slowest_sql_ms", 0),
+        })
+    rows.sort(key=lambda r: r["p95"], reverse=True)
+    return rows
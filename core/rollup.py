@@ -0,0 +1,198 @@
+"""
+Rekap harian DailyLetterStats, dipelihara inkremental.
+
+Satu surat dihitung sekali per dimensi, pada hari ia dibuat (tanggal lokal):
+  - Karta Tama: status, priority, received_via, tag (satu per klasifikasi)
+  - Karta Sai : status, template
+Perubahan status/prioritas memindahkan hitungan (-1 nilai lama, +1 nilai baru).
+
+Nilai lama diambil dari snapshot saat instance dimuat (post_init), jadi
+tidak ada query tambahan per save. queryset.update() tidak memicu signal →
+pakai bulk_update_status() di aksi massal.
+"""
+from __future__ import annotations
+from collections import Counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncYear
+from django.utils import timezone
+
+from core import audit, verify
+from core.models import DailyLetterStats, IncomingLetter, OutgoingLetter
+
+# kind → {dimensi: field model}
+DIMENSIONS = {
+    "in": {"status": "status", "priority": "priority", "received_via": "received_via"},
+    "out": {"status": "status", "template": "template_type"},
+}
+
+KIND_OF = {IncomingLetter: "in", OutgoingLetter: "out"}
+
+
+def _day(dt):
+    return timezone.localdate(dt) if timezone.is_aware(dt) else dt.date()
+
+
+def bump(day, kind: str, dimension: str, value, delta: int) -> None:
+    """Tambah `delta` ke satu sel rekap (UPDATE atomik, buat baris bila belum ada)."""
+    if not delta or value is None:
+        return
+    rows = DailyLetterStats.objects.filter(day=day, kind=kind, dimension=dimension, value=value)
+    if rows.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            DailyLetterStats.objects.create(day=day, kind=kind, dimension=dimension, value=value, count=delta)
+    except IntegrityError:
+        rows.update(count=F("count") + delta)
+
+
+def _apply(counter: Counter) -> None:
+    for (day, kind, dimension, value), delta in counter.items():
+        bump(day, kind, dimension, value, delta)
+
+
+# ========== SNAPSHOT & SIGNAL HANDLER ==========
+
+def snapshot(instance) -> None:
+    """Simpan nilai dimensi saat ini (field deferred dilewati → tanpa query)."""
+    kind = KIND_OF[instance._meta.concrete_model]
+    instance._rollup_orig = {
+        f: instance.__dict__[f] for f in DIMENSIONS[kind].values() if f in instance.__dict__
+    }
+
+
+def on_save(instance, created: bool) -> None:
+    kind = KIND_OF[instance._meta.concrete_model]
+    if not instance.created_at:
+        return
+    day = _day(instance.created_at)
+    delta = Counter()
+    orig = getattr(instance, "_rollup_orig", {})
+    for dim, field in DIMENSIONS[kind].items():
+        new = getattr(instance, field)
+        if created:
+            delta[(day, kind, dim, new)] += 1
+        elif field in orig and orig[field] != new:
+            delta[(day, kind, dim, orig[field])] -= 1
+            delta[(day, kind, dim, new)] += 1
+    _apply(delta)
+    snapshot(instance)
+
+
+def on_bulk_create(instances, tag_names=None) -> None:
+    """
+    Pengganti on_save(created=True) utk bulk_create (tanpa signal):
+    satu UPDATE per sel rekap, bukan per surat. `tag_names` = {pk: [nama tag]}.
+    """
+    delta = Counter()
+    for instance in instances:
+        kind = KIND_OF[instance._meta.concrete_model]
+        day = _day(instance.created_at)
+        for dim, field in DIMENSIONS[kind].items():
+            delta[(day, kind, dim, getattr(instance, field))] += 1
+        for name in (tag_names or {}).get(instance.pk, ()):
+            delta[(day, kind, "tag", name)] += 1
+        snapshot(instance)
+    _apply(delta)
+
+
+def on_delete(instance, tag_names=()) -> None:
+    kind = KIND_OF[instance._meta.concrete_model]
+    day = _day(instance.created_at)
+    delta = Counter()
+    for dim, field in DIMENSIONS[kind].items():
+        delta[(day, kind, dim, getattr(instance, field))] -= 1
+    for name in tag_names:
+        delta[(day, kind, "tag", name)] -= 1
+    _apply(delta)
+
+
+def on_tags_changed(letter: IncomingLetter, tag_names, sign: int) -> None:
+    day = _day(letter.created_at)
+    _apply(Counter({(day, "in", "tag", name): sign for name in tag_names}))
+
+
+def on_tag_renamed(old: str, new: str) -> None:
+    """Dimensi tag di-key nama → pindahkan hitungan ke nama baru (gabung bila sudah ada)."""
+    rows = DailyLetterStats.objects.filter(kind="in", dimension="tag", value=old)
+    with transaction.atomic():
+        for day, count in rows.values_list("day", "count"):
+            bump(day, "in", "tag", new, count)
+        rows.delete()
+
+
+def on_tag_deleted(name: str) -> None:
+    # relasi M2M ikut terhapus (cascade) tanpa m2m_changed → semua hitungan tag jadi 0
+    DailyLetterStats.objects.filter(kind="in", dimension="tag", value=name).delete()
+
+
+def bulk_update_status(queryset, status: str) -> int:
+    """
+    Pengganti queryset.update(status=...) yg ikut memindahkan hitungan rekap,
+    menaikkan updated_at (ETag API/verifikasi), membuang cache verifikasi dan
+    mencatat event audit "status" per surat. Return jumlah baris yg di-update.
+    """
+    kind = KIND_OF[queryset.model._meta.concrete_model]
+    code_field = "agenda_number" if kind == "in" else "number"
+    with transaction.atomic():
+        changed = list(queryset.exclude(status=status).values_list("pk", "status", code_field))
+        delta = Counter()
+        grouped = (queryset.exclude(status=status).order_by()
+                   .annotate(day=TruncDate("created_at"))
+                   .values("day", "status").annotate(n=Count("pk")))
+        for row in grouped:
+            delta[(row["day"], kind, "status", row["status"])] -= row["n"]
+            delta[(row["day"], kind, "status", status)] += row["n"]
+        updated = queryset.update(status=status, updated_at=timezone.now())
+        _apply(delta)
+        verify.invalidate(*(code for _, _, code in changed))
+    ct = ContentType.objects.get_for_model(queryset.model, for_concrete_model=True)
+    for pk, old, _ in changed:
+        audit.record_on_commit("status", content_type=ct, object_id=pk, extra={"from": old, "to": status})
+    return updated
+
+
+# ========== REBUILD ==========
+
+def rebuild() -> int:
+    """Hitung ulang seluruh rekap dgn GROUP BY (command rebuild_daily_stats & tes)."""
+    rows = []
+    for kind, model in (("in", IncomingLetter), ("out", OutgoingLetter)):
+        for dim, field in DIMENSIONS[kind].items():
+            grouped = (model.objects.order_by().annotate(day=TruncDate("created_at"))
+                       .values("day", field).annotate(n=Count("pk")))
+            rows += [DailyLetterStats(day=r["day"], kind=kind, dimension=dim, value=r[field], count=r["n"])
+                     for r in grouped]
+
+    through = IncomingLetter.classification_tags.through
+    grouped = (through.objects.order_by()
+               .annotate(day=TruncDate("incomingletter__created_at"))
+               .values("day", "classificationtag__name").annotate(n=Count("pk")))
+    rows += [DailyLetterStats(day=r["day"], kind="in", dimension="tag",
+                              value=r["classificationtag__name"], count=r["n"]) for r in grouped]
+
+    with transaction.atomic():
+        DailyLetterStats.objects.all().delete()
+        DailyLetterStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# ========== LAPORAN ==========
+
+def report(kind: str, dimension: str, date_from=None, date_to=None, period: str = "day"):
+    """
+    Baca rekap utk grafik: list dict {period, value, count}.
+    period = day | month | year (agregasi dilakukan di DB).
+    """
+    qs = DailyLetterStats.objects.filter(kind=kind, dimension=dimension)
+    if date_from:
+        qs = qs.filter(day__gte=date_from)
+    if date_to:
+        qs = qs.filter(day__lte=date_to)
+    trunc = {"month": TruncMonth("day"), "year": TruncYear("day")}.get(period)
+    qs = qs.annotate(period=trunc) if trunc else qs.annotate(period=F("day"))
+    return list(qs.values("period", "value").annotate(count=Sum("count"))
+                .filter(count__gt=0).order_by("period", "value"))
@@ -0,0 +1,207 @@
+"""
+Indeks full-text utk Karta Tama & Karta Sai.
+
+Backend:
+  - SQLite     → virtual table FTS5 `core_letter_fts` (ranking bm25)
+  - PostgreSQL → tabel `core_letter_fts` dgn kolom tsvector + index GIN (ts_rank_cd)
+Backend lain → search_letters() mengembalikan None, pemanggil fallback ke icontains.
+
+Utk Karta Tama, teks hasil ekstraksi Scan PDF / Asaun Tuir Mai (DocumentText)
+ikut diindeks sehingga surat bisa dicari dari isinya.
+
+Indeks disinkronkan lewat signal (core/signals.py) dan bisa dibangun ulang
+dengan `python manage.py rebuild_search_index`.
+"""
+from __future__ import annotations
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+TABLE = "core_letter_fts"
+
+# Kolom teks yg diindeks per jenis surat
+FIELDS = {
+    "in": ("agenda_number", "subject", "origin", "origin_number"),
+    "out": ("number", "subject", "body"),
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# SQLite: rowid = pk * 2 + bit jenis → upsert/delete lewat rowid (tanpa scan)
+_KIND_BIT = {"in": 0, "out": 1}
+
+
+def _rowid(kind: str, pk: int) -> int:
+    return int(pk) * 2 + _KIND_BIT[kind]
+
+
+def backend(conn=None) -> str | None:
+    vendor = (conn or connection).vendor
+    return vendor if vendor in ("sqlite", "postgresql") else None
+
+
+# ========== SINKRONISASI ==========
+
+def _texts(kind: str, values: dict) -> tuple[str, str, str, str]:
+    """(code, subject, content, doc_text) dari field surat."""
+    code_field, subject_field, *rest = FIELDS[kind]
+    content = " ".join(str(values.get(f) or "") for f in rest)
+    return values.get(code_field) or "", values.get(subject_field) or "", content, values.get("doc_text", "")
+
+
+def _with_doc_text(rows, batch_size: int = 500):
+    """Tempel teks DocumentText ke tiap row surat masuk (1 query per batch)."""
+    from core.models import DocumentText
+
+    batch = []
+    def flush():
+        texts = {}
+        for letter_id, text in (DocumentText.objects
+                                .filter(letter_id__in=[r["pk"] for r in batch], status="DONE")
+                                .values_list("letter_id", "text")):
+            texts.setdefault(letter_id, []).append(text)
+        for r in batch:
+            r["doc_text"] = "\n".join(texts.get(r["pk"], ()))
+        return batch
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield from flush()
+            batch = []
+    if batch:
+        yield from flush()
+
+
+def index_rows(kind: str, rows, with_docs: bool = True) -> int:
+    """Upsert banyak surat sekaligus. `rows` = iterable dict (pk + FIELDS[kind])."""
+    vendor = backend()
+    if not vendor:
+        return 0
+    if kind == "in" and with_docs:
+        rows = _with_doc_text(rows)
+    n = 0
+    with connection.cursor() as cur:
+        for values in rows:
+            code, subject, content, doc_text = _texts(kind, values)
+            pk = values["pk"]
+            if vendor == "sqlite":
+                cur.execute(
+                    f"INSERT OR REPLACE INTO {TABLE} (rowid, kind, object_id, code, subject, content) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    [_rowid(kind, pk), kind, pk, code, subject, f"{content}\n{doc_text}"],
+                )
+            else:
+                cur.execute(
+                    f"INSERT INTO {TABLE} (kind, object_id, document) VALUES (%s, %s, "
+                    "setweight(to_tsvector('simple', %s), 'A') || "
+                    "setweight(to_tsvector('simple', %s), 'B') || "
+                    "setweight(to_tsvector('simple', %s), 'C') || "
+                    "setweight(to_tsvector('simple', %s), 'D')) "
+                    "ON CONFLICT (kind, object_id) DO UPDATE SET document = EXCLUDED.document",
+                    [kind, pk, code.replace("/", " "), subject, content, doc_text],
+                )
+            n += 1
+    return n
+
+
+def index_letter(kind: str, instance) -> None:
+    values = {f: getattr(instance, f) for f in FIELDS[kind]}
+    values["pk"] = instance.pk
+    index_rows(kind, [values])
+
+
+def unindex_letter(kind: str, pk: int) -> None:
+    vendor = backend()
+    if not vendor:
+        return
+    with connection.cursor() as cur:
+        if vendor == "sqlite":
+            cur.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [_rowid(kind, pk)])
+        else:
+            cur.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, pk])
+
+
+def rebuild(kind: str, qs, chunk_size: int = 2000, with_docs: bool = True) -> int:
+    """Bangun ulang indeks utk satu jenis surat dari queryset (with_docs: ikut teks DocumentText)."""
+    if not backend():
+        return 0
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {TABLE} WHERE kind = %s", [kind])
+    rows = qs.values("pk", *FIELDS[kind]).iterator(chunk_size=chunk_size)
+    return index_rows(kind, rows, with_docs=with_docs)
+
+
+# ========== PENCARIAN ==========
+
+def _tokens(query: str) -> list[str]:
+    return _TOKEN_RE.findall(query or "")
+
+
+def _match_expr(vendor: str, tokens: list[str]):
+    """
+    (kondisi MATCH, parameternya, ekspresi rank, parameternya) utk `vendor`.
+    Token terakhir diperlakukan sbg prefix (semua token, utk ketik-langsung).
+    Rank: makin kecil makin relevan di kedua backend.
+    """
+    if vendor == "sqlite":
+        match = " ".join('"%s"*' % t.replace('"', "") for t in tokens)
+        return f"{TABLE} MATCH %s", [match], f"bm25({TABLE}, 0, 0, 10.0, 5.0, 1.0)", []
+    tsquery = " & ".join(f"{t}:*" for t in tokens)
+    return (f"{TABLE}.document @@ to_tsquery('simple', %s)", [tsquery],
+            f"-ts_rank_cd({TABLE}.document, to_tsquery('simple', %s))", [tsquery])
+
+
+def search_letters(query: str, kind: str | None = None, limit: int = 50):
+    """
+    Cari surat, urut relevansi (lihat _match_expr).
+    Return list (kind, object_id, rank), atau None kalau backend tidak didukung.
+    """
+    vendor = backend()
+    if not vendor:
+        return None
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    where, where_params, rank, rank_params = _match_expr(vendor, tokens)
+    kind_sql, kind_params = (" AND kind = %s", [kind]) if kind else ("", [])
+    sql = (f"SELECT kind, object_id, {rank} AS rank FROM {TABLE} "
+           f"WHERE {where}{kind_sql} ORDER BY rank LIMIT %s")
+    with connection.cursor() as cur:
+        cur.execute(sql, [*rank_params, *where_params, *kind_params, limit])
+        return [(k, int(pk), rank) for k, pk, rank in cur.fetchall()]
+
+
+# nama anotasi relevansi (kecil = lebih relevan, di kedua backend)
+RANK = "fts_rank"
+
+
+def filter_queryset(qs, query: str, kind: str):
+    """
+    Saring queryset surat lewat subquery ke indeks full-text (tanpa batas
+    jumlah hasil), dianotasi RANK & diurutkan relevansi.
+    Return None kalau FTS tidak tersedia (pemanggil fallback ke icontains).
+    """
+    vendor = backend()
+    if not vendor:
+        return None
+    tokens = _tokens(query)
+    if not tokens:
+        return qs.none()
+    where, where_params, rank, rank_params = _match_expr(vendor, tokens)
+    qn = connection.ops.quote_name
+    pk = f"{qn(qs.model._meta.db_table)}.{qn(qs.model._meta.pk.column)}"
+    if vendor == "sqlite":
+        # rank per baris lewat rowid (pk * 2 + bit jenis) → lookup, bukan scan
+        row = f"{TABLE}.rowid = {pk} * 2 + %s"
+        row_params = [_KIND_BIT[kind]]
+    else:
+        row = f"{TABLE}.kind = %s AND {TABLE}.object_id = {pk}"
+        row_params = [kind]
+    matched = RawSQL(f"SELECT object_id FROM {TABLE} WHERE {where} AND kind = %s", [*where_params, kind])
+    ranked = RawSQL(f"SELECT {rank} FROM {TABLE} WHERE {where} AND {row}",
+                    [*rank_params, *where_params, *row_params], output_field=FloatField())
+    return qs.filter(pk__in=matched).annotate(**{RANK: ranked}).order_by(RANK, "-pk")
@@ -0,0 +1,109 @@
+"""
+Serializer API v1 (core/api.py).
+
+Field relasi ditulis sebagai pk / nama (tanpa nested object) → satu baris
+JOIN/prefetch per relasi, bukan query per item. Sparse fieldset:
+?fields=id,subject,status hanya merender (dan memuat) kolom itu.
+"""
+from __future__ import annotations
+
+from rest_framework import serializers
+
+from core.models import (
+    IncomingLetter, OutgoingLetter, Disposition, DispositionAssignment, ClassificationTag,
+    InboxItem,
+)
+
+
+class SparseFieldsMixin:
+    """?fields=a,b,c → hanya field itu yg dirender (field tak dikenal diabaikan)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        wanted = requested_fields(request)
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+def requested_fields(request) -> set[str] | None:
+    raw = request.query_params.get("fields") if request is not None else None
+    return {f.strip() for f in raw.split(",") if f.strip()} if raw else None
+
+
+class IncomingLetterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    classification_tags = serializers.SlugRelatedField(
+        slug_field="name", many=True, required=False, queryset=ClassificationTag.objects.all(),
+    )
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = IncomingLetter
+        fields = [
+            "id", "agenda_number", "received_via", "origin", "origin_number", "origin_date",
+            "subject", "priority", "status", "current_handler", "classification_tags",
+            "created_by", "created_at", "updated_at", "retention_class", "retention_until",
+        ]
+        read_only_fields = ["agenda_number", "created_at", "updated_at"]
+
+
+class OutgoingLetterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = OutgoingLetter
+        fields = [
+            "id", "number", "template_type", "subject", "body", "status",
+            "created_by", "created_at", "updated_at", "retention_class", "retention_until",
+        ]
+        # nomor dikunci otomatis saat FINAL (core/signals.py)
+        read_only_fields = ["number", "created_at", "updated_at"]
+
+
+class AssignmentBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DispositionAssignment
+        fields = ["id", "assignee", "read_at", "completed_at"]
+
+
+class DispositionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    sender = serializers.PrimaryKeyRelatedField(read_only=True)
+    assignments = AssignmentBriefSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Disposition
+        fields = ["id", "letter", "sender", "note", "due_date", "allow_parallel", "parent",
+                  "created_at", "assignments"]
+        read_only_fields = ["created_at"]
+
+    def validate(self, attrs):
+        parent, letter = attrs.get("parent"), attrs.get("letter") or getattr(self.instance, "letter", None)
+        if parent and letter and parent.letter_id != letter.pk:
+            raise serializers.ValidationError({"parent": "Dispozisaun aman tenke husi karta hanesan."})
+        return attrs
+
+
+class DispositionAssignmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    letter = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DispositionAssignment
+        fields = ["id", "disposition", "letter", "assignee", "read_at", "completed_at"]
+
+    def get_letter(self, obj):
+        # list: dianotasi di queryset (letter_pk) → tanpa JOIN ke Disposition
+        pk = getattr(obj, "letter_pk", None)
+        return pk if pk is not None else obj.disposition.letter_id
+
+
+class InboxItemSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="assignment_id", read_only=True)
+    letter = serializers.IntegerField(source="letter_id", read_only=True)
+    disposition = serializers.IntegerField(source="disposition_id", read_only=True)
+
+    class Meta:
+        model = InboxItem
+        fields = ["id", "disposition", "letter", "agenda_number", "subject", "priority",
+                  "due_date", "assigned_at", "read_at", "completed_at"]
+
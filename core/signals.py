@@ -1,64 +1,53 @@
 from __future__ import annotations
 import logging
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import (
+    pre_save, post_save, post_delete, pre_delete, post_init, m2m_changed,
+)
 from django.dispatch import receiver
 from django.conf import settings
-from urllib.parse import urljoin
-
-from core.models import IncomingLetter, OutgoingLetter
+from django.contrib.contenttypes.models import ContentType
+from core.models import (
+    IncomingLetter, OutgoingLetter, FollowUp, DocumentText, ClassificationTag,
+    Disposition, DispositionAssignment,
+)
 from core.utils.numbering import generate_agenda_number, generate_outgoing_number
-from core.utils.qr import make_qr_png
-from core.utils.barcode import make_code128_png
+from core.jobs import enqueue_render
+from core import search
+from core.doctext import mark_source
+from core.utils.stats import invalidate_dashboard
+from core import rollup
+from core import audit
+from core import verify
+from core import inbox
 
 logger = logging.getLogger(__name__)
 
-def _verify_base() -> str:
-    """
-    Ambil base URL verifikasi publik.
-    - Jika kamu punya domain publik, set di settings:
-        PUBLIC_BASE_URL = "https://sistem.tic.gov.tl"
-        PUBLIC_VERIFY_PATH = "/verify/"
-        maka hasil final: https://sistem.tic.gov.tl/verify/<kode>
-    - Jika tidak, fallback "/verify/" → jadinya path relatif saja.
-    """
-    public_base = getattr(settings, "PUBLIC_BASE_URL", "")  
-    verify_path = getattr(settings, "PUBLIC_VERIFY_PATH", "/verify/")
-    if not verify_path.endswith("/"):
-        verify_path += "/"
-    return urljoin(public_base, verify_path)
-
 # ========== SURAT MASUK ==========
 
 @receiver(pre_save, sender=IncomingLetter)
 def incoming_pre_save(sender, instance: IncomingLetter, **kwargs):
+    """
+    Isi agenda_number bila kosong. Di dalam `agenda_number_block()` nomor
+    diambil dari blok yg sudah dipesan → tanpa query per surat.
+    """
     if not instance.agenda_number:
         instance.agenda_number = generate_agenda_number()
 
 @receiver(post_save, sender=IncomingLetter)
 def incoming_post_save(sender, instance: IncomingLetter, created: bool, **kwargs):
     """
-    Generate QR (link verifikasi publik) & barcode (berbasis agenda_number) sekali saja.
+    QR (link verifikasi publik) & barcode (berbasis agenda_number) dibuat
+    sekali saja, di worker setelah commit (lihat core.jobs).
+    Default-nya gambar disajikan on-the-fly (CODE_STORE_IMAGES=False).
     """
     try:
-        if instance.qr_image and instance.barcode_image:
+        if not getattr(settings, "CODE_STORE_IMAGES", False):
             return
-
-        # URL verifikasi publik menggunakan nomor agenda (stabil)
-        if instance.agenda_number and not instance.qr_image:
-            url = _verify_base() + instance.agenda_number
-            qr = make_qr_png(url)  # -> ContentFile
-            instance.qr_image.save(f"qr_in_{instance.pk}.png", qr, save=False)
-
-        # Barcode pakai nomor agenda
-        if instance.agenda_number and not instance.barcode_image:
-            bc = make_code128_png(instance.agenda_number)  # -> ContentFile
-            instance.barcode_image.save(f"bc_in_{instance.pk}.png", bc, save=False)
-
-        if instance.qr_image or instance.barcode_image:
-            instance.save(update_fields=["qr_image", "barcode_image"])
-
+        if not instance.agenda_number or (instance.qr_image and instance.barcode_image):
+            return
+        enqueue_render("in", instance.pk)
     except Exception as e:
-        logger.exception("Gagal generate QR/Barcode surat masuk id=%s: %s", instance.pk, e)
+        logger.exception("Gagal antri QR/Barcode surat masuk id=%s: %s", instance.pk, e)
 
 # ========== SURAT KELUAR ==========
 
@@ -75,16 +64,254 @@ def outgoing_pre_save(sender, instance: OutgoingLetter, **kwargs):
 @receiver(post_save, sender=OutgoingLetter)
 def outgoing_post_save(sender, instance: OutgoingLetter, created: bool, **kwargs):
     """
-    Generate QR ke halaman verifikasi publik (sekali saja) pakai number.
+    QR ke halaman verifikasi publik (sekali saja) pakai number, di worker.
     """
     try:
+        if not getattr(settings, "CODE_STORE_IMAGES", False):
+            return
         if instance.qr_image or not instance.number:
             return
+        enqueue_render("out", instance.pk)
+    except Exception as e:
+        logger.exception("Gagal antri QR surat keluar id=%s: %s", instance.pk, e)
+
+# ========== INDEKS FULL-TEXT ==========
+
+def _touches_index(kind: str, update_fields) -> bool:
+    # save(update_fields=["status"]) / simpan QR saja → kolom indeks tidak berubah
+    return update_fields is None or not set(update_fields).isdisjoint(search.FIELDS[kind])
+
+@receiver(post_save, sender=IncomingLetter)
+def incoming_search_index(sender, instance: IncomingLetter, raw: bool = False, update_fields=None, **kwargs):
+    if raw or not _touches_index("in", update_fields):
+        return
+    try:
+        search.index_letter("in", instance)
+    except Exception as e:
+        logger.exception("Gagal indeks pencarian surat masuk id=%s: %s", instance.pk, e)
+
+@receiver(post_save, sender=OutgoingLetter)
+def outgoing_search_index(sender, instance: OutgoingLetter, raw: bool = False, update_fields=None, **kwargs):
+    if raw or not _touches_index("out", update_fields):
+        return
+    try:
+        search.index_letter("out", instance)
+    except Exception as e:
+        logger.exception("Gagal indeks pencarian surat keluar id=%s: %s", instance.pk, e)
+
+@receiver(post_delete, sender=IncomingLetter)
+def incoming_search_unindex(sender, instance: IncomingLetter, **kwargs):
+    search.unindex_letter("in", instance.pk)
+
+@receiver(post_delete, sender=OutgoingLetter)
+def outgoing_search_unindex(sender, instance: OutgoingLetter, **kwargs):
+    search.unindex_letter("out", instance.pk)
+
+# ========== TEKS DOKUMEN (Scan PDF / Asaun Tuir Mai) ==========
+
+_NO_SNAPSHOT = object()
 
-        url = _verify_base() + instance.number
-        qr = make_qr_png(url)
-        instance.qr_image.save(f"qr_out_{instance.pk}.png", qr, save=False)
-        instance.save(update_fields=["qr_image"])
+def _scan_name(value) -> str:
+    return getattr(value, "name", value) or ""
 
+@receiver(post_init, sender=IncomingLetter)
+def incoming_scan_snapshot(sender, instance: IncomingLetter, **kwargs):
+    # nama file scan saat dimuat (field deferred → tanpa snapshot, tanpa query)
+    value = instance.__dict__.get("scan_pdf", _NO_SNAPSHOT)
+    instance._scan_orig = value if value is _NO_SNAPSHOT else _scan_name(value)
+
+@receiver(post_save, sender=IncomingLetter)
+def incoming_document_text(sender, instance: IncomingLetter, created: bool, raw: bool = False,
+                           update_fields=None, **kwargs):
+    """
+    Tandai Scan PDF baru utk diekstrak (offline). File tidak berubah
+    (snapshot post_init) / tidak ikut update_fields → tanpa query sama sekali.
+    """
+    if raw or (update_fields is not None and "scan_pdf" not in update_fields):
+        return
+    name = _scan_name(instance.scan_pdf)
+    if name == ("" if created else instance._scan_orig):
+        return
+    instance._scan_orig = name
+    try:
+        mark_source(instance.pk, "scan", instance.pk, instance.scan_pdf)
     except Exception as e:
-        logger.exception("Gagal generate QR surat keluar id=%s: %s", instance.pk, e)
\ No newline at end of file
+        logger.exception("Gagal antri ekstraksi teks surat masuk id=%s: %s", instance.pk, e)
+
+@receiver(post_save, sender=FollowUp)
+def followup_document_text(sender, instance: FollowUp, raw: bool = False, **kwargs):
+    if raw:
+        return
+    try:
+        mark_source(instance.letter_id, "followup", instance.pk, instance.file)
+    except Exception as e:
+        logger.exception("Gagal antri ekstraksi teks follow-up id=%s: %s", instance.pk, e)
+
+@receiver(post_delete, sender=FollowUp)
+def followup_document_text_delete(sender, instance: FollowUp, **kwargs):
+    deleted, _ = DocumentText.objects.filter(source="followup", source_id=instance.pk).delete()
+    if not deleted:
+        return
+    # teks follow-up yg dihapus keluar dari indeks surat
+    letter = IncomingLetter.objects.filter(pk=instance.letter_id).first()
+    if letter is not None:
+        search.index_letter("in", letter)
+
+# ========== CACHE DASHBOARD ==========
+
+@receiver(post_save, sender=IncomingLetter)
+@receiver(post_save, sender=OutgoingLetter)
+@receiver(post_delete, sender=IncomingLetter)
+@receiver(post_delete, sender=OutgoingLetter)
+def letter_dashboard_invalidate(sender, **kwargs):
+    invalidate_dashboard()
+
+# ========== CACHE VERIFIKASI PUBLIK ==========
+
+@receiver(post_save, sender=IncomingLetter)
+@receiver(post_delete, sender=IncomingLetter)
+def incoming_verify_invalidate(sender, instance: IncomingLetter, **kwargs):
+    verify.invalidate(instance.agenda_number)
+
+@receiver(post_save, sender=OutgoingLetter)
+@receiver(post_delete, sender=OutgoingLetter)
+def outgoing_verify_invalidate(sender, instance: OutgoingLetter, **kwargs):
+    verify.invalidate(instance.number)
+
+# ========== INBOX TAREFA (proyeksi InboxItem) ==========
+
+INBOX_STATE_FIELDS = {"read_at", "completed_at"}
+
+@receiver(post_save, sender=DispositionAssignment)
+def assignment_inbox_sync(sender, instance: DispositionAssignment, created: bool, raw: bool = False,
+                          update_fields=None, **kwargs):
+    if raw:
+        return
+    if not created and update_fields and set(update_fields) <= INBOX_STATE_FIELDS:
+        inbox.sync_assignment_state(instance)
+    else:
+        inbox.sync_assignment(instance)
+
+@receiver(post_delete, sender=DispositionAssignment)
+def assignment_inbox_delete(sender, instance: DispositionAssignment, **kwargs):
+    # baris InboxItem ikut terhapus (CASCADE), tinggal hitungan badge
+    inbox.invalidate_counts(instance.assignee_id)
+
+@receiver(post_save, sender=Disposition)
+def disposition_inbox_sync(sender, instance: Disposition, created: bool, raw: bool = False, **kwargs):
+    if not created and not raw:
+        inbox.sync_disposition(instance)
+
+@receiver(post_save, sender=IncomingLetter)
+def incoming_inbox_sync(sender, instance: IncomingLetter, created: bool, raw: bool = False, **kwargs):
+    if not created and not raw:
+        inbox.sync_letter(instance)
+
+# ========== REKAP HARIAN (DailyLetterStats) ==========
+
+@receiver(post_init, sender=IncomingLetter)
+@receiver(post_init, sender=OutgoingLetter)
+def letter_rollup_snapshot(sender, instance, **kwargs):
+    rollup.snapshot(instance)
+
+@receiver(post_save, sender=IncomingLetter)
+@receiver(post_save, sender=OutgoingLetter)
+def letter_rollup_save(sender, instance, created: bool, raw: bool = False, **kwargs):
+    if not raw:
+        rollup.on_save(instance, created)
+
+@receiver(pre_delete, sender=IncomingLetter)
+def incoming_rollup_tags_before_delete(sender, instance: IncomingLetter, **kwargs):
+    # relasi M2M ikut terhapus tanpa m2m_changed → catat dulu tag-nya
+    instance._rollup_tags = list(instance.classification_tags.values_list("name", flat=True))
+
+@receiver(post_delete, sender=IncomingLetter)
+@receiver(post_delete, sender=OutgoingLetter)
+def letter_rollup_delete(sender, instance, **kwargs):
+    rollup.on_delete(instance, getattr(instance, "_rollup_tags", ()))
+
+@receiver(post_init, sender=ClassificationTag)
+def tag_rollup_snapshot(sender, instance, **kwargs):
+    instance._rollup_name = instance.__dict__.get("name")
+
+@receiver(post_save, sender=ClassificationTag)
+def tag_rollup_rename(sender, instance, created: bool, raw: bool = False, **kwargs):
+    old = getattr(instance, "_rollup_name", None)
+    if not created and not raw and old and old != instance.name:
+        rollup.on_tag_renamed(old, instance.name)
+    instance._rollup_name = instance.name
+
+@receiver(post_delete, sender=ClassificationTag)
+def tag_rollup_delete(sender, instance, **kwargs):
+    rollup.on_tag_deleted(instance.name)
+
+@receiver(m2m_changed, sender=IncomingLetter.classification_tags.through)
+def incoming_rollup_tags(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    """Tag ditambah/dihapus → geser hitungan dimensi 'tag' (arah maju & balik)."""
+    if action == "pre_clear":
+        if reverse:
+            instance._rollup_cleared = list(instance.incomingletter_set.values_list("pk", flat=True))
+        else:
+            instance._rollup_cleared = list(instance.classification_tags.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        pk_set, sign = set(getattr(instance, "_rollup_cleared", ())), -1
+    elif action in ("post_add", "post_remove"):
+        sign = 1 if action == "post_add" else -1
+    else:
+        return
+    if not pk_set:
+        return
+    if reverse:  # instance = tag, pk_set = surat
+        for letter in IncomingLetter.objects.filter(pk__in=pk_set).only("pk", "created_at"):
+            rollup.on_tags_changed(letter, [instance.name], sign)
+    else:
+        names = ClassificationTag.objects.filter(pk__in=pk_set).values_list("name", flat=True)
+        rollup.on_tags_changed(instance, list(names), sign)
+
+# ========== JEJAK AUDIT (perubahan model) ==========
+
+@receiver(pre_save, sender=IncomingLetter)
+@receiver(pre_save, sender=OutgoingLetter)
+def letter_audit_status(sender, instance, **kwargs):
+    # status lama dari snapshot post_init (core/rollup.py) → tanpa query
+    old = getattr(instance, "_rollup_orig", {}).get("status")
+    if instance.pk and old is not None and old != instance.status:
+        instance._audit_status = (old, instance.status)
+
+@receiver(post_save, sender=IncomingLetter)
+@receiver(post_save, sender=OutgoingLetter)
+def letter_audit_save(sender, instance, created: bool, raw: bool = False, **kwargs):
+    if raw:
+        return
+    if created:
+        audit.record_on_commit("create", instance, extra={"status": instance.status})
+    elif getattr(instance, "_audit_status", None):
+        old, new = instance.__dict__.pop("_audit_status")
+        audit.record_on_commit("status", instance, extra={"from": old, "to": new})
+
+@receiver(post_init, sender=DispositionAssignment)
+def assignment_audit_snapshot(sender, instance, **kwargs):
+    instance._audit_orig = (instance.__dict__.get("read_at"), instance.__dict__.get("completed_at"))
+
+@receiver(post_save, sender=DispositionAssignment)
+def assignment_audit_save(sender, instance: DispositionAssignment, created: bool, raw: bool = False, **kwargs):
+    """Despacho dibaca / diselesaikan → event pada surat (bukan assignment) agar mudah dicari."""
+    if raw:
+        return
+    was_read, was_done = getattr(instance, "_audit_orig", (None, None))
+    actions = []
+    if instance.read_at and not was_read:
+        actions.append("dispo_read")
+    if instance.completed_at and not was_done:
+        actions.append("dispo_done")
+    instance._audit_orig = (instance.read_at, instance.completed_at)
+    if not actions:
+        return
+    letter_id = Disposition.objects.filter(pk=instance.disposition_id).values_list("letter_id", flat=True).first()
+    ct = ContentType.objects.get_for_model(IncomingLetter)
+    for action in actions:
+        audit.record_on_commit(action, content_type=ct, object_id=letter_id, extra={
+            "disposition": instance.disposition_id,
+            "assignee": instance.assignee_id,
+        })
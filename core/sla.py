@@ -0,0 +1,163 @@
+"""
+Mesin pengingat SLA Despacho (dipanggil `manage.py sla_reminder`, mis. via cron).
+
+- Satu query beranotasi: tugas TERBUKA (completed_at kosong) yg tenggatnya
+  lewat ("overdue") atau jatuh dalam SLA_DUE_SOON_DAYS hari ("soon"), dan
+  belum pernah dinotifikasi utk (jenis, tenggat) itu (NOT EXISTS SlaNotice).
+- Dikelompokkan per assignee → satu digest per user.
+- Dikirim lewat notifier (SLA_NOTIFIER); yg berhasil dicatat di SlaNotice
+  → run berikutnya hanya memproses yg baru (inkremental).
+
+Notifier bawaan: EmailNotifier (backend email Django; console/file backend
+sebagai pengganti lokal). Notifier lain: subclass Notifier & implementasikan send().
+"""
+from __future__ import annotations
+
+import abc
+import datetime
+import itertools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Case, CharField, Exists, F, OuterRef, Value, When
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import DispositionAssignment, SlaNotice
+
+FIELDS = (
+    "pk", "assignee_id", "kind", "due", "disposition_id", "letter_id",
+    "agenda_number", "subject", "priority", "read_at",
+)
+
+
+def pending(today: datetime.date | None = None, soon_days: int | None = None, include_notified: bool = False):
+    """Tugas yg perlu diingatkan (values dict), urut assignee lalu tenggat."""
+    today = today or timezone.localdate()
+    if soon_days is None:
+        soon_days = getattr(settings, "SLA_DUE_SOON_DAYS", 2)
+    qs = (DispositionAssignment.objects
+          .filter(completed_at__isnull=True,
+                  disposition__due_date__lte=today + datetime.timedelta(days=soon_days))
+          .annotate(
+              due=F("disposition__due_date"),
+              letter_id=F("disposition__letter_id"),
+              agenda_number=F("disposition__letter__agenda_number"),
+              subject=F("disposition__letter__subject"),
+              priority=F("disposition__letter__priority"),
+              kind=Case(When(disposition__due_date__lt=today, then=Value("overdue")),
+                        default=Value("soon"), output_field=CharField()),
+          ))
+    if not include_notified:
+        qs = qs.exclude(Exists(SlaNotice.objects.filter(
+            assignment=OuterRef("pk"), kind=OuterRef("kind"), due_date=OuterRef("due"),
+        )))
+    return qs.order_by("assignee_id", "due", "pk").values(*FIELDS)
+
+
+def digests(rows):
+    """Iterable baris `pending()` → (assignee_id, [baris]) per user."""
+    for assignee_id, items in itertools.groupby(rows, key=lambda r: r["assignee_id"]):
+        yield assignee_id, list(items)
+
+
+# ========== NOTIFIER ==========
+
+class Notifier(abc.ABC):
+    """Antarmuka notifier: kirim digest, return set assignee_id yg berhasil."""
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    @abc.abstractmethod
+    def send(self, batch: list[tuple]) -> set[int]:
+        """`batch` = [(user, [baris])]."""
+
+
+class EmailNotifier(Notifier):
+    """
+    Satu email per user lewat SATU koneksi backend per batch.
+    Backend: SLA_EMAIL_BACKEND (default EMAIL_BACKEND Django) — pakai
+    console/filebased backend sebagai pengganti lokal.
+    """
+
+    def open(self):
+        self.connection = get_connection(getattr(settings, "SLA_EMAIL_BACKEND", None))
+        self.connection.open()
+
+    def close(self):
+        self.connection.close()
+
+    def message(self, user, items) -> EmailMessage:
+        ctx = {
+            "user": user,
+            "overdue": [r for r in items if r["kind"] == "overdue"],
+            "soon": [r for r in items if r["kind"] == "soon"],
+            "base_url": getattr(settings, "PUBLIC_BASE_URL", ""),
+        }
+        return EmailMessage(
+            subject=render_to_string("email/sla_digest_subject.txt", ctx).strip(),
+            body=render_to_string("email/sla_digest.txt", ctx),
+            to=[user.email],
+            connection=self.connection,
+        )
+
+    def send(self, batch):
+        batch = [(user, items) for user, items in batch if user.email]
+        self.connection.send_messages([self.message(user, items) for user, items in batch])
+        return {user.pk for user, _ in batch}
+
+
+def get_notifier(path: str | None = None) -> Notifier:
+    return import_string(path or getattr(settings, "SLA_NOTIFIER", "core.sla.EmailNotifier"))()
+
+
+# ========== JALANKAN ==========
+
+def run(today=None, soon_days=None, notifier: Notifier | None = None, dry_run: bool = False,
+        batch_size: int = 200) -> dict:
+    """
+    Proses semua tugas pending. Return ringkasan
+    {"users", "tasks", "notified", "skipped"} (skipped = user tanpa alamat / gagal).
+    dry_run → hanya menghitung, tanpa kirim & tanpa mencatat.
+    """
+    User = get_user_model()
+    notifier = notifier or get_notifier()
+    summary = {"users": 0, "tasks": 0, "notified": 0, "skipped": 0}
+
+    def flush(batch):
+        if dry_run:
+            return
+        users = User.objects.in_bulk([assignee_id for assignee_id, _ in batch])
+        pairs = [(users[a], items) for a, items in batch if a in users]
+        sent = notifier.send(pairs)
+        notices = [SlaNotice(assignment_id=r["pk"], kind=r["kind"], due_date=r["due"])
+                   for user, items in pairs if user.pk in sent for r in items]
+        SlaNotice.objects.bulk_create(notices, ignore_conflicts=True)
+        summary["notified"] += len(sent)
+        summary["skipped"] += len(batch) - len(sent)
+
+    if not dry_run:
+        notifier.open()
+    try:
+        batch = []
+        # streaming (tanpa memuat semua baris): SlaNotice yg ditulis sambil jalan
+        # hanya utk user yg sudah lewat (urut assignee) → baris berikutnya tidak berubah
+        for assignee_id, items in digests(pending(today, soon_days).iterator(chunk_size=2000)):
+            summary["users"] += 1
+            summary["tasks"] += len(items)
+            batch.append((assignee_id, items))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        if not dry_run:
+            notifier.close()
+    return summary
@@ -0,0 +1,211 @@
+"""
+Uji beban konkuren penomoran (`manage.py stress_numbering`, juga dipakai test).
+
+Banyak worker (thread atau proses) bersamaan:
+  - "incoming": daftar surat masuk → nomor agenda dari signal pre_save;
+  - "final": buat draf surat keluar lalu transisi ke FINAL → nomor dikunci.
+Sebagian operasi sengaja di-rollback (rollback_rate) → counter ikut mundur.
+
+Setelah selesai dicek terhadap DB yg dikonfigurasi:
+  - unik: tidak ada nomor dobel;
+  - tanpa lubang: nomor yg ter-commit = tepat (counter_awal, counter_akhir];
+  - monoton: nomor per worker naik sesuai urutan operasinya;
+  - tiap surat FINAL punya nomor.
+Dilaporkan juga throughput & latensi (p50/p95/p99/max) per jenis operasi.
+
+Data uji ditandai origin/subject STRESS_MARK dan dihapus di akhir (keep=False).
+Counter NumberSequence TIDAK dikembalikan → jalankan di DB uji/salinan.
+"""
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.db import DatabaseError, connection, connections, transaction
+from django.utils import timezone
+
+from core.models import IncomingLetter, NumberSequence, OutgoingLetter
+from core.utils.numbering import set_outgoing_status
+
+STRESS_MARK = "[stress]"
+
+
+class _Rollback(Exception):
+    def __init__(self, number):
+        self.number = number
+
+
+def _split(number: str) -> tuple[str, int]:
+    """"AGD/2026/000123" → ("AGD/2026", 123)."""
+    base, _, seq = number.rpartition("/")
+    return base, int(seq)
+
+
+# ========== OPERASI ==========
+
+def _register(worker: int, i: int, rollback: bool) -> str:
+    with transaction.atomic():
+        letter = IncomingLetter(
+            origin=STRESS_MARK, origin_number=f"{worker}/{i}", origin_date=timezone.localdate(),
+            subject=f"{STRESS_MARK} worker {worker} #{i}",
+        )
+        letter.save()
+        if rollback:
+            raise _Rollback(letter.agenda_number)
+    return letter.agenda_number
+
+
+def _finalize(letter: OutgoingLetter, rollback: bool) -> str:
+    with transaction.atomic():
+        set_outgoing_status(letter, "FINAL")
+        if rollback:
+            raise _Rollback(letter.number)
+    return letter.number
+
+
+def _worker(worker: int, ops: int, final_ratio: float, rollback_rate: float, prefix: str,
+            seed: int, start_at: float) -> list[dict]:
+    rnd = random.Random(seed * 1000 + worker)
+    plan = [("final" if rnd.random() < final_ratio else "incoming", rnd.random() < rollback_rate)
+            for _ in range(ops)]
+    # draf dibuat dulu (tidak diukur) → yg diukur hanya transisi FINAL
+    drafts = [OutgoingLetter.objects.create(template_type=prefix, subject=f"{STRESS_MARK} worker {worker} #{i}",
+                                            body="...", status="DRAFT")
+              for i, (kind, _) in enumerate(plan) if kind == "final"]
+    time.sleep(max(0.0, start_at - time.time()))  # semua worker mulai bersamaan
+    results = []
+    try:
+        for i, (kind, rollback) in enumerate(plan):
+            row = {"worker": worker, "op": i, "kind": kind, "rollback": rollback, "number": None, "error": None}
+            t0 = time.perf_counter()
+            try:
+                if kind == "final":
+                    letter = drafts.pop(0)
+                    row["number"] = _finalize(letter, rollback)
+                else:
+                    row["number"] = _register(worker, i, rollback)
+            except _Rollback as e:
+                row["number"] = e.number
+                if kind == "final":
+                    letter.status, letter.number = "DRAFT", None  # objek ikut "rollback"
+            except DatabaseError as e:
+                row["error"] = f"{type(e).__name__}: {e}"
+            row["ms"] = (time.perf_counter() - t0) * 1000
+            results.append(row)
+    finally:
+        connection.close()
+    return results
+
+
+def _init_process():
+    # koneksi warisan proses induk tidak boleh dipakai bersama
+    import django
+    django.setup()
+    connections.close_all()
+
+
+# ========== JALANKAN & PERIKSA ==========
+
+def _counters() -> dict[str, int]:
+    year = timezone.now().year
+    return {f"{prefix}/{y}": value for prefix, y, value in
+            NumberSequence.objects.filter(year=year).values_list("prefix", "year", "last_value")}
+
+
+def _pct(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))], 3)
+
+
+def check(rows, before: dict, after: dict) -> list[str]:
+    """Daftar pelanggaran (kosong = lolos)."""
+    violations = []
+    committed = [r for r in rows if r["number"] and not r["rollback"] and not r["error"]]
+    seen = defaultdict(list)
+    for r in committed:
+        seen[r["number"]].append(r["worker"])
+    violations += [f"nomor dobel {n} (worker {w})" for n, w in seen.items() if len(w) > 1]
+
+    by_base = defaultdict(set)
+    for r in committed:
+        base, seq = _split(r["number"])
+        by_base[base].add(seq)
+    for base, seqs in by_base.items():
+        expected = set(range(before.get(base, 0) + 1, after.get(base, 0) + 1))
+        missing, extra = sorted(expected - seqs), sorted(seqs - expected)
+        if missing:
+            violations.append(f"{base}: lubang {missing[:10]}{'…' if len(missing) > 10 else ''}")
+        if extra:
+            violations.append(f"{base}: di luar counter {extra[:10]}")
+
+    last = {}
+    for r in sorted(committed, key=lambda r: (r["worker"], r["op"])):
+        base, seq = _split(r["number"])
+        key = (r["worker"], base)
+        if key in last and seq <= last[key]:
+            violations.append(f"worker {r['worker']}: {r['number']} tidak naik (sebelumnya {last[key]})")
+        last[key] = seq
+
+    unnumbered = OutgoingLetter.objects.filter(subject__startswith=STRESS_MARK, status="FINAL", number__isnull=True)
+    if unnumbered.exists():
+        violations.append(f"{unnumbered.count()} surat FINAL tanpa nomor")
+    stored = set(IncomingLetter.objects.filter(origin=STRESS_MARK).values_list("agenda_number", flat=True))
+    stored |= set(OutgoingLetter.objects.filter(subject__startswith=STRESS_MARK, number__isnull=False)
+                  .values_list("number", flat=True))
+    lost = {r["number"] for r in committed} - stored
+    if lost:
+        violations.append(f"{len(lost)} nomor ter-commit tidak ada di DB, mis. {sorted(lost)[:5]}")
+    return violations
+
+
+def cleanup() -> None:
+    IncomingLetter.objects.filter(origin=STRESS_MARK).delete()
+    OutgoingLetter.objects.filter(subject__startswith=STRESS_MARK).delete()
+
+
+def run(*, workers: int = 8, ops: int = 50, mode: str = "thread", final_ratio: float = 0.5,
+        rollback_rate: float = 0.05, prefix: str = "ST", seed: int = 2026, keep: bool = False) -> dict:
+    before = _counters()
+    start_at = time.time() + 0.5 + workers * 0.02
+    args = [(w, ops, final_ratio, rollback_rate, prefix, seed, start_at) for w in range(workers)]
+    if mode == "process":
+        connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_process)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stress")
+    with pool:
+        futures = [pool.submit(_worker, *a) for a in args]
+        rows = [row for f in futures for row in f.result()]
+    elapsed = max(0.001, time.time() - start_at)
+    after = _counters()
+
+    violations = check(rows, before, after)
+    errors = [r["error"] for r in rows if r["error"]]
+    latency = {}
+    for kind in ("incoming", "final"):
+        ms = [r["ms"] for r in rows if r["kind"] == kind and not r["error"]]
+        latency[kind] = {"n": len(ms), "mean": round(statistics.fmean(ms), 3) if ms else None,
+                         "p50": _pct(ms, 50), "p95": _pct(ms, 95), "p99": _pct(ms, 99),
+                         "max": round(max(ms), 3) if ms else None}
+    if not keep:
+        cleanup()
+    return {
+        "database": connection.vendor,
+        "mode": mode,
+        "workers": workers,
+        "ops": len(rows),
+        "committed": sum(1 for r in rows if r["number"] and not r["rollback"] and not r["error"]),
+        "rolled_back": sum(1 for r in rows if r["rollback"] and not r["error"]),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_ops_s": round(len(rows) / elapsed, 1),
+        "latency_ms": latency,
+        "violations": violations,
+        "ok": not violations and not errors,
+    }
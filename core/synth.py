@@ -0,0 +1,302 @@
+"""
+Generator data sintetis berskala produksi (`manage.py generate_data`).
+
+Distribusi dibuat mendekati pola kantor:
+  - surat masuk per hari kerja ~ per_day (± musiman per bulan, akhir pekan sepi);
+  - asal surat mengikuti sebaran Zipf (beberapa instansi dominan);
+  - status mengikuti umur surat (lama → DONE/ARCH, baru → REG/PROG);
+  - despacho berantai (aman → anak), 1–3 tugas per despacho, tugas lama
+    hampir semua selesai, yg baru sebagian masih terbuka;
+  - asaun tuir mai, surat keluar dgn passu revisaun & ekspedisaun.
+
+Semua lewat bulk_create per bulan (tanpa signal); sesudahnya turunan
+(rekap harian, indeks full-text, inbox, counter nomor) dibangun ulang sekali.
+Nomor agenda / surat keluar melanjutkan counter yg ada → tidak bentrok.
+"""
+from __future__ import annotations
+
+import calendar
+import datetime
+import random
+from contextlib import contextmanager
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from core import inbox, rollup, search
+from core.models import (
+    ClassificationTag, Disposition, DispositionAssignment, ExpeditionRecord, FollowUp,
+    IncomingLetter, NumberSequence, OutgoingLetter, ReviewStep,
+)
+from core.utils.numbering import _last_seq
+from core.utils.stats import invalidate_dashboard
+from core.utils_retention import compute_retention_until
+
+USER_PREFIX = "synth"
+TAGS = ["Finansas", "Rekursus Umanus", "Planeamentu", "Lojístika", "Legal", "Kooperasaun", "Aprovizionamentu"]
+RETENTION = {"Finansas": "TER", "Legal": "RHS", "Rekursus Umanus": "RHS"}
+ORIGINS = [
+    "Ministériu Finansas", "Ministériu Edukasaun", "Ministériu Saúde", "Ministériu Justisa",
+    "Ministériu Negósiu Estranjeiru", "Ministériu Administrasaun Estatal", "Ministériu Agrikultura",
+    "Ministériu Obras Públikas", "Ministériu Turizmu", "Ministériu Transporte", "Komisaun Funsaun Públika",
+    "Prezidénsia Konsellu Ministrus", "Parlamentu Nasionál", "Tribunál Rekursu", "Kámara Kontas",
+    "Banku Sentrál", "Munisípiu Díli", "Munisípiu Baucau", "Munisípiu Bobonaro", "Munisípiu Ermera",
+    "ANPM", "TIC TIMOR", "EDTL", "APORTIL", "UNTL", "ONU", "Embaixada Portugál", "Embaixada Austrália",
+]
+SUBJECTS = [
+    "Pedidu apoiu", "Konvite ba enkontru", "Relatóriu trimestrál", "Proposta orsamentu",
+    "Notifikasaun auditoria", "Pedidu informasaun", "Kontratu servisu", "Rekrutamentu funsionáriu",
+    "Manutensaun ekipamentu", "Planu asaun anuál", "Pedidu lisensa", "Resposta ba karta",
+]
+# faktor musiman per bulan (Jan..Des): Jan & Des sepi, tengah tahun ramai
+SEASON = [0.7, 0.9, 1.0, 1.05, 1.1, 1.1, 1.05, 1.1, 1.15, 1.1, 1.0, 0.65]
+
+
+@contextmanager
+def manual_timestamps(*fields):
+    """Matikan auto_now_add sementara supaya created_at bisa diisi tanggal lampau."""
+    saved = [(f, f.auto_now_add) for f in fields]
+    for f, _ in saved:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in saved:
+            f.auto_now_add = value
+
+
+def _field(model, name):
+    return model._meta.get_field(name)
+
+
+class Generator:
+    def __init__(self, *, years=3, per_day=30, users=60, seed=2026, end=None, log=None):
+        self.rnd = random.Random(seed)
+        self.years = years
+        self.per_day = per_day
+        self.end = end or timezone.localdate()
+        self.start = self.end - relativedelta(years=years)
+        self.log = log or (lambda msg: None)
+        self.n_users = users
+        self.counters = {}
+        self.counts = dict.fromkeys(
+            ["incoming", "dispositions", "assignments", "followups", "outgoing", "reviews", "expeditions"], 0)
+        # Zipf: instansi ke-k punya bobot 1/k
+        self.origin_weights = [1 / (k + 1) for k in range(len(ORIGINS))]
+
+    # ---------- persiapan ----------
+
+    def setup(self):
+        existing = list(User.objects.filter(username__startswith=f"{USER_PREFIX}_"))
+        missing = [User(username=f"{USER_PREFIX}_{i:03d}", first_name=f"Staf {i}", is_staff=True,
+                        email=f"{USER_PREFIX}{i}@example.org")
+                   for i in range(len(existing), self.n_users)]
+        self.users = existing + User.objects.bulk_create(missing)
+        # beberapa pimpinan menerima jauh lebih banyak despacho
+        self.user_weights = [5 if i < 5 else 1 for i in range(len(self.users))]
+        for name in TAGS:
+            ClassificationTag.objects.get_or_create(name=name)
+        self.tags = dict(ClassificationTag.objects.filter(name__in=TAGS).values_list("name", "pk"))
+        self.ct_out = ContentType.objects.get_for_model(OutgoingLetter)
+
+    def _user(self):
+        return self.rnd.choices(self.users, self.user_weights)[0]
+
+    def _next_number(self, prefix: str, year: int, qs, field: str, width: int) -> str:
+        key = (prefix, year)
+        if key not in self.counters:
+            base = f"{prefix}/{year}/"
+            row = NumberSequence.objects.filter(prefix=prefix, year=year).values_list("last_value", flat=True).first()
+            self.counters[key] = max(row or 0, _last_seq(qs, field, base))
+        self.counters[key] += 1
+        return f"{prefix}/{year}/{self.counters[key]:0{width}d}"
+
+    def _stamp(self, day: datetime.date, hour_from=8, hour_to=17) -> datetime.datetime:
+        t = datetime.time(self.rnd.randint(hour_from, hour_to - 1), self.rnd.randint(0, 59), self.rnd.randint(0, 59))
+        return timezone.make_aware(datetime.datetime.combine(day, t))
+
+    def _after(self, stamp: datetime.datetime, max_days: float) -> datetime.datetime | None:
+        """Waktu acak setelah `stamp` (None kalau melewati akhir periode = belum terjadi)."""
+        value = stamp + datetime.timedelta(days=self.rnd.expovariate(3 / max_days))
+        return value if value.date() <= self.end else None
+
+    # ---------- per hari ----------
+
+    def _daily_count(self, day: datetime.date, base: float) -> int:
+        factor = SEASON[day.month - 1] * (0.08 if day.weekday() >= 5 else 1)
+        return max(0, round(self.rnd.gauss(base * factor, base * factor * 0.25)))
+
+    def _incoming_status(self, age_days: int) -> str:
+        if age_days < 7:
+            return self.rnd.choices(["REG", "PROG", "DONE"], [5, 4, 1])[0]
+        if age_days < 60:
+            return self.rnd.choices(["REG", "PROG", "DONE", "ARCH"], [1, 3, 5, 1])[0]
+        return self.rnd.choices(["PROG", "DONE", "ARCH"], [1, 4, 6])[0]
+
+    def _outgoing_status(self, age_days: int) -> str:
+        # hanya status bernomor: `number` unik & draf bernomor kosong → maks. satu draf di DB
+        if age_days < 14:
+            return self.rnd.choices(["FINAL", "SENT"], [1, 1])[0]
+        return self.rnd.choices(["FINAL", "SENT", "ARCH"], [1, 6, 3])[0]
+
+    def month(self, first: datetime.date, last: datetime.date):
+        rnd = self.rnd
+        letters, tag_rows, out_letters = [], [], []
+        day = first
+        while day <= last:
+            age = (self.end - day).days
+            for _ in range(self._daily_count(day, self.per_day)):
+                created = self._stamp(day)
+                tags = rnd.sample(TAGS, rnd.choices([0, 1, 2], [2, 6, 2])[0])
+                status = self._incoming_status(age)
+                retention_class = RETENTION.get(tags[0], "UM") if tags else ""
+                letter = IncomingLetter(
+                    received_via=rnd.choices(["fisik", "email"], [7, 3])[0],
+                    origin=rnd.choices(ORIGINS, self.origin_weights)[0],
+                    origin_number=f"{rnd.randint(1, 9999)}/{day.year}/{rnd.randint(1, 99):02d}",
+                    origin_date=day - datetime.timedelta(days=rnd.randint(0, 10)),
+                    subject=f"{rnd.choice(SUBJECTS)} — {rnd.choice(ORIGINS)}",
+                    priority=rnd.choices(["B", "S", "SS"], [75, 20, 5])[0],
+                    agenda_number=self._next_number("AGD", day.year, IncomingLetter.objects, "agenda_number", 6),
+                    status=status,
+                    current_handler=self._user() if status in ("REG", "PROG") else None,
+                    created_by=self._user(),
+                    created_at=created,
+                    retention_class=retention_class,
+                    retention_until=compute_retention_until(retention_class, day) if status == "ARCH" else None,
+                    disposed_at=min(day + datetime.timedelta(days=rnd.randint(30, 120)), self.end)
+                                if status == "ARCH" else None,
+                )
+                letters.append(letter)
+                tag_rows.append(tags)
+            for _ in range(self._daily_count(day, self.per_day * 0.6)):
+                kind = rnd.choices(["ND", "ST", "UD", "MM", "LN"], [4, 3, 2, 2, 1])[0]
+                status = self._outgoing_status(age)
+                out_letters.append(OutgoingLetter(
+                    template_type=kind,
+                    subject=f"{rnd.choice(SUBJECTS)} ba {rnd.choice(ORIGINS)}",
+                    body="\n\n".join(rnd.choice(SUBJECTS) + ". " * rnd.randint(5, 40) for _ in range(rnd.randint(2, 6))),
+                    number=self._next_number(kind, day.year, OutgoingLetter.objects, "number", 5),
+                    status=status,
+                    created_by=self._user(),
+                    created_at=self._stamp(day),
+                    retention_class="UM" if status == "ARCH" else "",
+                    retention_until=compute_retention_until("UM", day) if status == "ARCH" else None,
+                ))
+            day += datetime.timedelta(days=1)
+
+        self._insert(letters, tag_rows, out_letters)
+
+    def _insert(self, letters, tag_rows, out_letters):
+        rnd = self.rnd
+        letters = IncomingLetter.objects.bulk_create(letters, batch_size=1000)
+        through = IncomingLetter.classification_tags.through
+        through.objects.bulk_create([
+            through(incomingletter_id=letter.pk, classificationtag_id=self.tags[name])
+            for letter, names in zip(letters, tag_rows) for name in names
+        ], batch_size=2000)
+
+        # despacho: aman + 0–2 anak (rantai), tenggat pada ~50%
+        roots = []
+        for letter in letters:
+            if letter.status == "REG" and rnd.random() < 0.6:
+                continue
+            created = letter.created_at + datetime.timedelta(hours=rnd.uniform(1, 48))
+            roots.append(Disposition(
+                letter=letter, sender=self._user(), note=rnd.choice(["Favor trata", "Ba informasaun", "Halo resposta", ""]),
+                due_date=(created.date() + datetime.timedelta(days=rnd.randint(3, 14))) if rnd.random() < 0.5 else None,
+                created_at=created,
+            ))
+        roots = Disposition.objects.bulk_create(roots, batch_size=1000)
+        chain, parents = [], roots
+        for _depth in range(2):
+            children = [Disposition(
+                letter_id=p.letter_id, sender=self._user(), parent=p, note="Tuir despacho superior",
+                due_date=p.due_date, created_at=p.created_at + datetime.timedelta(hours=rnd.uniform(2, 72)),
+            ) for p in parents if rnd.random() < 0.35]
+            parents = Disposition.objects.bulk_create(children, batch_size=1000)
+            chain += parents
+        dispos = roots + chain
+        status_by_letter = {l.pk: l.status for l in letters}
+
+        assignments = []
+        for d in dispos:
+            finished = status_by_letter[d.letter_id] in ("DONE", "ARCH")
+            for user in rnd.sample(self.users, rnd.choices([1, 2, 3], [6, 3, 1])[0]):
+                read = self._after(d.created_at, 2)
+                done = self._after(read, 10) if read and (finished or rnd.random() < 0.6) else None
+                assignments.append(DispositionAssignment(disposition=d, assignee=user, read_at=read, completed_at=done))
+        DispositionAssignment.objects.bulk_create(assignments, batch_size=2000)
+
+        followups = [FollowUp(
+            letter=letter, doc_type=rnd.choice(["ND", "ST", "MM"]), title=f"Resposta {letter.agenda_number}",
+            file="incoming/followups/synth.pdf", author=self._user(),
+            created_at=letter.created_at + datetime.timedelta(days=rnd.uniform(1, 20)),
+        ) for letter in letters if letter.status in ("DONE", "ARCH") and rnd.random() < 0.4]
+        FollowUp.objects.bulk_create(followups, batch_size=1000)
+
+        out_letters = OutgoingLetter.objects.bulk_create(out_letters, batch_size=1000)
+        reviews, expeditions = [], []
+        for out in out_letters:
+            stamp = out.created_at
+            for order in range(1, rnd.choices([1, 2, 3], [3, 4, 2])[0] + 1):
+                stamp = self._after(stamp, 3) if stamp else None
+                reviews.append(ReviewStep(letter=out, order=order, reviewer=self._user(), approved_at=stamp))
+            if out.status in ("SENT", "ARCH"):
+                expeditions.append(ExpeditionRecord(
+                    content_type=self.ct_out, object_id=out.pk, method=rnd.choices(["email", "fisik"], [6, 4])[0],
+                    destination=rnd.choice(ORIGINS), sent_at=out.created_at + datetime.timedelta(days=rnd.uniform(0, 3)),
+                ))
+        ReviewStep.objects.bulk_create(reviews, batch_size=2000)
+        ExpeditionRecord.objects.bulk_create(expeditions, batch_size=1000)
+
+        c = self.counts
+        c["incoming"] += len(letters)
+        c["dispositions"] += len(dispos)
+        c["assignments"] += len(assignments)
+        c["followups"] += len(followups)
+        c["outgoing"] += len(out_letters)
+        c["reviews"] += len(reviews)
+        c["expeditions"] += len(expeditions)
+
+    # ---------- jalankan ----------
+
+    def months(self):
+        day = self.start
+        while day <= self.end:
+            last = min(day.replace(day=calendar.monthrange(day.year, day.month)[1]), self.end)
+            yield day, last
+            day = last + datetime.timedelta(days=1)
+
+    def run(self) -> dict:
+        self.setup()
+        stamps = [_field(m, f) for m, f in (
+            (IncomingLetter, "created_at"), (OutgoingLetter, "created_at"), (Disposition, "created_at"),
+            (FollowUp, "created_at"), (ExpeditionRecord, "sent_at"),
+        )]
+        with manual_timestamps(*stamps):
+            for first, last in self.months():
+                with transaction.atomic():
+                    self.month(first, last)
+                self.log(f"{first:%Y-%m}: {self.counts['incoming']} karta tama, {self.counts['outgoing']} karta sai")
+        self.finish()
+        return self.counts
+
+    def finish(self):
+        """Counter nomor, rekap, indeks & inbox dibangun ulang sekali di akhir."""
+        for (prefix, year), value in self.counters.items():
+            seq, _ = NumberSequence.objects.get_or_create(prefix=prefix, year=year)
+            if seq.last_value < value:
+                NumberSequence.objects.filter(pk=seq.pk).update(last_value=value)
+        rollup.rebuild()
+        search.rebuild("in", IncomingLetter.objects.all())
+        search.rebuild("out", OutgoingLetter.objects.all())
+        inbox.rebuild()
+        invalidate_dashboard()
+
+
+def generate(**kwargs) -> dict:
+    return Generator(**kwargs).run()
@@ -0,0 +1,31 @@
+"""
+Runner test (settings.TEST_RUNNER): test tidak boleh menulis ke file di repo
+atau memakai thread latar (di luar transaksi test).
+"""
+import logging
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._settings = override_settings(
+            # perf.log: middleware membaca setting saat handler test dibuat
+            PROFILING_ENABLED=False,
+            # job render langsung saat on_commit, bukan di thread pool (koneksi DB lain)
+            CODE_RENDER_ASYNC=False,
+        )
+        self._settings.enable()
+        # audit.log (tracked) & sink DB (thread latar, di luar transaksi test)
+        # → logger "audit" ke NullHandler selama test
+        audit = logging.getLogger("audit")
+        for handler in audit.handlers[:]:
+            audit.removeHandler(handler)
+            handler.close()
+        audit.addHandler(logging.NullHandler())
+
+    def teardown_test_environment(self, **kwargs):
+        self._settings.disable()
+        super().teardown_test_environment(**kwargs)
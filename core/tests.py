@@ -1,3 +1,1108 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+import qrcode
+from barcode import Code128
+from openpyxl import load_workbook
+from pypdf import PdfReader
+
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import audit, inbox, jobs, profiling, rollup, search, sla, stress, verify
+from .ingest import ingest, read_rows
+from .models import (
+    IncomingLetter, OutgoingLetter, Disposition, DispositionAssignment,
+    FollowUp, ReviewStep, ExpeditionRecord, ClassificationTag, DestructionRecord,
+    InboxItem, DailyLetterStats, DocumentText, NumberSequence, RenderJob,
+)
+from .rollup import bulk_update_status
+from .synth import generate
+from .utils import numbering, pagination
+from .utils.barcode import make_code128_svg
+from .utils.export import INCOMING_COLUMNS
+from .utils.numbering import (
+    assign_outgoing_numbers, generate_agenda_number, generate_outgoing_number,
+    reserve_agenda_numbers, reserve_outgoing_numbers, set_outgoing_status,
+)
+from .utils.qr import make_qr_svg
+
+ROWS = 30
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class QueryBudgetTests(TestCase):
+    """
+    Batas jumlah query per halaman. Data dibuat ROWS baris; kalau ada N+1,
+    jumlah query ikut naik dan melewati budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        staff = [User.objects.create_user(f"staf{i}") for i in range(3)]
+        tag = ClassificationTag.objects.create(name="Finansas")
+        letter_ct = ContentType.objects.get_for_model(IncomingLetter)
+        for i in range(ROWS):
+            letter = IncomingLetter.objects.create(
+                origin=f"Ministériu {i}", origin_number=f"{i}/2026",
+                origin_date=datetime.date(2026, 1, 1), subject=f"Asuntu {i}",
+                created_by=staff[i % 3], current_handler=staff[(i + 1) % 3],
+            )
+            letter.classification_tags.add(tag)
+            dispo = Disposition.objects.create(letter=letter, sender=staff[i % 3], note="nota")
+            Disposition.objects.create(letter=letter, sender=staff[i % 3], parent=dispo)
+            for user in staff:
+                DispositionAssignment.objects.create(disposition=dispo, assignee=user)
+            FollowUp.objects.create(letter=letter, title=f"Resposta {i}", file="f.pdf", author=staff[0])
+            # status FINAL → nomor terisi
+            out = OutgoingLetter.objects.create(subject=f"Sai {i}", body="...", status="FINAL", created_by=staff[i % 3])
+            ReviewStep.objects.create(letter=out, order=1, reviewer=staff[i % 3])
+            ExpeditionRecord.objects.create(content_type=letter_ct, object_id=letter.pk, destination="SEFOPE")
+            DestructionRecord.objects.create(tipu_konteúdu_id=letter_ct, objetu_id=letter.pk, approved_by=staff[0])
+        cls.letter = letter
+        cls.staff = staff
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        # badge inbox di navbar di-cache; budget dihitung utk kondisi cache hangat
+        inbox.counts(self.admin)
+
+    def assertMaxQueries(self, budget, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        self.assertLessEqual(
+            len(ctx), budget,
+            f"{url}: {len(ctx)} query (budget {budget})\n"
+            + "\n".join(q["sql"] for q in ctx.captured_queries),
+        )
+        return response
+
+    def test_portal_lists(self):
+        self.assertMaxQueries(6, reverse("incoming_list"))
+
+    def test_incoming_detail(self):
+        self.assertMaxQueries(8, reverse("admin_incoming_detail", args=[self.letter.pk]))
+
+    def test_admin_changelists(self):
+        # date_hierarchy menambah 1 query (disposition, followup, expedition, attachment)
+        budgets = {
+            "incomingletter": 8,
+            "outgoingletter": 8,
+            "disposition": 9,
+            "dispositionassignment": 7,
+            "followup": 9,
+            "reviewstep": 7,
+            "expeditionrecord": 10,
+            "destructionrecord": 8,
+            "attachment": 9,
+            "auditevent": 7,
+        }
+        for model, budget in budgets.items():
+            with self.subTest(model=model):
+                self.assertMaxQueries(budget, reverse(f"admin:core_{model}_changelist"))
+
+    def test_disposition_autocomplete(self):
+        # autocomplete memakai Disposition.__str__ → letter harus ikut di-join
+        url = reverse("admin:autocomplete") + (
+            "?app_label=core&model_name=dispositionassignment&field_name=disposition"
+        )
+        self.assertMaxQueries(4, url)
+
+    def test_api_lists(self):
+        # sesi + halaman + prefetch (tag / assignments) → tetap, berapa pun page_size
+        for name in ("api-incoming", "api-outgoing", "api-disposition", "api-assignment"):
+            with self.subTest(endpoint=name):
+                self.assertMaxQueries(4, reverse(f"{name}-list") + f"?page_size={ROWS}")
+
+    def test_inbox(self):
+        user = self.staff[0]
+        self.assertEqual(InboxItem.objects.filter(assignee=user).count(), ROWS)
+        # perubahan di surat / despacho / tugas ikut ke proyeksi
+        self.letter.subject = "Asuntu foun"
+        self.letter.save()
+        dispo = self.letter.dispositions.filter(parent=None).get()
+        dispo.due_date = datetime.date(2026, 1, 1)
+        dispo.save()
+        task = DispositionAssignment.objects.get(disposition=dispo, assignee=user)
+        task.completed_at = dispo.created_at
+        task.save(update_fields=["completed_at"])
+        item = InboxItem.objects.get(pk=task.pk)
+        self.assertEqual((item.subject, item.due_date), ("Asuntu foun", dispo.due_date))
+        self.assertIsNotNone(item.completed_at)
+        self.assertEqual(inbox.open_items(user).count(), ROWS - 1)
+
+        self.client.force_login(user)
+        inbox.counts(user)
+        self.assertMaxQueries(4, reverse("api-inbox-list") + f"?page_size={ROWS}")
+        done = self.client.get(reverse("api-inbox-list"), {"show": "done"}).json()["results"]
+        self.assertEqual([row["id"] for row in done], [task.pk])
+        response = self.client.get(reverse("api-inbox-list"), {"show": "rahasia"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("show", response.json())
+        self.client.force_login(self.admin)
+        self.assertMaxQueries(5, reverse("admin_inbox"))
+
+
+class SynthTests(TestCase):
+    def test_generate(self):
+        counts = generate(years=1, per_day=2, users=5)
+        self.assertEqual(IncomingLetter.objects.count(), counts["incoming"])
+        self.assertTrue(Disposition.objects.exclude(parent=None).exists())
+        self.assertEqual(InboxItem.objects.count(), counts["assignments"])
+        # counter nomor melanjutkan data sintetis → tanpa bentrok
+        prefix = f"AGD/{timezone.now().year}/"
+        last = IncomingLetter.objects.filter(agenda_number__startswith=prefix).count()
+        self.assertEqual(generate_agenda_number(), f"{prefix}{last + 1:06d}")
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class DashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        for i in range(3):
+            IncomingLetter.objects.create(origin="SEFOPE", origin_number=f"{i}/2026",
+                                          origin_date=datetime.date(2026, 1, 1), subject=f"Asuntu {i}")
+            OutgoingLetter.objects.create(subject=f"Sai {i}", body="...")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_warm_cache_skips_letter_queries(self):
+        url = reverse("admin_home")
+        self.client.get(url)  # isi cache
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.context["stats"]["incoming_total"], 3)
+        # sisa query cuma sesi/user/permission; tidak ada yg menyentuh tabel surat
+        self.assertLessEqual(len(ctx), 4)
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if "letter" in q["sql"]])
+
+    def test_save_invalidates(self):
+        url = reverse("admin_home")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            OutgoingLetter.objects.create(subject="Foun", body="...")
+        self.assertEqual(self.client.get(url).context["stats"]["outgoing_total"], 4)
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class NumberingStressTests(TransactionTestCase):
+    """Worker paralel sungguhan (commit nyata) → nomor unik, tanpa lubang, monoton."""
+
+    def test_concurrent_numbering(self):
+        report = stress.run(workers=4, ops=15, final_ratio=0.5, rollback_rate=0.2)
+        self.assertEqual(report["violations"], [])
+        self.assertEqual(report["errors"], 0, report["error_samples"])
+        self.assertEqual(report["committed"] + report["rolled_back"], 60)
+        self.assertFalse(OutgoingLetter.objects.exists())
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class VerifyInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()  # nomor agenda dipakai ulang antar test (rollback)
+
+    def test_bulk_status_refreshes_verify(self):
+        letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="1/2026", origin_date=datetime.date(2026, 1, 1),
+            subject="Asuntu", status="DONE",
+        )
+        before = verify.lookup(letter.agenda_number)
+        self.assertEqual(before["state"], "DONE")
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_update_status(IncomingLetter.objects.filter(pk=letter.pk), "ARCH")
+        after = verify.lookup(letter.agenda_number)
+        self.assertEqual(after["state"], "ARCH")
+        self.assertNotEqual(after["etag"], before["etag"])
+        self.assertGreater(after["updated_at"], before["updated_at"])
+
+
+@override_settings(VERIFY_RATE_PER_SEC=0.001, VERIFY_RATE_BURST=2)
+class VerifyEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="5/2026", origin_date=datetime.date(2026, 1, 1), subject="Asuntu",
+        )
+        self.url = reverse("verify_document", args=[self.letter.agenda_number])
+
+    def test_etag_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_throttled_without_audit(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNoLogs("audit"), self.assertNumQueries(0):
+            throttled = self.client.get(self.url)
+        self.assertEqual(throttled.status_code, 429)
+        self.assertGreater(int(throttled["Retry-After"]), 0)
+
+    def test_forwarded_for_cannot_bypass(self):
+        get = lambda **meta: self.client.get(self.url, **meta).status_code
+        # tanpa proxy tepercaya X-Forwarded-For diabaikan → ganti header tidak membantu
+        self.assertEqual([get(HTTP_X_FORWARDED_FOR=f"10.0.0.{i}") for i in range(3)], [200, 200, 429])
+        with override_settings(RATELIMIT_TRUSTED_PROXIES=1):
+            # klien = alamat paling kanan (ditambahkan proxy); entri kiri palsu diabaikan
+            spoof = [get(REMOTE_ADDR="10.9.9.9", HTTP_X_FORWARDED_FOR=f"1.1.1.{i}, 192.0.2.7") for i in range(3)]
+            self.assertEqual(spoof, [200, 200, 429])
+            self.assertEqual(get(REMOTE_ADDR="10.9.9.9", HTTP_X_FORWARDED_FOR="192.0.2.8"), 200)
+
+
+@override_settings(VERIFY_SIGNING_KEY="uji-kiosk")
+class VerifyTokenTests(TestCase):
+    code, day = "AGD/2026/000001", datetime.date(2026, 1, 5)
+
+    def test_round_trip(self):
+        token = verify.make_token(self.code, "DONE", self.day)
+        self.assertEqual(verify.read_token(self.code, token), {"status": "DONE", "date": self.day})
+        # tanggal surat lama tetap valid: token tidak kedaluwarsa
+        old = verify.make_token(self.code, "DONE", datetime.date(2001, 1, 1))
+        self.assertIsNotNone(verify.read_token(self.code, old))
+
+    def test_tampered_and_wrong_code(self):
+        token = verify.make_token(self.code, "DONE", self.day)
+        _, day, sig = token.split(".", 2)
+        for bad in (f"ARCH.{day}.{sig}", f"DONE.20260106.{sig}", token[:-1] + ("A" if token[-1] != "A" else "B"),
+                    "DONE", "", "DONE.2026xx01.abc"):
+            self.assertIsNone(verify.read_token(self.code, bad), bad)
+        self.assertIsNone(verify.read_token("AGD/2026/000002", token))
+        with override_settings(VERIFY_SIGNING_KEY="kunci-lain"):
+            self.assertIsNone(verify.read_token(self.code, token))
+
+    def test_view_checks_signature_and_freshness(self):
+        cache.clear()
+        letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="9/2026", origin_date=self.day, subject="Asuntu", status="DONE",
+        )
+        url = reverse("verify_document", args=[letter.agenda_number])
+        token = verify.make_token(letter.agenda_number, "DONE", self.day)
+        resp = self.client.get(url, {verify.TOKEN_PARAM: token})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIs(resp.context["fresh"], True)
+
+        stale = verify.make_token(letter.agenda_number, "PROG", self.day)
+        self.assertIs(self.client.get(url, {verify.TOKEN_PARAM: stale}).context["fresh"], False)
+        forged = "DONE.%s.%s" % (self.day.strftime("%Y%m%d"), "x" * 27)
+        self.assertEqual(self.client.get(url, {verify.TOKEN_PARAM: forged}).status_code, 400)
+
+
+class CodeImageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_only_existing_codes(self):
+        letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="7/2026", origin_date=datetime.date(2026, 1, 1), subject="Asuntu",
+        )
+        for kind in ("qr", "barcode"):
+            resp = self.client.get(reverse("code_image", args=[kind, letter.agenda_number]), {"fmt": "svg"})
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn("immutable", resp["Cache-Control"])
+        # format valid tapi nomor tidak ada → 404, tanpa cache 1 tahun
+        resp = self.client.get(reverse("code_image", args=["qr", "AGD/1999/999999"]), {"fmt": "svg"})
+        self.assertEqual(resp.status_code, 404)
+        self.assertNotIn("immutable", resp.get("Cache-Control", ""))
+        self.assertIsNone(cache.get(verify._key("AGD/1999/999999")))
+
+    def test_if_none_match_exact(self):
+        letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="8/2026", origin_date=datetime.date(2026, 1, 1), subject="Asuntu",
+        )
+        url = reverse("code_image", args=["qr", letter.agenda_number])
+        etag = self.client.get(url, {"fmt": "svg"})["ETag"]
+        hit = self.client.get(url, {"fmt": "svg"}, HTTP_IF_NONE_MATCH=f'"other", {etag}')
+        self.assertEqual(hit.status_code, 304)
+        # potongan ETag bukan tag yg sama
+        partial = self.client.get(url, {"fmt": "svg"}, HTTP_IF_NONE_MATCH=f'"x{etag.strip(chr(34))}x"')
+        self.assertEqual(partial.status_code, 200)
+
+    @override_settings(CODE_RATE_PER_SEC=0.001, CODE_RATE_BURST=2)
+    def test_rate_limited(self):
+        url = reverse("code_image", args=["qr", "AGD/1999/999999"])
+        self.assertEqual([self.client.get(url).status_code for _ in range(3)], [404, 404, 429])
+        self.assertIn("Retry-After", self.client.get(url))
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(7):
+            IncomingLetter.objects.create(
+                origin="SEFOPE", origin_number=f"{i}/2026", origin_date=datetime.date(2026, 1, 1), subject="Asuntu",
+            )
+        # created_at kembar (impor massal) → urutan ditentukan pk
+        stamp = timezone.now()
+        pks = list(IncomingLetter.objects.order_by("pk").values_list("pk", flat=True))
+        IncomingLetter.objects.filter(pk__in=pks[1:5]).update(created_at=stamp)
+        cls.expected = list(IncomingLetter.objects.order_by("-created_at", "-pk").values_list("pk", flat=True))
+
+    def test_after_and_before_with_ties(self):
+        qs = IncomingLetter.objects.all()
+        pages, page = [], pagination.keyset_page(qs, 3)
+        pages.append(page)
+        while page.has_next():
+            page = pagination.keyset_page(qs, 3, after=page.next_cursor)
+            pages.append(page)
+        self.assertEqual([o.pk for p in pages for o in p], self.expected)
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertFalse(pages[0].has_previous())
+
+        # mundur dari halaman terakhir → halaman yg sama persis
+        for prev, current in zip(reversed(pages[:-1]), reversed(pages[1:])):
+            back = pagination.keyset_page(qs, 3, before=current.previous_cursor)
+            self.assertEqual([o.pk for o in back], [o.pk for o in prev])
+        self.assertFalse(pagination.keyset_page(qs, 3, before=pages[1].previous_cursor).has_previous())
+
+    def test_bad_cursor_is_first_page(self):
+        page = pagination.keyset_page(IncomingLetter.objects.all(), 3, after="rusak!")
+        self.assertEqual([o.pk for o in page], self.expected[:3])
+
+
+class CodeSvgTests(SimpleTestCase):
+    SVG = "{http://www.w3.org/2000/svg}"
+
+    def parse(self, content):
+        root = ElementTree.fromstring(content.read())
+        self.assertEqual(root.tag, f"{self.SVG}svg")
+        return root
+
+    def test_qr_modules_match_matrix(self):
+        data = "https://example.tl/verify/AGD/2026/000001"
+        root = self.parse(make_qr_svg(data))
+        qr = qrcode.QRCode(border=4)
+        qr.add_data(data)
+        qr.make(fit=True)
+        matrix = qr.get_matrix()
+        self.assertEqual(root.get("viewBox"), f"0 0 {len(matrix)} {len(matrix)}")
+
+        drawn = set()
+        for x, y, n in re.findall(r"M(\d+) (\d+)h(\d+)", root.find(f"{self.SVG}path").get("d")):
+            drawn.update((int(x) + i, int(y)) for i in range(int(n)))
+        expected = {(x, y) for y, row in enumerate(matrix) for x, dark in enumerate(row) if dark}
+        self.assertEqual(drawn, expected)
+
+    def test_barcode_bars_match_modules(self):
+        data = "AGD/2026/000001"
+        root = self.parse(make_code128_svg(data))
+        modules = Code128(data).build()[0]
+        self.assertEqual(root.get("viewBox").split()[2], str(len(modules) + 20))
+        widths = re.findall(r"h(\d+)v", root.find(f"{self.SVG}path").get("d"))
+        self.assertEqual(sum(map(int, widths)), modules.count("1"))
+        self.assertEqual(root.find(f"{self.SVG}text").text, data)
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class LabelPdfTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.letters = [IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number=f"{i}/2026", origin_date=datetime.date(2026, 1, 1), subject=f"Asuntu {i}",
+        ) for i in range(26)]
+
+    def print_labels(self, action):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse("admin:core_incomingletter_changelist"), {
+            "action": action, "_selected_action": [l.pk for l in self.letters],
+        })
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        return PdfReader(io.BytesIO(b"".join(response.streaming_content)))
+
+    def labels_per_page(self, pdf):
+        return [len(re.findall(r"AGD/\d{4}/\d+", page.extract_text())) for page in pdf.pages]
+
+    def test_a4_grid(self):
+        # 3 x 8 = 24 label per halaman → 26 label = 2 halaman
+        pdf = self.print_labels("print_label_a4")
+        self.assertEqual(self.labels_per_page(pdf), [24, 2])
+
+    def test_roll_one_per_page(self):
+        pdf = self.print_labels("print_label")
+        self.assertEqual(self.labels_per_page(pdf), [1] * 26)
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class ApiConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="1/2026", origin_date=datetime.date(2026, 1, 1), subject="Asuntu",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse("api-incoming-detail", args=[self.letter.pk])
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_not_modified(self):
+        etag = self.etag()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_follows_every_write_path(self):
+        etag = self.etag()
+        bulk_update_status(IncomingLetter.objects.filter(pk=self.letter.pk), "DONE")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.etag()
+        self.letter.refresh_from_db()
+        self.letter.status = "ARCH"
+        self.letter.save(update_fields=["status"])
+        self.assertNotEqual(self.etag(), etag)
+
+        etag = self.etag()
+        self.letter.classification_tags.add(ClassificationTag.objects.create(name="Finansas"))
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_if_match(self):
+        stale = self.etag()
+        bulk_update_status(IncomingLetter.objects.filter(pk=self.letter.pk), "DONE")
+        patch = lambda etag: self.client.patch(self.url, {"subject": "Foun"}, content_type="application/json",
+                                               HTTP_IF_MATCH=etag)
+        self.assertEqual(patch(stale).status_code, 412)
+        response = patch(self.etag())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], self.etag())
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class ApiRhsAccessTests(TestCase):
+    """Staf tanpa grup RHS_ACCESS tidak melihat surat RHS lewat API (sama dgn admin)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staf", is_staff=True)
+        cls.staff.user_permissions.set(Permission.objects.filter(codename__in=[
+            "view_incomingletter", "view_disposition", "view_dispositionassignment",
+        ]))
+        rhs = ClassificationTag.objects.create(name="RHS")
+        cls.secret, cls.public = [
+            IncomingLetter.objects.create(origin="SEFOPE", origin_number=f"{i}/2026",
+                                          origin_date=datetime.date(2026, 1, 1), subject="Orsamentu pesoal")
+            for i in range(2)
+        ]
+        cls.secret.classification_tags.add(rhs)
+        for letter in (cls.secret, cls.public):
+            dispo = Disposition.objects.create(letter=letter, sender=cls.staff)
+            DispositionAssignment.objects.create(disposition=dispo, assignee=cls.staff)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def letter_ids(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        key = "id" if name == "api-incoming-list" else "letter"
+        return {row[key] for row in response.json()["results"]}
+
+    def test_rhs_hidden_everywhere(self):
+        only_public = {self.public.pk}
+        self.assertEqual(self.letter_ids("api-incoming-list"), only_public)
+        self.assertEqual(self.letter_ids("api-incoming-list", q="orsamentu"), only_public)
+        self.assertEqual(self.letter_ids("api-disposition-list"), only_public)
+        self.assertEqual(self.letter_ids("api-assignment-list"), only_public)
+        detail = reverse("api-incoming-detail", args=[self.secret.pk])
+        self.assertEqual(self.client.get(detail).status_code, 404)
+
+    def test_rhs_group_sees_all(self):
+        self.staff.groups.add(Group.objects.create(name="RHS_ACCESS"))
+        both = {self.secret.pk, self.public.pk}
+        self.assertEqual(self.letter_ids("api-incoming-list"), both)
+        self.assertEqual(self.letter_ids("api-assignment-list"), both)
+        detail = reverse("api-incoming-detail", args=[self.secret.pk])
+        self.assertEqual(self.client.get(detail).status_code, 200)
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class AuditTests(TestCase):
+    def test_rolled_back_save_leaves_no_event(self):
+        new = lambda: IncomingLetter(origin="SEFOPE", origin_number="1/2026",
+                                     origin_date=datetime.date(2026, 1, 1), subject="Asuntu")
+        with self.assertNoLogs("audit"), self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    new().save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        with self.assertLogs("audit") as logs, self.captureOnCommitCallbacks(execute=True):
+            new().save()
+        self.assertEqual([r.audit["action"] for r in logs.records], ["create"])
+
+
+class AsyncAuditHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "audit.log")
+
+    def handler(self, **kwargs):
+        h = audit.AsyncAuditHandler(self.path, **kwargs)
+        self.addCleanup(h.close)
+        return h
+
+    def emit(self, h, n, start=0):
+        for i in range(start, start + n):
+            h.emit(logging.makeLogRecord({"msg": f"baris {i}"}))
+
+    def lines(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_batches_and_flush_on_close(self):
+        # interval panjang → batch terakhir (belum penuh) hanya ditulis oleh close()
+        h = self.handler(batch_size=3, flush_interval=30)
+        sizes = []
+        write_batch = h.writer.write_batch
+        h.writer.write_batch = lambda lines: (sizes.append(len(lines)), write_batch(lines))
+        started = time.monotonic()
+        self.emit(h, 7)
+        h.close()
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(sizes, [3, 3, 1])
+        self.assertEqual(self.lines(), [f"baris {i}" for i in range(7)])
+
+    def test_rotation_keeps_backup_count(self):
+        # 2 baris per file → 5x rotasi, hanya 2 backup terbaru yg tersisa
+        h = self.handler(max_bytes=20, when=None, backup_count=2, batch_size=1, flush_interval=0.01)
+        for i in range(6):
+            self.emit(h, 2, start=i * 2)
+            h.flush()
+        h.close()
+        backups = sorted(f for f in os.listdir(self.tmp.name) if f != "audit.log")
+        self.assertEqual(len(backups), 2)
+        self.assertTrue(all(f.startswith("audit.log.") for f in backups))
+        self.assertLessEqual(os.path.getsize(self.path), 20)
+        self.assertEqual(self.lines()[-1], "baris 11")
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class SearchTests(TestCase):
+    def test_admin_search_uncapped_and_ranked(self):
+        day = datetime.date(2026, 1, 1)
+        IncomingLetter.objects.bulk_create([
+            IncomingLetter(agenda_number=f"AGD/2026/{i:06d}", origin="SEFOPE", origin_number=str(i),
+                           origin_date=day, subject=f"Orsamentu {i}")
+            for i in range(1, 601)
+        ])
+        best = IncomingLetter.objects.create(origin="Orsamentu", origin_number="x", origin_date=day,
+                                             subject="Orsamentu orsamentu")
+        search.rebuild("in", IncomingLetter.objects.all())
+        found = search.filter_queryset(IncomingLetter.objects.all(), "orsamentu", "in")
+        self.assertEqual(found.count(), 601)
+        self.assertEqual(found.first(), best)
+
+        admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:core_incomingletter_changelist") + "?q=orsamentu")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 601)
+        self.assertEqual(response.context["cl"].result_list[0], best)
+        self.assertContains(response, 'id="searchbar"')
+        self.assertContains(response, 'name="q"')
+
+    def test_status_only_save_skips_reindex(self):
+        letter = IncomingLetter.objects.create(origin="SEFOPE", origin_number="1",
+                                               origin_date=datetime.date(2026, 1, 1), subject="Asuntu")
+        with mock.patch("core.signals.search.index_letter") as index:
+            letter.status = "DONE"
+            letter.save(update_fields=["status"])
+            index.assert_not_called()
+            letter.subject = "Asuntu foun"
+            letter.save(update_fields=["subject"])
+            index.assert_called_once()
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class IngestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bad_lines_reported_per_row(self):
+        good = '{"origin": "SEFOPE", "origin_number": "%s", "origin_date": "2026-01-02", "subject": "Asuntu"}'
+        jsonl = "\n".join([good % 1, "{rusak", "[1, 2]", good % 2]).encode()
+        report = ingest(read_rows(io.BytesIO(jsonl), "dadus.jsonl"))
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([e["row"] for e in report["errors"]], [2, 3])
+
+        csv_data = ("origin,origin_number,origin_date,subject\n"
+                    "SEFOPE,3,2026-01-02,Asuntu\n").encode() + b"SEFOPE,4,2026-01-02,Ka\xe9\n" + \
+                   "SEFOPE,5,2026-01-02,Asuntu\n".encode()
+        report = ingest(read_rows(io.BytesIO(csv_data), "dadus.csv"))
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([e["row"] for e in report["errors"]], [2])
+
+    def test_import_matches_save(self):
+        tag = ClassificationTag.objects.create(name="Finansas")
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=tmp):
+            scans = os.path.join(tmp, "scans")
+            os.mkdir(scans)
+            with open(os.path.join(scans, "karta.pdf"), "wb") as fh:
+                fh.write(b"%PDF-1.4\n")
+            row = {"origin": "SEFOPE", "origin_number": "1", "origin_date": "2026-01-02",
+                   "subject": "Orsamentu", "priority": "S", "classification_tags": "Finansas",
+                   "scan_pdf": "karta.pdf"}
+            with self.assertLogs("audit") as logs, self.captureOnCommitCallbacks(execute=True):
+                report = ingest([row], scan_dir=scans)
+                saved = IncomingLetter(origin="SEFOPE", origin_number="2", origin_date=datetime.date(2026, 1, 2),
+                                       subject="Orsamentu", priority="S")
+                with open(os.path.join(scans, "karta.pdf"), "rb") as fh:
+                    saved.scan_pdf.save("karta.pdf", File(fh), save=False)
+                saved.save()
+                saved.classification_tags.add(tag)
+            self.assertEqual(report["errors"], [])
+            imported = IncomingLetter.objects.get(pk=report["ids"][0])
+
+            self.assertEqual([r.audit["action"] for r in logs.records], ["create", "create"])
+            self.assertEqual(list(imported.classification_tags.all()), [tag])
+            docs = {d.source_id: (d.source, d.status, d.letter_id) for d in DocumentText.objects.all()}
+            self.assertEqual(docs, {imported.pk: ("scan", "PENDING", imported.pk),
+                                    saved.pk: ("scan", "PENDING", saved.pk)})
+            found = search.filter_queryset(IncomingLetter.objects.all(), "orsamentu", "in")
+            self.assertEqual(set(found), {imported, saved})
+            self.assertEqual(verify.lookup(imported.agenda_number)["kind"], "incoming")
+
+            cells = lambda: sorted(DailyLetterStats.objects.filter(count__gt=0)
+                                   .values_list("day", "kind", "dimension", "value", "count"))
+            incremental = cells()
+            rollup.rebuild()
+            self.assertEqual(incremental, cells())
+
+    def test_api_multiple_files_per_field(self):
+        pdf = lambda name: SimpleUploadedFile(name, b"%PDF-1.4\n", content_type="application/pdf")
+        row = '{"origin": "SEFOPE", "origin_number": "%s", "origin_date": "2026-01-02", "subject": "Asuntu", "scan_pdf": "%s"}'
+        rows = "\n".join(row % (i, name) for i, name in enumerate(["a.pdf", "b.pdf", "dup.pdf", "lakon.pdf"], 1))
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "x"))
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=tmp):
+            response = self.client.post(reverse("api-incoming-bulk"), {
+                "rows": SimpleUploadedFile("dadus.jsonl", rows.encode()),
+                "scan": [pdf("a.pdf"), pdf("b.pdf"), pdf("dup.pdf")],
+                "extra": [pdf("dup.pdf"), pdf("la-uza.pdf")],
+            })
+            report = response.json()
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(report["created"], 2)
+            self.assertEqual({e["row"]: list(e["errors"]) for e in report["errors"]},
+                             {3: ["scan_pdf"], 4: ["scan_pdf"]})
+            self.assertEqual(report["unused_files"], ["la-uza.pdf"])
+            self.assertEqual(sorted(name.rsplit("/", 1)[-1] for name in
+                                    IncomingLetter.objects.values_list("scan_pdf", flat=True)), ["a.pdf", "b.pdf"])
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class DocumentTextTests(TestCase):
+    def test_followup_delete_unindexes_text(self):
+        letter = IncomingLetter.objects.create(origin="SEFOPE", origin_number="1",
+                                               origin_date=datetime.date(2026, 1, 1), subject="Asuntu")
+        followup = FollowUp.objects.create(letter=letter, title="Resposta", file="f.pdf")
+        DocumentText.objects.filter(source="followup").update(text="orsamentu", status="DONE")
+        search.index_letter("in", letter)
+        found = lambda: list(search.filter_queryset(IncomingLetter.objects.all(), "orsamentu", "in"))
+        self.assertEqual(found(), [letter])
+        followup.delete()
+        self.assertEqual(found(), [])
+
+    def test_letter_without_scan_change_skips_doctext(self):
+        letter = IncomingLetter.objects.create(origin="SEFOPE", origin_number="1",
+                                               origin_date=datetime.date(2026, 1, 1), subject="Asuntu")
+        letter = IncomingLetter.objects.get(pk=letter.pk)
+        letter.subject = "Asuntu foun"
+        with CaptureQueriesContext(connection) as ctx:
+            letter.save()
+        self.assertFalse([q for q in ctx.captured_queries
+                          if "core_documenttext" in q["sql"] and not q["sql"].startswith("SELECT")])
+
+
+class NumberingTests(TransactionTestCase):
+    """Autocommit sungguhan (TransactionTestCase): save surat sendiri yg atomik."""
+
+    def new_letter(self, **kwargs):
+        return IncomingLetter(origin="SEFOPE", origin_number="1", origin_date=datetime.date(2026, 1, 1),
+                              subject="Asuntu", **kwargs)
+
+    def test_allocation_seed_and_year(self):
+        year = timezone.now().year
+        # data lama tanpa counter → counter di-seed dari nomor terbesar
+        IncomingLetter.objects.bulk_create([self.new_letter(agenda_number=f"AGD/{year}/000041")])
+        self.assertFalse(NumberSequence.objects.exists())
+        self.assertEqual(generate_agenda_number(), f"AGD/{year}/000042")
+        self.assertEqual(generate_agenda_number(), f"AGD/{year}/000043")
+        self.assertEqual(generate_outgoing_number("nd"), f"ND/{year}/00001")
+        with mock.patch("core.utils.numbering._year", return_value=year + 1):
+            self.assertEqual(generate_agenda_number(), f"AGD/{year + 1}/000001")
+        self.assertEqual(generate_agenda_number(), f"AGD/{year}/000044")
+        self.assertEqual(NumberSequence.objects.get(prefix="AGD", year=year).last_value, 44)
+
+    def test_failed_save_returns_number(self):
+        def boom(**kwargs):
+            raise RuntimeError
+
+        self.new_letter().save()
+        post_save.connect(boom, sender=IncomingLetter, dispatch_uid="test-boom")
+        try:
+            with self.assertRaises(RuntimeError):
+                self.new_letter().save()
+        finally:
+            post_save.disconnect(sender=IncomingLetter, dispatch_uid="test-boom")
+        self.new_letter().save()
+        numbers = sorted(IncomingLetter.objects.values_list("agenda_number", flat=True))
+        self.assertEqual([int(n.rsplit("/", 1)[1]) for n in numbers], [1, 2])
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class NumberBlockTests(TestCase):
+    def new_letter(self):
+        letter = IncomingLetter(origin="SEFOPE", origin_number="1", origin_date=datetime.date(2026, 1, 1),
+                                subject="Asuntu")
+        letter.save()
+        return int(letter.agenda_number.rsplit("/", 1)[1])
+
+    def test_blocks_contiguous(self):
+        first, second = reserve_agenda_numbers(3), reserve_agenda_numbers(2)
+        seqs = [int(n.rsplit("/", 1)[1]) for n in first + second]
+        self.assertEqual(seqs, list(range(seqs[0], seqs[0] + 5)))
+        self.assertEqual([n[-5:] for n in reserve_outgoing_numbers("nd", 2)], ["00001", "00002"])
+        self.assertEqual(reserve_agenda_numbers(0), [])
+
+    def test_block_pool_lifecycle(self):
+        with numbering.agenda_number_block(3):
+            self.assertEqual([self.new_letter(), self.new_letter()], [1, 2])
+        self.assertFalse(numbering._reserved.pools)
+        # nomor 3 dipesan tapi tidak dipakai → lubang (terdokumentasi), bukan dipakai ulang
+        self.assertEqual(self.new_letter(), 4)
+
+        with numbering.agenda_number_block(1):
+            self.assertEqual([self.new_letter(), self.new_letter()], [5, 6])  # blok habis → counter biasa
+
+        with self.assertRaises(RuntimeError), numbering.agenda_number_block(2):
+            raise RuntimeError
+        self.assertFalse(numbering._reserved.pools)
+
+        with numbering.outgoing_number_block("ST", 2):
+            with numbering.agenda_number_block(1):
+                self.assertEqual(set(numbering._reserved.pools), {"ST", "AGD"})
+            self.assertEqual(set(numbering._reserved.pools), {"ST"})
+        self.assertFalse(numbering._reserved.pools)
+
+    def test_bulk_final_numbers_drafts(self):
+        drafts = [OutgoingLetter.objects.create(template_type="ND", subject=f"Draf {i}", body="...")
+                  for i in range(3)]
+        self.assertFalse(OutgoingLetter.objects.exclude(number=None).exists())
+        set_outgoing_status(drafts[0], "FINAL")
+        drafts[0].refresh_from_db()
+        self.assertTrue(drafts[0].number)
+        self.assertEqual(len(assign_outgoing_numbers(OutgoingLetter.objects.all())), 2)
+        numbers = sorted(OutgoingLetter.objects.values_list("number", flat=True))
+        self.assertEqual([int(n.rsplit("/", 1)[1]) for n in numbers], [1, 2, 3])
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class SlaTests(TestCase):
+    class Collect(sla.Notifier):
+        """Notifier uji: catat digest; `fail` = user yg gagal dikirimi."""
+
+        def __init__(self, fail=()):
+            self.sent, self.fail = [], set(fail)
+
+        def send(self, batch):
+            ok = [(user, items) for user, items in batch if user.pk not in self.fail]
+            self.sent += [(user.username, sorted(r["pk"] for r in items)) for user, items in ok]
+            return {user.pk for user, _ in ok}
+
+    def setUp(self):
+        self.today = datetime.date(2026, 3, 10)
+        self.users = [User.objects.create_user(f"staf{i}", f"staf{i}@example.org") for i in range(2)]
+        self.letter = IncomingLetter.objects.create(origin="SEFOPE", origin_number="1",
+                                                    origin_date=datetime.date(2026, 1, 1), subject="Asuntu")
+
+    def task(self, user, due):
+        dispo = Disposition.objects.create(letter=self.letter, sender=self.users[0], due_date=due)
+        return DispositionAssignment.objects.create(disposition=dispo, assignee=user)
+
+    def run_sla(self, **kwargs):
+        notifier = self.Collect(**kwargs)
+        # batch 1 user → SlaNotice ditulis selagi query pending masih dibaca
+        sla.run(today=self.today, soon_days=2, notifier=notifier, batch_size=1)
+        return notifier.sent
+
+    def test_notifier_is_abstract(self):
+        with self.assertRaises(TypeError):
+            sla.Notifier()
+
+    def test_once_and_incremental(self):
+        overdue = self.task(self.users[0], self.today - datetime.timedelta(days=1))
+        soon = self.task(self.users[0], self.today + datetime.timedelta(days=1))
+        self.task(self.users[1], self.today + datetime.timedelta(days=30))  # belum waktunya
+        self.assertEqual(self.run_sla(), [("staf0", sorted([overdue.pk, soon.pk]))])
+        self.assertEqual(self.run_sla(), [])  # sekali saja
+
+        other = self.task(self.users[1], self.today)
+        self.assertEqual(self.run_sla(fail={self.users[1].pk}), [])  # gagal → tidak dicatat
+        self.assertEqual(self.run_sla(), [("staf1", [other.pk])])
+
+        # "soon" lewat tenggat → jenis baru (overdue) → diingatkan lagi; selesai → tidak
+        self.today += datetime.timedelta(days=2)
+        other.completed_at = timezone.now()
+        other.save(update_fields=["completed_at"])
+        self.assertEqual(self.run_sla(), [("staf0", [soon.pk])])
+        self.assertEqual(self.run_sla(), [])
+
+
+@override_settings(CODE_STORE_IMAGES=False)
+class AdminExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        # 00:30 waktu lokal = hari sebelumnya di UTC → batas tanggal harus lokal
+        for day in (1, 2, 3, 4):
+            letter = IncomingLetter.objects.create(
+                origin="SEFOPE", origin_number=f"{day}/2026", origin_date=datetime.date(2026, 3, 1),
+                subject=f"Asuntu {day}", status="PROG",
+            )
+            stamp = timezone.make_aware(datetime.datetime(2026, 3, day, 0, 30))
+            IncomingLetter.objects.filter(pk=letter.pk).update(created_at=stamp)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def export(self, fmt):
+        url = reverse("admin_export_agenda", args=["incoming"])
+        response = self.client.get(url, {"from": "2026-03-02", "to": "2026-03-03", "format": fmt})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export("csv").decode())))
+        self.assertEqual(rows[0], [h for h, _, _ in INCOMING_COLUMNS])
+        self.assertEqual([r[1] for r in rows[1:]], ["Asuntu 2", "Asuntu 3"])
+        self.assertEqual(rows[1][4], "Iha Prosesu")
+
+    def test_xlsx(self):
+        ws = load_workbook(io.BytesIO(self.export("xlsx")), read_only=True).active
+        rows = list(ws.values)
+        self.assertEqual(list(rows[0]), [h for h, _, _ in INCOMING_COLUMNS])
+        self.assertEqual([r[1] for r in rows[1:]], ["Asuntu 2", "Asuntu 3"])
+        self.assertEqual(rows[1][5], datetime.datetime(2026, 3, 2, 0, 30))
+
+
+class ExportMonthlyAgendaTests(TestCase):
+    def test_keeps_legacy_columns_and_raw_status(self):
+        letter = IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number="3/2026", origin_date=datetime.date(2026, 1, 1),
+            subject="Asuntu", status="PROG",
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "agenda.csv")
+            call_command("export_monthly_agenda", output=path, stdout=io.StringIO())
+            with open(path, encoding="utf-8") as fh:
+                rows = list(csv.reader(fh))
+        self.assertEqual(rows[0], ["Agenda", "Subject", "Origin", "Status", "Created"])
+        self.assertEqual(rows[1][:4], [letter.agenda_number, "Asuntu", "SEFOPE", "PROG"])
+
+
+class RollupTests(TestCase):
+    """Rekap inkremental (signal) harus sama persis dgn rollup.rebuild()."""
+
+    def setUp(self):
+        self.tags = [ClassificationTag.objects.create(name=n) for n in ("Orsamentu", "Pesoal", "Logistika")]
+        self.letters = [
+            IncomingLetter.objects.create(
+                origin="SEFOPE", origin_number=f"{i}/2026", origin_date=datetime.date(2026, 1, 1),
+                subject="Asuntu", priority="S",
+            )
+            for i in range(4)
+        ]
+        self.outgoing = OutgoingLetter.objects.create(subject="Resposta", template_type="ND")
+
+    def assertMatchesRebuild(self):
+        def cells():
+            return set(DailyLetterStats.objects.exclude(count=0)
+                       .values_list("day", "kind", "dimension", "value", "count"))
+
+        incremental = cells()
+        rollup.rebuild()
+        self.assertEqual(incremental, cells())
+
+    def test_m2m_forward_and_reverse(self):
+        a, b, c, d = self.letters
+        orsamentu, pesoal, logistika = self.tags
+        a.classification_tags.add(orsamentu, pesoal)
+        b.classification_tags.add(orsamentu)
+        logistika.incomingletter_set.add(a, b, c)   # arah balik
+        self.assertMatchesRebuild()
+
+        a.classification_tags.remove(pesoal)
+        orsamentu.incomingletter_set.remove(b)
+        self.assertMatchesRebuild()
+
+        a.classification_tags.clear()                # pre_clear/post_clear maju
+        logistika.incomingletter_set.clear()         # pre_clear/post_clear balik
+        d.classification_tags.set([pesoal, logistika])
+        self.assertMatchesRebuild()
+
+    def test_save_and_delete_with_tags(self):
+        a, b, _, _ = self.letters
+        a.classification_tags.add(*self.tags)
+        b.classification_tags.add(self.tags[0])
+        a.status, a.priority = "PROG", "SS"
+        a.save()
+        self.outgoing.status = "APPROVED"
+        self.outgoing.save()
+        self.assertMatchesRebuild()
+
+        a.delete()                                   # tag ikut dikurangi
+        self.outgoing.delete()
+        self.assertMatchesRebuild()
+
+    def test_tag_rename_and_delete(self):
+        a, b, c, _ = self.letters
+        orsamentu, pesoal, logistika = self.tags
+        a.classification_tags.add(orsamentu, pesoal)
+        b.classification_tags.add(orsamentu)
+        c.classification_tags.add(pesoal)
+
+        orsamentu.name = "Finansas"
+        orsamentu.save()
+        self.assertMatchesRebuild()
+
+        pesoal.name = "Finansas 2"                   # nama baru, tag lama masih dipakai surat
+        pesoal.save()
+        pesoal.delete()                              # through ikut terhapus tanpa m2m_changed
+        ClassificationTag.objects.filter(pk=logistika.pk).delete()
+        self.assertMatchesRebuild()
+        self.assertFalse(DailyLetterStats.objects.filter(dimension="tag", value__in=["Pesoal", "Finansas 2"]))
+
+    def test_bulk_update_status(self):
+        self.letters[0].classification_tags.add(self.tags[0])
+        self.assertEqual(bulk_update_status(IncomingLetter.objects.filter(pk__in=[l.pk for l in self.letters[:3]]),
+                                            "DONE"), 3)
+        bulk_update_status(IncomingLetter.objects.all(), "ARCH")
+        bulk_update_status(OutgoingLetter.objects.all(), "SENT")
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            DailyLetterStats.objects.filter(kind="in", dimension="status", value="ARCH").get().count, 4)
+
+
+class RenderJobTests(TestCase):
+    """Antrian render QR/barcode; TestRunner memaksa CODE_RENDER_ASYNC=False."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, True)
+        storage = override_settings(MEDIA_ROOT=media, CODE_STORE_IMAGES=True)
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+    def create_letter(self, n=1):
+        return IncomingLetter.objects.create(
+            origin="SEFOPE", origin_number=f"{n}/2026", origin_date=datetime.date(2026, 1, 1), subject="Asuntu",
+        )
+
+    def test_enqueue_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            letter = self.create_letter()
+            self.assertEqual(RenderJob.objects.get(kind="in", object_id=letter.pk).status, "PENDING")
+        job = RenderJob.objects.get(kind="in", object_id=letter.pk)
+        self.assertEqual((job.status, job.attempts), ("DONE", 1))
+        letter.refresh_from_db()
+        self.assertTrue(letter.qr_image and letter.barcode_image)
+
+    def test_async_submits_to_pool(self):
+        pool = mock.Mock()
+        with override_settings(CODE_RENDER_ASYNC=True), mock.patch.object(jobs, "_get_executor", return_value=pool):
+            with self.captureOnCommitCallbacks(execute=True):
+                letter = self.create_letter()
+                pool.submit.assert_not_called()   # baru setelah commit
+        job_id = jobs.RenderJob.objects.get(kind="in", object_id=letter.pk).pk
+        pool.submit.assert_called_once_with(jobs._run_in_worker, job_id)
+
+    def test_failed_job_is_retried(self):
+        letter = self.create_letter()
+        with mock.patch.dict(jobs.RENDERERS, {"in": mock.Mock(side_effect=OSError("disk penuh"))}):
+            with self.assertLogs("core.jobs", "ERROR"), self.captureOnCommitCallbacks(execute=True):
+                jobs.enqueue_render("in", letter.pk)
+        job = jobs.RenderJob.objects.get(kind="in", object_id=letter.pk)
+        self.assertEqual((job.status, job.attempts, job.last_error), ("FAILED", 1, "disk penuh"))
+
+        self.assertEqual(jobs.drain(), (0, 0))                       # FAILED tidak ikut tanpa flag
+        self.assertEqual(jobs.drain(include_failed=True, max_attempts=1), (0, 0))
+        self.assertEqual(jobs.drain(include_failed=True), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), ("DONE", 2, ""))
+        self.assertTrue(jobs.run_job(job.pk))                        # DONE → tidak dijalankan lagi
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+    def test_enqueue_many(self):
+        with override_settings(CODE_STORE_IMAGES=False):
+            letters = [self.create_letter(i) for i in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue_render_many("in", [l.pk for l in letters])
+        self.assertEqual(set(jobs.RenderJob.objects.values_list("status", flat=True)), {"DONE"})
+        self.assertEqual(IncomingLetter.objects.exclude(qr_image="").count(), 3)
+
+
+class ProfilingTests(TestCase):
+    def get(self, **overrides):
+        # middleware membaca PROFILING_ENABLED saat dibuat → client baru per setting
+        with override_settings(PROFILING_ENABLED=True, **overrides):
+            return Client().get(reverse("admin:login"))
+
+    def test_records_flagged_and_sampled_requests(self):
+        with self.assertLogs("perf", "INFO") as logs:
+            self.get(PROFILING_SAMPLE_RATE=0, PROFILING_SLOW_MS=0)
+        row = json.loads(logs.records[0].getMessage())
+        self.assertEqual((row["endpoint"], row["flags"], row["weight"]), ("admin:login", ["slow"], 1))
+        self.assertGreaterEqual(row["db_queries"], 0)
+
+        normal = {"PROFILING_SAMPLE_RATE": 0.25, "PROFILING_SLOW_MS": 10**6, "PROFILING_QUERY_BUDGET": 10**6}
+        with mock.patch("core.middleware.random.random", return_value=0.2), \
+                self.assertLogs("perf", "INFO") as logs:
+            self.get(**normal)
+        row = json.loads(logs.records[0].getMessage())
+        self.assertEqual((row["flags"], row["weight"]), ([], 4))
+
+        with mock.patch("core.middleware.random.random", return_value=0.3), self.assertNoLogs("perf", "INFO"):
+            self.get(**normal)
+
+    def test_percentiles_weighted_by_sample_rate(self):
+        # 20 sampel normal (rate 0.1 → masing2 mewakili 10 request) + 5 lambat (selalu dicatat)
+        normal = [{"endpoint": "x", "wall_ms": 10, "db_queries": 1, "db_ms": 1, "weight": 10}] * 20
+        slow = [{"endpoint": "x", "wall_ms": 2000, "db_queries": 1, "db_ms": 1, "weight": 1, "flags": ["slow"]}] * 5
+        row, = profiling.summarize(normal + slow)
+        self.assertEqual((row["p50"], row["p95"], row["p99"]), (10, 10, 2000))
+        self.assertEqual(profiling.percentile([10] * 20 + [2000] * 5, 95), 2000)   # tanpa bobot: condong
@@ -1,10 +1,11 @@
 from django.urls import path
-from .views_public import verify_document
+from .views_public import verify_document, code_image
 from . import views
 
 urlpatterns = [
     path("", views.IncomingList.as_view(), name="home"),  # halaman awal
     path("verify/<path:code>/", verify_document, name="verify_document"),
+    path("code/<str:kind>/<path:code>/", code_image, name="code_image"),
 
     # Surat Masuk
     path("incoming/", views.IncomingList.as_view(), name="incoming_list"),
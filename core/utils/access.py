@@ -0,0 +1,36 @@
+"""
+Aturan akses surat RHS (klasifikasi "RHS" = data pegawai/rahasia).
+
+Hanya superuser & anggota grup RHS_ACCESS yg boleh melihat surat bertag RHS.
+Dipakai bersama oleh admin, API (termasuk disposisi & tugas) dan pencarian
+supaya aturannya tidak berbeda antar jalur.
+"""
+from __future__ import annotations
+
+RHS_TAG = "RHS"
+RHS_GROUP = "RHS_ACCESS"
+
+
+def can_see_rhs(user) -> bool:
+    """Hasil di-cache di objek user (satu query grup per request)."""
+    if user.is_superuser:
+        return True
+    cached = getattr(user, "_can_see_rhs", None)
+    if cached is None:
+        cached = user._can_see_rhs = user.groups.filter(name=RHS_GROUP).exists()
+    return cached
+
+
+def restrict_rhs(qs, user, path: str = ""):
+    """
+    Buang surat RHS dari `qs` bila `user` tidak berhak.
+    `path` = relasi ke IncomingLetter, mis. "letter__" (Disposition),
+    "disposition__letter__" (DispositionAssignment); "" = IncomingLetter sendiri.
+    """
+    if can_see_rhs(user):
+        return qs
+    return qs.exclude(**{f"{path}classification_tags__name__iexact": RHS_TAG})
+
+
+def is_rhs(letter) -> bool:
+    return letter.classification_tags.filter(name__iexact=RHS_TAG).exists()
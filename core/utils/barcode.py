@@ -2,9 +2,38 @@ from io import BytesIO
 from django.core.files.base import ContentFile
 from barcode import Code128
 from barcode.writer import ImageWriter
+from django.utils.html import escape
 
 def make_code128_png(data: str) -> ContentFile:
     """Return ContentFile PNG barcode Code128 untuk ImageField."""
     buf = BytesIO()
     Code128(data, writer=ImageWriter()).write(buf)
     return ContentFile(buf.getvalue())
+
+def make_code128_svg(data: str, height: int = 40) -> ContentFile:
+    """
+    Return ContentFile SVG barcode Code128 (vektor, tanpa Pillow).
+    Bar digabung jadi satu <path>; teks nomor di bawah seperti versi PNG.
+    """
+    modules = Code128(data).build()[0]
+    quiet = 10
+    width = len(modules) + 2 * quiet
+
+    parts = []
+    x = 0
+    while x < len(modules):
+        if modules[x] == "1":
+            start = x
+            while x < len(modules) and modules[x] == "1":
+                x += 1
+            parts.append(f"M{start + quiet} 0h{x - start}v{height}h-{x - start}z")
+        else:
+            x += 1
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height + 14}" '
+        f'shape-rendering="crispEdges"><rect width="{width}" height="{height + 14}" fill="#fff"/>'
+        f'<path d="{"".join(parts)}"/>'
+        f'<text x="{width / 2:g}" y="{height + 11}" font-family="monospace" font-size="10" '
+        f'text-anchor="middle">{escape(data)}</text></svg>'
+    )
+    return ContentFile(svg.encode())
@@ -0,0 +1,85 @@
+"""
+Render QR/barcode langsung dari nomor (tanpa file di storage).
+
+Cache 2 lapis:
+  - LRU in-process (CODE_IMAGE_LRU_SIZE entri)
+  - Django cache framework (CODE_IMAGE_CACHE_TIMEOUT detik)
+Hasil render deterministik per (jenis, kode, format), jadi aman di-cache selamanya.
+
+Dengan VERIFY_SIGNED_QR payload QR ikut status surat (token bertanda tangan,
+lihat core/verify.py) → cache di-key dari payload, bukan nomor saja.
+
+Format per deployment via CODE_IMAGE_FORMAT = "png" | "svg".
+SVG lebih kecil, tajam saat dicetak, dan jauh lebih cepat (tanpa Pillow).
+"""
+from __future__ import annotations
+import hashlib
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils.qr import make_qr_png, make_qr_svg, verify_base
+from core.utils.barcode import make_code128_png, make_code128_svg
+
+# Hanya nomor agenda / surat keluar yg valid yg boleh dirender
+CODE_RE = re.compile(r"^(AGD|ST|ND|UD|MM|LN)/\d{4}/\d{1,8}$")
+
+KINDS = ("qr", "barcode")
+
+RENDERERS = {
+    ("qr", "png"): make_qr_png,
+    ("qr", "svg"): make_qr_svg,
+    ("barcode", "png"): make_code128_png,
+    ("barcode", "svg"): make_code128_svg,
+}
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def image_format() -> str:
+    fmt = getattr(settings, "CODE_IMAGE_FORMAT", "png").lower()
+    return fmt if fmt in CONTENT_TYPES else "png"
+
+
+def is_valid_code(code: str) -> bool:
+    return bool(CODE_RE.match(code or ""))
+
+
+def code_payload(kind: str, code: str) -> str:
+    """Isi yg benar-benar di-encode: QR → URL verifikasi, barcode → nomor."""
+    if kind != "qr":
+        return code
+    if getattr(settings, "VERIFY_SIGNED_QR", False):
+        from core.verify import qr_payload
+        return qr_payload(code)
+    return verify_base() + code
+
+
+def payload_etag(kind: str, payload: str, fmt: str = "png") -> str:
+    digest = hashlib.sha1(f"{kind}:{fmt}:{payload}".encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def code_etag(kind: str, code: str, fmt: str = "png") -> str:
+    """ETag dihitung dari payload saja → bisa jawab 304 tanpa render."""
+    return payload_etag(kind, code_payload(kind, code), fmt)
+
+
+def render_code(kind: str, code: str, fmt: str = "png") -> bytes:
+    return RENDERERS[(kind, fmt)](code_payload(kind, code)).read()
+
+
+@lru_cache(maxsize=getattr(settings, "CODE_IMAGE_LRU_SIZE", 1024))
+def _payload_image_bytes(kind: str, payload: str, fmt: str) -> bytes:
+    key = "codeimg:" + payload_etag(kind, payload, fmt).strip('"')
+    data = cache.get(key)
+    if data is None:
+        data = RENDERERS[(kind, fmt)](payload).read()
+        cache.set(key, data, getattr(settings, "CODE_IMAGE_CACHE_TIMEOUT", 60 * 60 * 24 * 30))
+    return data
+
+
+def code_image_bytes(kind: str, code: str, fmt: str = "png") -> bytes:
+    return _payload_image_bytes(kind, code_payload(kind, code), fmt)
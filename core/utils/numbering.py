@@ -1,75 +1,175 @@
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from django.utils import timezone
-from django.db import transaction
-from django.db.models import Max
-from core.models import IncomingLetter, OutgoingLetter
-import time
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from core.models import IncomingLetter, OutgoingLetter, NumberSequence
+from core import verify
+
+# Blok nomor yg sudah dipesan (per thread), key = prefix ("AGD", "ND", ...)
+_reserved = threading.local()
 
 def _year() -> int:
     return timezone.now().year
 
-@transaction.atomic
+def _last_seq(qs, field: str, base: str) -> int:
+    """
+    Urutan terbesar yg sudah terpakai utk `base` (dipakai sekali saja
+    untuk seed counter baru, mis. data lama sebelum tabel NumberSequence ada).
+    """
+    last = (qs.filter(**{f"{field}__startswith": base})
+              .order_by(f"-{field}")
+              .values_list(field, flat=True)
+              .first())
+    if not last:
+        return 0
+    try:
+        return int(last.split("/")[-1])
+    except ValueError:
+        return 0
+
+def _allocate(prefix: str, year: int, seed, count: int = 1) -> int:
+    """
+    Naikkan counter (prefix, year) sebanyak `count` dengan UPDATE atomik,
+    lalu kembalikan urutan PERTAMA dari blok yg didapat.
+    UPDATE memegang lock baris (Postgres) / lock tulis DB (SQLite) sampai
+    transaksi selesai, jadi dua request tidak mungkin dapat nilai yg sama.
+    Kalau counter belum ada → buat (seed dari data lama) lalu ulangi.
+    """
+    rows = NumberSequence.objects.filter(prefix=prefix, year=year)
+    with transaction.atomic():
+        if not rows.update(last_value=F("last_value") + count):
+            try:
+                with transaction.atomic():
+                    NumberSequence.objects.create(prefix=prefix, year=year, last_value=seed())
+            except IntegrityError:
+                pass  # dibuat request lain secara bersamaan
+            rows.update(last_value=F("last_value") + count)
+        return rows.values_list("last_value", flat=True).get() - count + 1
+
+def _take_reserved(key: str):
+    pool = getattr(_reserved, "pools", {}).get(key)
+    return pool.popleft() if pool else None
+
+@contextmanager
+def _use_reserved(key: str, numbers: list[str]):
+    pools = getattr(_reserved, "pools", None)
+    if pools is None:
+        pools = _reserved.pools = {}
+    previous = pools.get(key)
+    pools[key] = deque(numbers)
+    try:
+        yield numbers
+    finally:
+        if previous is None:
+            pools.pop(key, None)
+        else:
+            pools[key] = previous
+
 def generate_agenda_number() -> str:
     """
     Format: AGD/<YEAR>/<6-digit>
     Strategi:
-      - Ambil urutan terbesar yg ada (per tahun), lalu +1.
-      - Jika bentrok (jarang tapi mungkin saat concurrency tinggi), cek exists & retry cepat.
+      - Counter per tahun di tabel NumberSequence, dinaikkan dgn lock baris.
+      - Tanpa retry/sleep & tanpa fallback timestamp → tidak ada duplikat.
+      - Dipanggil dari pre_save; save() surat atomik (AtomicSaveMixin)
+        → surat gagal disimpan = counter ikut di-rollback (gap-free).
+      - Di dalam blok `agenda_number_block()` nomor diambil dari blok
+        yg sudah dipesan (tanpa query).
     """
+    reserved = _take_reserved("AGD")
+    if reserved:
+        return reserved
     y = _year()
     prefix = f"AGD/{y}/"
+    seq = _allocate("AGD", y, lambda: _last_seq(IncomingLetter.objects, "agenda_number", prefix))
+    return f"{prefix}{seq:06d}"
 
-    # Ambil kandidat urutan berikutnya
-    last = (IncomingLetter.objects
-            .filter(agenda_number__startswith=prefix)
-            .order_by("-agenda_number")
-            .first())
-    last_seq = 0
-    if last and last.agenda_number:
-        try:
-            last_seq = int(last.agenda_number.split("/")[-1])
-        except Exception:
-            last_seq = 0
-
-    # Coba hingga 5x kalau kebetulan bentrok
-    for attempt in range(5):
-        cand = f"{prefix}{last_seq + 1 + attempt:06d}"
-        if not IncomingLetter.objects.filter(agenda_number=cand).exists():
-            return cand
-        time.sleep(0.01)  # jeda sangat singkat
-
-    # Fallback darurat (amat jarang terpakai)
-    ts = timezone.now().strftime("%H%M%S")  # 6 digit
-    return f"{prefix}{ts}"
-
-@transaction.atomic
 def generate_outgoing_number(prefix: str = "ST") -> str:
     """
     Format: <PREFIX>/<YEAR>/<5-digit>
     Catatan:
       - Prefix sebaiknya salah satu dari ND/UD/ST/MM/LN (DOC_KIND).
       - Default 'ST' agar konsisten dgn pilihan model.
+      - Counter terpisah per (prefix, tahun), lihat generate_agenda_number.
     """
     prefix = (prefix or "ST").upper()
+    reserved = _take_reserved(prefix)
+    if reserved:
+        return reserved
     y = _year()
     base = f"{prefix}/{y}/"
+    seq = _allocate(prefix, y, lambda: _last_seq(OutgoingLetter.objects, "number", base))
+    return f"{base}{seq:05d}"
+
+def set_outgoing_status(letter: OutgoingLetter, status: str) -> None:
+    """
+    Ganti status surat keluar & simpan. Ke FINAL → nomor diambil signal
+    pre_save; `number` wajib ikut di update_fields, kalau tidak nomor
+    terpakai (counter naik) tapi tidak tersimpan.
+    """
+    letter.status = status
+    letter.save(update_fields=["status", "number"])
+
+def assign_outgoing_numbers(queryset) -> list[int]:
+    """
+    Beri nomor surat keluar yg belum bernomor di `queryset` (aksi massal
+    FINAL: queryset.update tidak memicu signal pre_save). Satu UPDATE counter
+    per prefix, urut created_at. Return pk yg baru diberi nomor.
+    """
+    with transaction.atomic():
+        letters = list(queryset.filter(number__isnull=True).order_by("created_at", "pk")
+                       .only("pk", "template_type", "created_at"))
+        groups, now = defaultdict(list), timezone.now()
+        for letter in letters:
+            groups[(letter.template_type or "ST").upper()].append(letter)
+        for prefix, group in groups.items():
+            for letter, number in zip(group, reserve_outgoing_numbers(prefix, len(group))):
+                letter.number, letter.updated_at = number, now
+        OutgoingLetter.objects.bulk_update(letters, ["number", "updated_at"], batch_size=500)
+        # nomor baru mungkin sudah ada di cache negatif verifikasi
+        verify.invalidate(*(letter.number for letter in letters))
+    return [letter.pk for letter in letters]
+
+# ========== RESERVASI BLOK (import massal) ==========
 
-    last = (OutgoingLetter.objects
-            .filter(number__startswith=base)
-            .order_by("-number")
-            .first())
-    last_seq = 0
-    if last and last.number:
-        try:
-            last_seq = int(last.number.split("/")[-1])
-        except Exception:
-            last_seq = 0
-
-    for attempt in range(5):
-        cand = f"{base}{last_seq + 1 + attempt:05d}"
-        if not OutgoingLetter.objects.filter(number=cand).exists():
-            return cand
-        time.sleep(0.01)
-
-    # Fallback darurat
-    ts = timezone.now().strftime("%H%M%S")  # 6 digit
-    return f"{base}{ts[:5]}"  # tetap 5 digit
+def reserve_agenda_numbers(n: int) -> list[str]:
+    """
+    Pesan `n` nomor agenda berurutan sekaligus (satu UPDATE).
+    Nomor yg dipesan tapi tidak dipakai akan jadi lubang → pesan secukupnya.
+    """
+    if n <= 0:
+        return []
+    y = _year()
+    prefix = f"AGD/{y}/"
+    first = _allocate("AGD", y, lambda: _last_seq(IncomingLetter.objects, "agenda_number", prefix), count=n)
+    return [f"{prefix}{seq:06d}" for seq in range(first, first + n)]
+
+def reserve_outgoing_numbers(prefix: str = "ST", n: int = 1) -> list[str]:
+    """Pesan `n` nomor surat keluar berurutan utk satu prefix (satu UPDATE)."""
+    if n <= 0:
+        return []
+    prefix = (prefix or "ST").upper()
+    y = _year()
+    base = f"{prefix}/{y}/"
+    first = _allocate(prefix, y, lambda: _last_seq(OutgoingLetter.objects, "number", base), count=n)
+    return [f"{base}{seq:05d}" for seq in range(first, first + n)]
+
+def agenda_number_block(n: int):
+    """
+    Context manager utk import massal:
+
+        with transaction.atomic(), agenda_number_block(len(rows)):
+            for row in rows:
+                IncomingLetter(**row).save()   # pre_save ambil dari blok
+
+    Selama blok aktif, `incoming_pre_save` memakai nomor yg sudah dipesan
+    sehingga 2.000 surat cukup satu query penomoran.
+    """
+    return _use_reserved("AGD", reserve_agenda_numbers(n))
+
+def outgoing_number_block(prefix: str, n: int):
+    """Sama seperti agenda_number_block, utk surat keluar per prefix."""
+    prefix = (prefix or "ST").upper()
+    return _use_reserved(prefix, reserve_outgoing_numbers(prefix, n))
@@ -0,0 +1,223 @@
+"""
+Paginasi keyset (cursor) utk daftar surat, urut (-created_at, -id).
+
+OFFSET + COUNT(*) makin lambat di halaman dalam; di sini tiap halaman cukup
+    WHERE (created_at, id) < (cursor) ORDER BY created_at DESC, id DESC LIMIT n+1
+sehingga halaman ke-5.000 sama cepatnya dgn halaman pertama.
+Jumlah total diganti hitungan perkiraan (dibatasi LIST_APPROX_COUNT_CAP).
+
+Parameter URL: ?after=<cursor> (halaman berikut) / ?before=<cursor> (sebelumnya).
+"""
+from __future__ import annotations
+
+import base64
+
+from django.conf import settings
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core import search
+
+AFTER_VAR = "after"
+BEFORE_VAR = "before"
+CURSOR_VARS = (AFTER_VAR, BEFORE_VAR)
+
+
+def _cap() -> int:
+    return getattr(settings, "LIST_APPROX_COUNT_CAP", 1000)
+
+
+# ========== CURSOR ==========
+
+def encode_cursor(obj) -> str:
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value: str | None):
+    """Return (created_at, pk) atau None kalau cursor kosong/rusak."""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        stamp, pk = raw.rsplit("|", 1)
+        created_at = parse_datetime(stamp)
+        return (created_at, int(pk)) if created_at else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# ========== HITUNGAN PERKIRAAN ==========
+
+def approximate_count(qs, cap: int | None = None) -> tuple[int, bool]:
+    """
+    Return (jumlah, exact).
+      - Postgres tanpa filter → reltuples dari statistik planner (tanpa scan).
+      - Selain itu COUNT(*) atas subquery LIMIT cap+1 → biaya maksimal `cap` baris.
+    """
+    cap = _cap() if cap is None else cap
+    connection = connections[qs.db]
+    if connection.vendor == "postgresql" and not qs.query.where:
+        with connection.cursor() as cur:
+            cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                        [qs.model._meta.db_table])
+            row = cur.fetchone()
+        if row and row[0] > cap:
+            return int(row[0]), False
+    n = qs.order_by()[:cap + 1].count()
+    return (cap, False) if n > cap else (n, True)
+
+
+class ApproxCountPaginator(Paginator):
+    """Paginator OFFSET biasa, tapi `count` pakai approximate_count()."""
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list)[0]
+
+
+# ========== HALAMAN ==========
+
+class KeysetPage:
+    """Pengganti Page Django (tanpa nomor halaman)."""
+
+    def __init__(self, object_list, has_next, has_previous, count=None, count_exact=True):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.count = count
+        self.count_exact = count_exact
+        self.next_cursor = encode_cursor(object_list[-1]) if has_next and object_list else None
+        self.previous_cursor = encode_cursor(object_list[0]) if has_previous and object_list else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+
+def keyset_page(qs, per_page: int, after: str | None = None, before: str | None = None) -> KeysetPage:
+    """Ambil satu halaman (-created_at, -id) mulai dari cursor `after`/`before`."""
+    before_key = decode_cursor(before)
+    after_key = None if before_key else decode_cursor(after)
+
+    if before_key:
+        stamp, pk = before_key
+        rows = list(qs.filter(Q(created_at__gt=stamp) | Q(created_at=stamp, pk__gt=pk))
+                      .order_by("created_at", "pk")[:per_page + 1])
+        has_previous = len(rows) > per_page
+        return KeysetPage(rows[:per_page][::-1], has_next=True, has_previous=has_previous)
+
+    if after_key:
+        stamp, pk = after_key
+        qs = qs.filter(Q(created_at__lt=stamp) | Q(created_at=stamp, pk__lt=pk))
+    rows = list(qs.order_by("-created_at", "-pk")[:per_page + 1])
+    return KeysetPage(rows[:per_page], has_next=len(rows) > per_page, has_previous=after_key is not None)
+
+
+# ========== LISTVIEW ==========
+
+class KeysetPaginationMixin:
+    """
+    Utk ListView: ganti paginasi OFFSET dgn keyset.
+    Context: page_obj.next_cursor / previous_cursor, page_obj.count (perkiraan).
+    """
+    approximate_count = True
+
+    def paginate_queryset(self, queryset, page_size):
+        page = keyset_page(
+            queryset, page_size,
+            after=self.request.GET.get(AFTER_VAR),
+            before=self.request.GET.get(BEFORE_VAR),
+        )
+        if self.approximate_count:
+            page.count, page.count_exact = approximate_count(queryset)
+        return (None, page, page.object_list, page.has_other_pages())
+
+
+# ========== ADMIN CHANGELIST ==========
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList admin dgn keyset selama urutan default (tanpa ?o=).
+    Kalau user mengurutkan kolom lain → kembali ke paginasi OFFSET biasa,
+    tapi tetap tanpa COUNT(*) penuh.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for var in CURSOR_VARS:
+            lookup_params.pop(var, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # link filter/urut/pencarian selalu mulai lagi dari halaman pertama
+        new_params = new_params or {}
+        remove = list(remove or [])
+        remove += [var for var in CURSOR_VARS if var not in new_params]
+        return super().get_query_string(new_params, remove)
+
+    def use_keyset(self) -> bool:
+        # pencarian full-text diurutkan relevansi → paginasi OFFSET
+        return ORDER_VAR not in self.params and not self.show_all and not self.query
+
+    def get_ordering(self, request, queryset):
+        if self.query and ORDER_VAR not in self.params and search.RANK in queryset.query.annotations:
+            return [search.RANK, "-pk"]
+        return super().get_ordering(request, queryset)
+
+    def get_results(self, request):
+        if not self.use_keyset():
+            self.keyset_page = None
+            return super().get_results(request)
+
+        page = keyset_page(
+            self.queryset, self.list_per_page,
+            after=request.GET.get(AFTER_VAR),
+            before=request.GET.get(BEFORE_VAR),
+        )
+        page.count, page.count_exact = approximate_count(self.queryset)
+        self.keyset_page = page
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = page.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = page.object_list
+        self.can_show_all = False
+        self.multi_page = page.has_other_pages()
+
+    def next_url(self):
+        page = self.keyset_page
+        return self.get_query_string({AFTER_VAR: page.next_cursor}) if page and page.next_cursor else None
+
+    def previous_url(self):
+        page = self.keyset_page
+        if not page or not page.has_previous():
+            return None
+        if page.previous_cursor:
+            return self.get_query_string({BEFORE_VAR: page.previous_cursor})
+        return self.get_query_string()
+
+
+class KeysetAdminMixin:
+    """Pasang di ModelAdmin: changelist keyset + hitungan perkiraan."""
+    paginator = ApproxCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
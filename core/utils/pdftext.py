@@ -0,0 +1,51 @@
+"""
+Ekstraksi teks dari PDF (layer teks), dengan OCR lokal opsional utk scan
+yg hanya berisi gambar.
+
+Dependensi:
+  - pypdf                    → wajib utk ekstraksi layer teks
+  - pytesseract + pdf2image  → opsional, hanya bila DOCUMENT_OCR_ENABLED=True
+                               (butuh binary tesseract & poppler di server)
+
+Fungsi di sini murni (tanpa ORM) supaya bisa dijalankan di ProcessPoolExecutor.
+"""
+from __future__ import annotations
+import hashlib
+from io import BytesIO
+
+# Halaman dgn teks lebih pendek dari ini dianggap "hanya gambar"
+MIN_CHARS_PER_PAGE = 20
+
+
+def sha1_of(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _ocr(data: bytes, lang: str) -> str:
+    import pytesseract
+    from pdf2image import convert_from_bytes
+
+    return "\n".join(pytesseract.image_to_string(img, lang=lang) for img in convert_from_bytes(data))
+
+
+def extract_pdf_text(data: bytes, ocr: bool = False, ocr_lang: str = "por+eng") -> dict:
+    """
+    Return dict: pages, text, method ("text" | "ocr" | ""), sha1, error.
+    Tidak pernah raise → aman dipakai di worker pool.
+    """
+    result = {"pages": 0, "text": "", "method": "", "sha1": sha1_of(data), "error": ""}
+    try:
+        from pypdf import PdfReader
+
+        reader = PdfReader(BytesIO(data))
+        result["pages"] = len(reader.pages)
+        text = "\n".join((page.extract_text() or "") for page in reader.pages).strip()
+        if len(text) >= MIN_CHARS_PER_PAGE * max(result["pages"], 1) // 2:
+            result["text"], result["method"] = text, "text"
+        elif ocr:
+            result["text"], result["method"] = _ocr(data, ocr_lang).strip(), "ocr"
+        else:
+            result["text"], result["method"] = text, ("text" if text else "")
+    except Exception as e:  # PDF rusak, dependensi OCR tidak ada, dll.
+        result["error"] = f"{type(e).__name__}: {e}"[:1000]
+    return result
@@ -1,10 +1,65 @@
 import qrcode
 from io import BytesIO
+from urllib.parse import urljoin
+from django.conf import settings
 from django.core.files.base import ContentFile
 
+def verify_base() -> str:
+    """
+    Ambil base URL verifikasi publik.
+    - Jika kamu punya domain publik, set di settings:
+        PUBLIC_BASE_URL = "https://sistem.tic.gov.tl"
+        PUBLIC_VERIFY_PATH = "/verify/"
+        maka hasil final: https://sistem.tic.gov.tl/verify/<kode>
+    - Jika tidak, fallback "/verify/" → jadinya path relatif saja.
+    """
+    public_base = getattr(settings, "PUBLIC_BASE_URL", "")
+    verify_path = getattr(settings, "PUBLIC_VERIFY_PATH", "/verify/")
+    if not verify_path.endswith("/"):
+        verify_path += "/"
+    return urljoin(public_base, verify_path)
+
 def make_qr_png(data: str) -> ContentFile:
     """Return ContentFile PNG untuk disimpan ke ImageField."""
     img = qrcode.make(data)
     buf = BytesIO()
     img.save(buf, format="PNG")
     return ContentFile(buf.getvalue())
+
+def qr_runs(data: str):
+    """
+    Matriks QR sebagai potongan horizontal modul hitam.
+    Return (size, [(x, y, panjang), ...]) → dipakai writer vektor (SVG/PDF).
+    """
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    size = len(matrix)
+
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if row[x]:
+                start = x
+                while x < size and row[x]:
+                    x += 1
+                runs.append((start, y, x - start))
+            else:
+                x += 1
+    return size, runs
+
+def make_qr_svg(data: str) -> ContentFile:
+    """
+    Return ContentFile SVG (vektor, tanpa encode raster Pillow).
+    Modul hitam digabung per baris jadi satu <path> → file kecil & cepat.
+    """
+    size, runs = qr_runs(data)
+    path = "".join(f"M{x} {y}h{n}v1h-{n}z" for x, y, n in runs)
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'shape-rendering="crispEdges"><rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{path}"/></svg>'
+    )
+    return ContentFile(svg.encode())
@@ -0,0 +1,46 @@
+"""
+Rate limiter token-bucket per kunci (mis. IP) di atas Django cache.
+
+Tiap kunci punya `burst` token yg terisi ulang `rate` token/detik; satu
+request memakai satu token. Tanpa akses DB sama sekali.
+Catatan: get/set cache tidak atomik → di bawah konkurensi tinggi bucket bisa
+"bocor" sedikit; cukup utk meredam klien abusif, bukan kuota ketat.
+"""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def client_ip(request) -> str:
+    """
+    IP klien. Default REMOTE_ADDR. Di belakang N reverse proxy tepercaya set
+    RATELIMIT_TRUSTED_PROXIES = N → alamat ke-N dari KANAN X-Forwarded-For
+    (tiap proxy menambahkan alamat peer-nya di kanan; entri kiri bisa diisi
+    bebas oleh klien, jadi tidak pernah dipakai).
+    """
+    remote = request.META.get("REMOTE_ADDR") or ""
+    proxies = getattr(settings, "RATELIMIT_TRUSTED_PROXIES", 0)
+    if not proxies:
+        return remote
+    hops = [h.strip() for h in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if h.strip()]
+    return hops[-proxies] if len(hops) >= proxies else remote
+
+
+def take(key: str, rate: float, burst: int, cache_alias: str = "default") -> float:
+    """
+    Ambil satu token dari bucket `key`.
+    Return 0 bila diizinkan, selain itu jumlah detik sampai token berikut tersedia.
+    """
+    cache = caches[cache_alias]
+    now = time.time()
+    tokens, stamp = cache.get(key) or (float(burst), now)
+    tokens = min(float(burst), tokens + (now - stamp) * rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    # bucket penuh kembali setelah burst/rate detik → kunci boleh kedaluwarsa
+    cache.set(key, (tokens, now), timeout=int(burst / rate) + 1)
+    return 0.0 if allowed else (1 - tokens) / rate
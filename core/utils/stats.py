@@ -0,0 +1,67 @@
+"""
+Statistik dashboard: satu query agregasi kondisional per model + cache.
+
+Cache di-invalidate oleh signal save/delete surat (setelah commit) dan
+oleh aksi admin massal (queryset.update tidak memicu signal).
+DASHBOARD_STATS_TTL (detik) jadi batas atas kalau ada perubahan yg lolos.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import IncomingLetter, OutgoingLetter
+
+RECENT_LIMIT = 10
+
+
+def _key(day) -> str:
+    return f"dashboard:stats:{day.isoformat()}"
+
+
+def _compute(today) -> dict:
+    incoming = IncomingLetter.objects.aggregate(
+        incoming_today=Count("pk", filter=Q(created_at__date=today)),
+        incoming_in_progress=Count("pk", filter=Q(status__in=["DISP", "PROG"])),
+        incoming_done=Count("pk", filter=Q(status="DONE")),
+        incoming_total=Count("pk"),
+    )
+    outgoing = OutgoingLetter.objects.aggregate(
+        outgoing_draft=Count("pk", filter=Q(status="DRAFT")),
+        outgoing_review=Count("pk", filter=Q(status="REVIEW")),
+        outgoing_final=Count("pk", filter=Q(status="FINAL")),
+        outgoing_sent=Count("pk", filter=Q(status="MANDA")),
+        outgoing_total=Count("pk"),
+    )
+    return {
+        "stats": {**incoming, **outgoing},
+        # dict (bukan instance) supaya bisa di-cache; template cuma baca field ini
+        "recent_incoming": list(
+            IncomingLetter.objects.order_by("-created_at")
+            .values("pk", "agenda_number", "subject", "origin", "status")[:RECENT_LIMIT]
+        ),
+        "recent_outgoing": list(
+            OutgoingLetter.objects.order_by("-created_at")
+            .values("pk", "number", "subject", "status")[:RECENT_LIMIT]
+        ),
+    }
+
+
+def dashboard_data() -> dict:
+    """stats + recent lists; dari cache bila ada (0 query)."""
+    today = timezone.localdate()
+    key = _key(today)
+    data = cache.get(key)
+    if data is None:
+        data = _compute(today)
+        cache.set(key, data, getattr(settings, "DASHBOARD_STATS_TTL", 300))
+    return data
+
+
+def invalidate_dashboard() -> None:
+    """Hapus cache dashboard hari ini, setelah transaksi commit."""
+    key = _key(timezone.localdate())
+    transaction.on_commit(lambda: cache.delete(key))
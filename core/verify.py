@@ -0,0 +1,180 @@
+"""
+Data halaman verifikasi publik (/verify/<kode>/), di-cache per kode.
+
+- Hit cache → tanpa query DB; kode tak dikenal juga di-cache (negatif, TTL
+  pendek) agar pindaian kode acak tidak membanjiri DB.
+- Invalidasi lewat signal save/delete surat (core/signals.py), setelah commit.
+- `etag` & `last_modified` dipakai utk conditional GET (304).
+
+QR bertanda tangan (VERIFY_SIGNED_QR = True): URL di QR membawa token
+`?t=<status>.<YYYYMMDD>.<HMAC>` atas "kode|status|tanggal". Token bisa
+diperiksa tanpa DB (view verifikasi, atau kiosk via `manage.py verify_scans`);
+DB/cache hanya dipakai utk cek kesegaran (status sekarang masih sama?).
+
+Tanggal di token = tanggal surat dibuat, BUKAN tanggal terbit token: token
+tidak kedaluwarsa (QR tercetak harus tetap bisa diverifikasi). Cek offline
+hanya membuktikan pasangan (status, tanggal) pernah diterbitkan sistem —
+status yg sudah berubah sesudahnya hanya terdeteksi lewat cek kesegaran
+(VERIFY_FRESHNESS_CHECK / `verify_scans --fresh`).
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signing import Signer
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from core.models import IncomingLetter, OutgoingLetter, LETTER_STATUS, OUT_STATUS
+from core.utils.qr import verify_base
+
+SAFE_PREFIXES_OUT = ("ST/", "ND/", "UD/", "MM/", "LN/")
+_MISSING = {"kind": None}
+
+SIGN_SALT = "core.verify.qr"
+TOKEN_PARAM = "t"
+STATUS_LABELS = {"incoming": dict(LETTER_STATUS), "outgoing": dict(OUT_STATUS)}
+
+
+def kind_of(code: str):
+    if code.startswith("AGD/"):
+        return "incoming"
+    if code.startswith(SAFE_PREFIXES_OUT):
+        return "outgoing"
+    return None
+
+
+def _key(code: str) -> str:
+    return "verify:" + hashlib.sha1(code.encode()).hexdigest()
+
+
+def _etag(code: str, kind, updated_at, state=None) -> str:
+    # status ikut di-hash: tidak semua jalur tulis menaikkan updated_at
+    raw = f"{code}|{kind}|{updated_at.isoformat() if updated_at else ''}|{state or ''}"
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _load(code: str) -> dict:
+    kind = kind_of(code)
+    if kind == "incoming":
+        o = IncomingLetter.objects.filter(agenda_number=code).first()
+        if o is None:
+            return dict(_MISSING)
+        return {
+            "kind": "incoming",
+            "updated_at": o.updated_at,
+            "state": o.status,
+            "date": timezone.localdate(o.created_at),
+            "obj": {
+                "agenda_number": o.agenda_number,
+                "status": o.get_status_display(),
+                "created_at": o.created_at,
+                "priority": o.get_priority_display(),
+            },
+        }
+    if kind == "outgoing":
+        o = OutgoingLetter.objects.filter(number=code).first()
+        if o is None:
+            return dict(_MISSING)
+        return {
+            "kind": "outgoing",
+            "updated_at": o.updated_at,
+            "state": o.status,
+            "date": timezone.localdate(o.created_at),
+            "obj": {
+                "number": o.number,
+                "status": o.get_status_display(),
+                "created_at": o.created_at,
+                "template": o.get_template_type_display(),
+                "has_signed_pdf": bool(o.signed_pdf),
+            },
+        }
+    return dict(_MISSING)
+
+
+def lookup(code: str, cache_missing: bool = True) -> dict:
+    """
+    Return dict {kind, obj, updated_at, state, date, etag}; kind None = kode
+    tidak ditemukan. `state` = kode status mentah (utk token QR).
+    cache_missing=False → kode tak dikenal tidak di-cache negatif.
+    """
+    key = _key(code)
+    data = cache.get(key)
+    if data is None:
+        data = _load(code)
+        data["etag"] = _etag(code, data["kind"], data.get("updated_at"), data.get("state"))
+        if not data["kind"] and not cache_missing:
+            return data
+        ttl = (getattr(settings, "VERIFY_CACHE_TTL", 3600) if data["kind"]
+               else getattr(settings, "VERIFY_NEGATIVE_TTL", 60))
+        cache.set(key, data, ttl)
+    return data
+
+
+def invalidate(*codes: str) -> None:
+    keys = [_key(c) for c in codes if c]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ========== TOKEN QR BERTANDA TANGAN ==========
+
+def _signer() -> Signer:
+    # kunci sendiri (VERIFY_SIGNING_KEY) → bisa dibagikan ke kiosk tanpa SECRET_KEY
+    return Signer(key=getattr(settings, "VERIFY_SIGNING_KEY", None) or settings.SECRET_KEY, salt=SIGN_SALT)
+
+
+def make_token(code: str, status: str, date: datetime.date) -> str:
+    day = date.strftime("%Y%m%d")
+    return f"{status}.{day}.{_signer().signature(f'{code}|{status}|{day}')}"
+
+
+def read_token(code: str, token: str):
+    """
+    Periksa token utk `code` tanpa DB. Return {"status", "date"} bila tanda
+    tangan cocok, None bila rusak / dipalsukan / milik kode lain.
+    Tidak ada cek umur: `date` = tanggal surat, kesegaran dicek terpisah.
+    """
+    try:
+        status, day, sig = token.split(".", 2)
+        date = datetime.datetime.strptime(day, "%Y%m%d").date()
+    except (AttributeError, ValueError):
+        return None
+    if not constant_time_compare(sig, _signer().signature(f"{code}|{status}|{day}")):
+        return None
+    return {"status": status, "date": date}
+
+
+def qr_url(code: str, status: str | None = None, date: datetime.date | None = None) -> str:
+    """Isi QR: URL verifikasi, plus token bila VERIFY_SIGNED_QR aktif & status diketahui."""
+    if not getattr(settings, "VERIFY_SIGNED_QR", False) or not status or not date:
+        return verify_base() + code
+    return f"{verify_base()}{code}/?{TOKEN_PARAM}={make_token(code, status, date)}"
+
+
+def qr_payload(code: str) -> str:
+    """Seperti qr_url, status & tanggal diambil dari lookup() (cache)."""
+    if not getattr(settings, "VERIFY_SIGNED_QR", False):
+        return verify_base() + code
+    data = lookup(code)
+    return qr_url(code, data.get("state"), data.get("date"))
+
+
+def parse_scan(text: str):
+    """Hasil pindaian (URL QR atau "<kode> <token>") → (kode, token|None)."""
+    text = text.strip()
+    if " " in text:
+        code, token = text.split(None, 1)
+        return code, token.strip()
+    parts = urlsplit(text)
+    base = urlsplit(verify_base()).path
+    path = unquote(parts.path)
+    if path.startswith(base):
+        path = path[len(base):]
+    token = parse_qs(parts.query).get(TOKEN_PARAM, [None])[0]
+    return path.strip("/"), token
@@ -7,6 +7,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView
 from django.shortcuts import redirect, get_object_or_404, render
 from django.urls import reverse_lazy
+from django.db.models import Count
 from django.views import View
 from django.views.generic import (
     ListView, CreateView, UpdateView, DetailView
@@ -20,6 +21,8 @@ from .forms import (
     IncomingLetterForm, OutgoingLetterForm,
     DispositionForm, FollowUpForm,
 )
+from .utils.pagination import KeysetPaginationMixin
+from .utils.numbering import set_outgoing_status
 
 
 @login_required
@@ -32,12 +35,20 @@ def ui_home(request):
 # SURAT MASUK
 # =========================
 
-class IncomingList(LoginRequiredMixin, ListView):
+class IncomingList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    # paginasi keyset (-created_at, -id): ?after=<cursor> / ?before=<cursor>
     model = IncomingLetter
     paginate_by = 20
-    ordering = ["-created_at"]
+    ordering = ["-created_at", "-id"]
     template_name = "incoming/list.html"
 
+    def get_queryset(self):
+        # hanya kolom yg dipakai incoming/list.html
+        return super().get_queryset().only(
+            "id", "agenda_number", "origin", "origin_number", "origin_date",
+            "subject", "status", "created_at",
+        )
+
 
 class IncomingCreate(LoginRequiredMixin, CreateView):
     model = IncomingLetter
@@ -62,6 +73,9 @@ class IncomingDetail(LoginRequiredMixin, DetailView):
     model = IncomingLetter
     template_name = "incoming/detail.html"
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("created_by", "current_handler")
+
 
 class DispositionCreate(LoginRequiredMixin, CreateView):
     """
@@ -155,12 +169,16 @@ class FollowUpCreate(LoginRequiredMixin, CreateView):
 # KARTA SAI
 # =========================
 
-class OutgoingList(LoginRequiredMixin, ListView):
+class OutgoingList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = OutgoingLetter
     paginate_by = 20
-    ordering = ["-created_at"]
+    ordering = ["-created_at", "-id"]
     template_name = "outgoing/list.html"
 
+    def get_queryset(self):
+        # isi surat (body) tidak tampil di daftar
+        return super().get_queryset().select_related("created_by").defer("body")
+
 
 class OutgoingCreate(LoginRequiredMixin, CreateView):
     model = OutgoingLetter
@@ -185,6 +203,9 @@ class OutgoingDetail(LoginRequiredMixin, DetailView):
     model = OutgoingLetter
     template_name = "outgoing/detail.html"
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("created_by")
+
 
 class OutgoingSetStatus(LoginRequiredMixin, View):
     """
@@ -196,8 +217,7 @@ class OutgoingSetStatus(LoginRequiredMixin, View):
         target = request.POST.get("status")
         allowed = {"REVIEW", "APPROVED", "FINAL", "MANDA", "ARCH"}
         if target in allowed:
-            letter.status = target
-            letter.save(update_fields=["status"])  
+            set_outgoing_status(letter, target)
             messages.success(request, f"Status diubah ke {target}.")
         else:
             messages.error(request, "Status tidak diperbolehkan.")
@@ -235,7 +255,7 @@ def incoming_detail_view(request, pk):
     dispositions = (
         letter.dispositions
         .select_related("sender")
-        .prefetch_related("assignments__assignee")
+        .annotate(assignment_count=Count("assignments"))
         .order_by("-created_at")
     )
 
@@ -1,42 +1,124 @@
-from django.shortcuts import render, get_object_or_404
+import math
+
+from django.conf import settings
+from django.shortcuts import render
 from django.utils import timezone
-from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+
+from . import verify
+from .utils import ratelimit
+from .utils.codes import (
+    CONTENT_TYPES, KINDS, code_etag, code_image_bytes, image_format, is_valid_code,
+)
 
-from .models import IncomingLetter, OutgoingLetter
+def _throttle(request, scope: str):
+    """429 + Retry-After bila IP melewati batas `scope` (VERIFY_/CODE_RATE_*); None = lanjut."""
+    prefix = scope.upper()
+    retry = ratelimit.take(
+        f"rl:{scope}:" + ratelimit.client_ip(request),
+        rate=getattr(settings, f"{prefix}_RATE_PER_SEC", 1.0),
+        burst=getattr(settings, f"{prefix}_RATE_BURST", 30),
+    )
+    if not retry:
+        return None
+    resp = HttpResponse("Pedidu barak liu. Koko fali iha segundu balun.", status=429,
+                        content_type="text/plain; charset=utf-8")
+    resp["Retry-After"] = str(math.ceil(retry))
+    return resp
 
-SAFE_PREFIXES_OUT = ("ST/", "ND/", "UD/", "MM/", "LN/")
 
+@require_safe
 def verify_document(request, code: str):
     """
     Halaman verifikasi publik berdasarkan kode:
     - Incoming:  AGD/YYYY/NNNNNN  (agenda_number)
     - Outgoing:  ST|ND|UD|MM|LN/YYYY/NNNNNN  (number)
     Menampilkan metadata minimum (tanpa konten).
+
+    Urutan murah → mahal: rate limit per IP (cache) → data dari cache
+    (core/verify.py) → 304 bila ETag/Last-Modified cocok → render.
+    """
+    throttled = _throttle(request, "verify")
+    if throttled:
+        return throttled
+
+    token = request.GET.get(verify.TOKEN_PARAM)
+    if token:
+        return _verify_signed(request, code, token)
+
+    data = verify.lookup(code)
+    if not data["kind"]:
+        raise Http404("Kode verifikasaun la válidu.")
+
+    last_modified = data["updated_at"].timestamp() if data.get("updated_at") else None
+    resp = get_conditional_response(request, etag=data["etag"], last_modified=last_modified)
+    if resp is None:
+        ctx = {"code": code, "now": timezone.now(), "kind": data["kind"], "obj": data["obj"]}
+        resp = render(request, "public/verify.html", ctx)
+    resp["ETag"] = data["etag"]
+    if last_modified:
+        resp["Last-Modified"] = http_date(last_modified)
+    resp["Cache-Control"] = f"public, max-age={getattr(settings, 'VERIFY_BROWSER_MAX_AGE', 60)}"
+    return resp
+
+
+def _verify_signed(request, code: str, token: str):
+    """
+    QR bertanda tangan: isi (status, tanggal) dibuktikan oleh HMAC, tanpa DB.
+    DB/cache hanya utk cek kesegaran bila VERIFY_FRESHNESS_CHECK aktif.
+    """
+    kind = verify.kind_of(code)
+    signed = verify.read_token(code, token) if kind else None
+    ctx = {"code": code, "now": timezone.now(), "kind": kind, "obj": None, "signed": signed}
+    if signed is None:
+        ctx["kind"] = None
+        ctx["bad_signature"] = True
+        return render(request, "public/verify.html", ctx, status=400)
+
+    signed["status_label"] = verify.STATUS_LABELS[kind].get(signed["status"], signed["status"])
+    if getattr(settings, "VERIFY_FRESHNESS_CHECK", True):
+        data = verify.lookup(code)
+        ctx["obj"] = data.get("obj")
+        ctx["fresh"] = data["kind"] is not None and data["state"] == signed["status"]
+        ctx["missing"] = data["kind"] is None
+    resp = render(request, "public/verify.html", ctx)
+    resp["Cache-Control"] = f"public, max-age={getattr(settings, 'VERIFY_BROWSER_MAX_AGE', 60)}"
+    return resp
+
+
+@require_safe
+def code_image(request, kind: str, code: str):
     """
-    now = timezone.now()
-    ctx = {"code": code, "now": now, "kind": None, "obj": None}
-
-    if code.startswith("AGD/"):
-        o = get_object_or_404(IncomingLetter, agenda_number=code)
-        ctx["kind"] = "incoming"
-        ctx["obj"] = {
-            "agenda_number": o.agenda_number,
-            "status": o.get_status_display(),
-            "created_at": o.created_at,
-            "priority": o.get_priority_display(),
-        }
-        return render(request, "public/verify.html", ctx)
-
-    if code.startswith(SAFE_PREFIXES_OUT):
-        o = get_object_or_404(OutgoingLetter, number=code)
-        ctx["kind"] = "outgoing"
-        ctx["obj"] = {
-            "number": o.number,
-            "status": o.get_status_display(),
-            "created_at": o.created_at,
-            "template": o.get_template_type_display(),
-            "has_signed_pdf": bool(o.signed_pdf),
-        }
-        return render(request, "public/verify.html", ctx)
-
-    raise Http404("Kode verifikasaun la válidu.")
+    QR / barcode (PNG atau SVG) dirender on-the-fly dari nomor.
+    Rate limit per IP seperti /verify/ (CODE_RATE_*). Hanya nomor yg
+    benar-benar ada (verify.lookup; kode tak dikenal TIDAK di-cache negatif)
+    → string acak tidak dirender & tidak mengisi cache.
+    Format default dari CODE_IMAGE_FORMAT, bisa dipaksa dengan ?fmt=png|svg.
+    Gambar tidak pernah berubah utk kode yg sama → cache browser 1 tahun,
+    dan If-None-Match (dibandingkan per tag) dijawab 304 tanpa render sama
+    sekali (kecuali QR bertanda tangan: isinya ikut status surat).
+    """
+    throttled = _throttle(request, "code")
+    if throttled:
+        return throttled
+    if (kind not in KINDS or not is_valid_code(code)
+            or not verify.lookup(code, cache_missing=False)["kind"]):
+        raise Http404("Kode la válidu.")
+    fmt = request.GET.get("fmt") or image_format()
+    if fmt not in CONTENT_TYPES:
+        raise Http404("Formatu la válidu.")
+
+    etag = code_etag(kind, code, fmt)
+    resp = get_conditional_response(request, etag=etag)
+    if resp is None:
+        resp = HttpResponse(code_image_bytes(kind, code, fmt), content_type=CONTENT_TYPES[fmt])
+    resp["ETag"] = etag
+    if kind == "qr" and getattr(settings, "VERIFY_SIGNED_QR", False):
+        # payload ikut status surat → boleh berubah, revalidasi via ETag
+        resp["Cache-Control"] = f"public, max-age={getattr(settings, 'VERIFY_BROWSER_MAX_AGE', 60)}"
+    else:
+        resp["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
@@ -52,31 +52,99 @@ INSTALLED_APPS = [
     "core",
 ]
 
+# Simpan audit juga ke tabel AuditEvent (bulk insert dari thread latar)
+AUDIT_DB_ENABLED = True
+
+# File log profiling (handler perf_file & halaman /admin/karta/perf/), lihat PROFILING_*
+PROFILING_LOG_FILE = BASE_DIR / "perf.log"
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "formatters": {"simple": {"format": "%(asctime)s %(levelname)s %(message)s"}},
+    "formatters": {
+        "simple": {"format": "%(asctime)s %(levelname)s %(message)s"},
+        "json": {"format": "%(message)s"},   # pesan sudah berupa JSON satu baris
+    },
     "handlers": {
+        # Asinkron + batch (core/audit.py): request tidak menunggu disk.
+        # Rotasi: ukuran > max_bytes atau lewat tengah malam, simpan backup_count file.
         "audit_file": {
-            "class": "logging.FileHandler",
+            "()": "core.audit.AsyncAuditHandler",
             "filename": str(BASE_DIR / "audit.log"),
+            "max_bytes": 50 * 1024 * 1024,
+            "when": "midnight",
+            "backup_count": 30,
+            "batch_size": 500,
+            "flush_interval": 1.0,
+            "db": AUDIT_DB_ENABLED,   # bulk insert ke tabel AuditEvent
             "formatter": "simple",
-        }
+        },
+        "perf_file": {
+            "class": "logging.FileHandler",
+            "filename": str(PROFILING_LOG_FILE),
+            "delay": True,   # file baru dibuat saat baris pertama ditulis
+            "formatter": "json",
+        },
     },
     "loggers": {
         "audit": {"handlers": ["audit_file"], "level": "INFO", "propagate": False},
+        "perf": {"handlers": ["perf_file"], "level": "INFO", "propagate": False},
     },
 }
 
 PUBLIC_BASE_URL = ""
 PUBLIC_VERIFY_BASE = "/verify/"
 
+# Verifikasi publik (core/verify.py): cache per kode + rate limit token-bucket per IP
+VERIFY_CACHE_TTL = 60 * 60      # data surat di cache (di-invalidate saat surat disimpan)
+VERIFY_NEGATIVE_TTL = 60        # kode tidak dikenal
+VERIFY_BROWSER_MAX_AGE = 60     # Cache-Control utk browser/proxy (lalu revalidasi via ETag)
+VERIFY_RATE_PER_SEC = 1.0       # isi ulang token per detik per IP
+VERIFY_RATE_BURST = 30          # pindaian beruntun yg diizinkan
+CODE_RATE_PER_SEC = 2.0         # gambar QR/barcode /code/ per IP (halaman staf memuat beberapa)
+CODE_RATE_BURST = 60
+RATELIMIT_TRUSTED_PROXIES = 0   # jumlah reverse proxy di depan app (IP dari X-Forwarded-For, dari kanan)
+
+# QR bertanda tangan (HMAC): QR membawa status + tanggal → bisa diverifikasi offline
+VERIFY_SIGNED_QR = False        # True → URL QR + ?t=<status>.<YYYYMMDD>.<tanda tangan>
+VERIFY_SIGNING_KEY = None       # None → SECRET_KEY; isi kunci terpisah bila dibagi ke kiosk
+VERIFY_FRESHNESS_CHECK = True   # token valid → tetap cek status sekarang (cache/DB); token sendiri tidak kedaluwarsa
+
+# QR/Barcode disajikan on-the-fly via /code/<qr|barcode>/<nomor>/ (core/utils/codes.py).
+# Set True hanya kalau masih butuh file PNG di storage (dirender worker, core/jobs.py).
+CODE_STORE_IMAGES = False
+CODE_IMAGE_FORMAT = "svg"   # "png" | "svg" (svg: lebih kecil & tajam utk cetak label)
+CODE_RENDER_ASYNC = True
+CODE_RENDER_WORKERS = 2
+CODE_IMAGE_LRU_SIZE = 1024
+CODE_IMAGE_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Ekstraksi teks PDF (manage.py extract_document_text). OCR butuh pytesseract + pdf2image.
+DOCUMENT_OCR_ENABLED = False
+DOCUMENT_OCR_LANG = "por+eng"
+
+# Cache statistik dashboard (detik); di-invalidate otomatis saat surat berubah
+DASHBOARD_STATS_TTL = 300
+
+# Profiling request (core/middleware.ProfilingMiddleware) → PROFILING_LOG_FILE (JSON per baris),
+# ringkasan p50/p95/p99 per endpoint di /admin/karta/perf/. Nyalakan saat mengukur;
+# selalu mati di test (core/test_runner.py).
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.1     # porsi request normal yg dicatat
+PROFILING_SLOW_MS = 1000        # lebih lambat dari ini → selalu dicatat
+PROFILING_QUERY_BUDGET = 50     # query lebih dari ini → selalu dicatat
+PROFILING_WINDOW = 5000         # jumlah baris terakhir yg diringkas
+
+# Stok label default utk aksi "Cetak Label" (lihat core/utils/labels.py)
+LABEL_STOCK = "roll58"
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 MIDDLEWARE = [
+    "core.middleware.ProfilingMiddleware",   # paling luar: ukur seluruh request
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -101,6 +169,8 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                # badge inbox tarefa di navbar admin (lazy, di-cache per user)
+                "core.context_processors.inbox_counts",
             ],
         },
     },
@@ -115,9 +185,15 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # DB test berupa file (bukan memori bersama): test penomoran konkuren
+        # (core/stress.py) butuh lock file + busy timeout seperti produksi
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
+# Runner test: matikan efek samping ke file repo (profiling, dll.)
+TEST_RUNNER = "core.test_runner.TestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -160,6 +236,18 @@ MEDIA_ROOT = BASE_DIR / "media"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Pengingat SLA Despacho (core/sla.py, `manage.py sla_reminder` via cron)
+SLA_DUE_SOON_DAYS = 2
+SLA_NOTIFIER = "core.sla.EmailNotifier"
+# lokal: console; produksi: backend SMTP (EMAIL_HOST dst.) atau filebased utk uji
+SLA_EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+DEFAULT_FROM_EMAIL = "karta@localhost"
+
+# Inbox tarefa per user (core/inbox.py): TTL cache hitungan badge navbar (detik);
+# di-invalidate otomatis saat tugas user berubah, TTL hanya jaring pengaman
+INBOX_COUNTS_TTL = 300
+INBOX_PAGE_SIZE = 50
+
 # Django REST Framework defaults (useful soon for API endpoints)
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
@@ -167,6 +255,10 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 20,
 }
 
+# Import massal Karta Tama (core/ingest.py): API /api/v1/incoming/bulk/ & manage.py import_incoming
+INGEST_BATCH_SIZE = 500      # baris per transaksi / bulk_create
+INGEST_API_MAX_ROWS = 5000   # batas per request API (file lebih besar → pakai command)
+
 # ============== JAZZMIN ==============
 JAZZMIN_SETTINGS = {
     "site_title": "Sistema Karta Kabinete",
@@ -188,6 +280,7 @@ JAZZMIN_SETTINGS = {
     "usermenu_links": [
         {"name": "Karta Tama", "url": "admin_incoming_list"},
         {"name": "Karta Sai", "url": "admin_outgoing_list"},
+        {"name": "Inbox Tarefa", "url": "admin_inbox"},
     ],
 
     # Urutan app/model di sidebar
@@ -222,6 +315,7 @@ JAZZMIN_SETTINGS = {
         "core.ExpeditionRecord": "fas fa-shipping-fast",
         "core.ClassificationTag": "fas fa-tags",
         "core.Attachment": "fas fa-paperclip",
+        "core.RenderJob": "fas fa-cogs",
     },
 
     "default_icon_parents": "fas fa-folder-open",
@@ -7,6 +7,7 @@ from core import views as core_views
 urlpatterns = [
     path("admin/karta/", include("core.admin_urls")),
     path("admin/", admin.site.urls),
+    path("api/v1/", include("core.api_urls")),
 
     path("", include("core.urls")),
 